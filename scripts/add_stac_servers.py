@@ -8,13 +8,14 @@ writes YAML without uid (run: python scripts/builder.py assign).
 from __future__ import annotations
 
 import csv
-import os
 import re
 from pathlib import Path
 from urllib.parse import urlparse
 
 import yaml
 
+from record_store import open_record_index
+
 try:
     from yaml import CLoader as Loader, CDumper as Dumper
 except ImportError:
@@ -159,21 +160,11 @@ def infer_country(url: str, name: str, description: str) -> tuple[str, str | Non
 def load_existing_entities() -> tuple[set[str], set[str]]:
     ids = set()
     links = set()
-    for root, _dirs, files in os.walk(ENTITIES_DIR):
-        for f in files:
-            if not f.endswith(".yaml") and not f.endswith(".yml"):
-                continue
-            path = Path(root) / f
-            try:
-                with open(path, "r", encoding="utf-8") as fp:
-                    data = yaml.safe_load(fp)
-                if data:
-                    if data.get("id"):
-                        ids.add(data["id"])
-                    if data.get("link"):
-                        links.add(normalize_link(data["link"]))
-            except Exception:
-                pass
+    with open_record_index() as index:
+        for row in index.rows("entities"):
+            ids.add(row["id"])
+            if row["link"]:
+                links.add(normalize_link(row["link"]))
     return ids, links
 
 
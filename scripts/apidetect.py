@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 # This script intended to detect data catalogs API
+import asyncio
 import logging
 import sys
+import threading
 from io import BytesIO
 import typer
 from typing import Optional
@@ -13,21 +15,35 @@ import datetime
 import yaml
 
 try:
-    from yaml import CLoader as Loader, CDumper as Dumper
+    from yaml import CDumper as Dumper
 except ImportError:
-    from yaml import Loader, Dumper
+    from yaml import Dumper
 import csv
 import json
 import os
 import shutil
 import pprint
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
 from urllib.parse import urlparse
 import lxml.html
 import lxml.etree
+import tqdm
 import urllib.robotparser
 from requests.exceptions import ConnectionError, TooManyRedirects, ContentDecodingError
 from urllib3.exceptions import InsecureRequestWarning  # , ConnectionError
 
+from record_store import iter_records
+from response_cache import (
+    API_STATUS_TTL,
+    CAPABILITIES_TTL,
+    DEFAULT_TTL,
+    RESPONSE_CACHE_PATH,
+    CachedSession,
+    ResponseCache,
+)
+
 # Suppress only the single warning from urllib3 needed.
 requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
 
@@ -115,6 +131,7 @@ GEONODE_URLMAP = [
     {
         "id": "csw202",
         "url": "/catalogue/csw?service=CSW&version=2.0.2&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.2",
@@ -129,6 +146,7 @@ GEONODE_URLMAP = [
     {
         "id": "opensearch",
         "url": "/catalogue/csw?mode=opensearch&service=CSW&version=2.0.2&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0",
@@ -136,6 +154,7 @@ GEONODE_URLMAP = [
     {
         "id": "wms111",
         "url": "/geoserver/ows?service=WMS&version=1.1.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -143,6 +162,7 @@ GEONODE_URLMAP = [
     {
         "id": "wfs110",
         "url": "/geoserver/ows?service=WFS&version=1.1.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.0",
@@ -150,6 +170,7 @@ GEONODE_URLMAP = [
     {
         "id": "wcs111",
         "url": "/geoserver/ows?service=WCS&version=1.1.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -157,6 +178,7 @@ GEONODE_URLMAP = [
     {
         "id": "wmts100",
         "url": "/geoserver/gwc/service/wmts?service=WMTS&version=1.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -164,6 +186,7 @@ GEONODE_URLMAP = [
     {
         "id": "wms130",
         "url": "/geoserver/ows?service=WMS&version=1.3.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.3.0",
@@ -171,6 +194,7 @@ GEONODE_URLMAP = [
     {
         "id": "wfs100",
         "url": "/geoserver/ows?service=WFS&version=1.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -178,6 +202,7 @@ GEONODE_URLMAP = [
     {
         "id": "wfs200",
         "url": "/geoserver/ows?service=WFS&version=2.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.0",
@@ -185,6 +210,7 @@ GEONODE_URLMAP = [
     {
         "id": "wcs100",
         "url": "/geoserver/ows?service=WCS&version=1.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -192,6 +218,7 @@ GEONODE_URLMAP = [
     {
         "id": "wcs110",
         "url": "/geoserver/ows?service=WCS&version=1.1.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.0",
@@ -199,6 +226,7 @@ GEONODE_URLMAP = [
     {
         "id": "wcs11",
         "url": "/geoserver/ows?service=WCS&version=1.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1",
@@ -206,6 +234,7 @@ GEONODE_URLMAP = [
     {
         "id": "wcs201",
         "url": "/geoserver/ows?service=WCS&version=2.0.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.1",
@@ -213,6 +242,7 @@ GEONODE_URLMAP = [
     {
         "id": "wps100",
         "url": "/geoserver/ows?service=WPS&version=1.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -227,6 +257,7 @@ GEONODE_URLMAP = [
     {
         "id": "wms-c111",
         "url": "/geoserver/gwc/service/wms?request=GetCapabilities&version=1.1.1&tiled=true",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -379,9 +410,13 @@ CKAN_URLMAP = [
     {
         "id": "ckan",
         "url": "/api/3",
+        "cache_ttl": API_STATUS_TTL,
         "expected_mime": JSON_MIMETYPES,
         "is_json": True,
         "version": "3",
+        # Every CKAN answers here; any other HTTP response rules out the ckan:* entries
+        # (the DCAT exports below may still be served by another catalog)
+        "decisive": True,
     },
     {
         "id": "ckan:package-search",
@@ -521,6 +556,7 @@ GEONETWORK_URLMAP = [
     {
         "id": "csw202",
         "url": "/srv/eng/csw?SERVICE=CSW&VERSION=2.0.2&REQUEST=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.2",
@@ -890,6 +926,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wms111",
         "url": "/ows?service=WMS&version=1.1.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -897,6 +934,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wms130",
         "url": "/ows?service=WMS&version=1.3.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.3.0",
@@ -904,6 +942,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wfs100",
         "url": "/ows?service=WFS&version=1.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -911,6 +950,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wfs110",
         "url": "/ows?service=WFS&version=1.1.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.0",
@@ -918,6 +958,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wfs200",
         "url": "/ows?service=WFS&version=2.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.0",
@@ -925,6 +966,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wcs100",
         "url": "/ows?service=WCS&version=1.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -932,6 +974,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wcs110",
         "url": "/ows?service=WCS&version=1.1.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.0",
@@ -939,6 +982,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wcs111",
         "url": "/ows?service=WCS&version=1.1.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -946,6 +990,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wcs11",
         "url": "/ows?service=WCS&version=1.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1",
@@ -953,6 +998,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wcs201",
         "url": "/ows?service=WCS&version=2.0.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.1",
@@ -960,6 +1006,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wps100",
         "url": "/ows?service=WPS&version=1.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -974,6 +1021,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wms-c111",
         "url": "/gwc/service/wms?request=GetCapabilities&version=1.1.1&tiled=true",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -981,6 +1029,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wmts100",
         "url": "/gwc/service/wmts?REQUEST=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -988,6 +1037,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "csw202",
         "url": "/csw?service=csw&version=2.0.2&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.2",
@@ -1065,6 +1115,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wms111",
         "url": "/geo/wms?service=WMS&version=1.1.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -1072,6 +1123,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wms130",
         "url": "/geo/wms?service=WMS&version=1.3.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.3.0",
@@ -1079,6 +1131,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wfs100",
         "url": "/geo/wfs?service=WFS&version=1.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -1086,6 +1139,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wfs110",
         "url": "/geo/wfs?service=WFS&version=1.1.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.0",
@@ -1093,6 +1147,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wfs200",
         "url": "/geo/wfs?service=WFS&version=2.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.0",
@@ -1100,6 +1155,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wcs100",
         "url": "/geo/wms?service=WCS&version=1.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -1107,6 +1163,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wcs110",
         "url": "/geo/wms?service=WCS&version=1.1.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.0",
@@ -1114,6 +1171,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wcs111",
         "url": "/geo/wms?service=WCS&version=1.1.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -1121,6 +1179,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wcs11",
         "url": "/geo/wms?service=WCS&version=1.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1",
@@ -1128,6 +1187,7 @@ GEOSERVER_URLMAP = [
     {
         "id": "wcs201",
         "url": "/geo/wms?service=WCS&version=2.0.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.1",
@@ -1142,6 +1202,7 @@ MAPPROXY_URLMAP = [
     {
         "id": "wms111",
         "url": "/service?REQUEST=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -1149,6 +1210,7 @@ MAPPROXY_URLMAP = [
     {
         "id": "wmts100",
         "url": "/service?REQUEST=GetCapabilities&SERVICE=WMTS",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -1173,6 +1235,7 @@ NCWMS_URLMAP = [
     {
         "id": "wms111",
         "url": "/wms?SERVICE=WMS&REQUEST=GetCapabilities&VERSION=1.1.1",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -1180,6 +1243,7 @@ NCWMS_URLMAP = [
     {
         "id": "wms130",
         "url": "/wms?SERVICE=WMS&REQUEST=GetCapabilities&VERSION=1.3.0",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.3.0",
@@ -1244,6 +1308,7 @@ KOORDINATES_URLMAP = [
     {
         "id": "csw202",
         "url": "/services/csw/?service=CSW&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.2",
@@ -1360,6 +1425,7 @@ PYCSW30_URLMAP = [
     {
         "id": "csw202",
         "url": "/csw?service=CSW&version=2.0.2&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.2",
@@ -1963,13 +2029,51 @@ CUSTOM_URLMAP = [
 ]
 
 
-def analyze_robots(root_url):
+# Keep-alive connection pools shared by every probe session: hosts whose
+# pools are kept, and idle connections kept per host. The per-host default
+# covers detect-* runs with --per-host 2 and --concurrency 6.
+POOL_HOSTS = 256
+POOL_PER_HOST = 12
+
+_pool_adapter = None
+_pool_lock = threading.Lock()
+
+
+def configure_connection_pool(hosts=POOL_HOSTS, per_host=POOL_PER_HOST):
+    """Replace the shared connection pools; sessions created afterwards use the new sizes."""
+    global _pool_adapter
+    if _pool_adapter is not None:
+        _pool_adapter.close()
+    _pool_adapter = requests.adapters.HTTPAdapter(
+        pool_connections=hosts, pool_maxsize=per_host
+    )
+    return _pool_adapter
+
+
+def pooled_session():
+    """New requests session whose HTTP(S) connections come from the shared keep-alive pools.
+
+    Cookies and headers stay per session; TCP/TLS connections are reused
+    across sessions, threads and catalogs on the same host.
+    """
+    s = requests.Session()
+    adapter = _pool_adapter
+    if adapter is None:
+        with _pool_lock:
+            adapter = _pool_adapter or configure_connection_pool()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def analyze_robots(root_url, session=None):
     p = urlparse(root_url)
     robots_url = p.scheme + "://" + p.netloc + "/robots.txt"
     logger = logging.getLogger(__name__)
     logger.info("Analyzing robots.txt %s", robots_url)
+    getter = session.get if session is not None else pooled_session().get
     try:
-        r = requests.get(
+        r = getter(
             robots_url,
             timeout=DEFAULT_TIMEOUT,
             verify=False,
@@ -2011,11 +2115,11 @@ FILTER_RELS = [
 FILTER_TYPES = ["text/css", "image/x-icon", "image/png"]
 
 
-def analyze_root(root_url):
+def analyze_root(root_url, session=None):
     logger = logging.getLogger(__name__)
     logger.info("Analyzing root page %s", root_url)
     output = []
-    s = requests.Session()
+    s = session if session is not None else pooled_session()
     try:
         response = s.get(
             root_url,
@@ -2475,7 +2579,7 @@ def opensdg_parse_remote_data_base_url(html, site_url):
 def opensdg_remote_data_base_url(site_url, session=None, timeout=DEFAULT_TIMEOUT):
     """Fetch an Open SDG homepage and read opensdg.remoteDataBaseUrl."""
     logger = logging.getLogger(__name__)
-    getter = session.get if session is not None else requests.get
+    getter = session.get if session is not None else pooled_session().get
     try:
         response = getter(
             site_url,
@@ -2491,14 +2595,318 @@ def opensdg_remote_data_base_url(site_url, session=None, timeout=DEFAULT_TIMEOUT
     return opensdg_parse_remote_data_base_url(response.text, site_url)
 
 
+# Parallel requests per host when probing one portal's URL map
+PROBE_HOST_CONCURRENCY = 6
+
+# Response cache used by probe sessions; None (the default) disables caching.
+# The CLI enables it, other callers use configure_response_cache().
+_response_cache = None
+
+
+def configure_response_cache(path=RESPONSE_CACHE_PATH, ttl=DEFAULT_TTL, offline=False, enabled=True):
+    """Turn the on-disk probe response cache on (optionally offline replay only) or off."""
+    global _response_cache
+    if _response_cache is not None:
+        _response_cache.close()
+    _response_cache = ResponseCache(path, ttl=ttl, offline=offline) if enabled or offline else None
+    return _response_cache
+
+
+def probe_session():
+    """Pooled session for probing, wrapped in the response cache when one is configured."""
+    s = pooled_session()
+    return CachedSession(s, _response_cache) if _response_cache is not None else s
+
+
+def _probe_url(s, base_url, item, request_url, timeout, verify_json):
+    """Request one URL-map entry; returns ("found", endpoint, live) or ("error", failure dict, live).
+
+    live is False when the outcome says nothing new about the portal: the
+    response was replayed from the response cache, or an offline run missed it.
+    """
+    logger = logging.getLogger(__name__)
+    live = not (isinstance(s, CachedSession) and s.cache.offline)
+    # URL-map entries may set cache_ttl (seconds) to override the response cache default
+    cache_options = {"ttl": item.get("cache_ttl")} if isinstance(s, CachedSession) else {}
+    try:
+        logger.info("Requesting %s", request_url)
+        if "post_params" in item.keys():
+            if "accept" in item.keys():
+                response = s.post(
+                    request_url,
+                    verify=False,
+                    headers={"User-Agent": USER_AGENT, "Accept": item["accept"]},
+                    json=json.loads(item["post_params"]),
+                    timeout=(timeout, timeout),
+                    **cache_options,
+                )
+            else:
+                response = s.post(
+                    request_url,
+                    verify=False,
+                    headers={"User-Agent": USER_AGENT},
+                    json=json.loads(item["post_params"]),
+                    timeout=(timeout, timeout),
+                    **cache_options,
+                )
+        else:
+            response = None
+            if "prefetch" in item and item["prefetch"]:
+                # Reuse prefetched response instead of issuing a duplicate request.
+                response = s.get(
+                    request_url,
+                    headers={"User-Agent": USER_AGENT},
+                    timeout=(timeout, timeout),
+                    **cache_options,
+                )
+            # request_url already set above with base_url
+            if response is None and "accept" in item.keys():
+                response = s.get(
+                    request_url,
+                    verify=False,
+                    headers={"User-Agent": USER_AGENT, "Accept": item["accept"]},
+                    timeout=(timeout, timeout),
+                    **cache_options,
+                )
+            elif response is None:
+                response = s.get(
+                    request_url,
+                    verify=False,
+                    headers={"User-Agent": USER_AGENT},
+                    timeout=(timeout, timeout),
+                    **cache_options,
+                )
+        live = not getattr(response, "from_cache", False)
+        if response.status_code != 200:
+            return "error", {
+                "url": request_url,
+                "status": response.status_code,
+                "mime": (
+                    response.headers["Content-Type"].split(";", 1)[0].lower()
+                    if "content-type" in response.headers.keys()
+                    else ""
+                ),
+                "error": "Wrong status",
+            }, live
+    except requests.exceptions.Timeout:
+        return "error", {"url": request_url, "error": "Timeout"}, live
+    except requests.exceptions.SSLError:
+        return "error", {"url": request_url, "error": "SSL Error"}, live
+    except ConnectionError:
+        return "error", {"url": request_url, "error": "no connection"}, live
+    except TooManyRedirects:
+        return "error", {"url": request_url, "error": "no connection"}, live
+    except ContentDecodingError:
+        return "error", {"url": request_url, "error": "content error"}, live
+    logger.info("Finished request to %s", request_url)
+    if (
+        "expected_mime" in item.keys()
+        and item["expected_mime"] is not None
+        and "Content-Type" in response.headers.keys()
+    ):
+        if verify_json:
+            if "is_json" in item.keys() and item["is_json"]:
+                try:
+                    data = json.loads(response.content)
+                except (json.JSONDecodeError, ValueError, TypeError):
+                    return "error", {
+                        "url": request_url,
+                        "status": response.status_code,
+                        "mime": response.headers["Content-Type"]
+                        .split(";", 1)[0]
+                        .lower(),
+                        "error": "Error loading JSON",
+                    }, live
+        expected_mime = item["expected_mime"]
+        if isinstance(expected_mime, str):
+            expected_mime = [expected_mime]
+        if (
+            response.headers["Content-Type"].split(";", 1)[0].lower()
+            not in expected_mime
+        ):
+            return "error", {
+                "url": request_url,
+                "status": response.status_code,
+                "mime": response.headers["Content-Type"]
+                .split(";", 1)[0]
+                .lower(),
+                "error": "Wrong content type",
+            }, live
+    api = {
+        "type": item["id"],
+        "url": (
+            base_url + item["display_url"]
+            if "display_url" in item.keys()
+            else request_url
+        ),
+    }
+    if item["version"]:
+        api["version"] = item["version"]
+    if "urlpat" in item.keys():
+        api["url_pattern"] = item["urlpat"]
+    return "found", api, live
+
+
+async def _probe_all(s, probes, timeout, verify_json, concurrency):
+    """Run probes in worker threads, at most `concurrency` at a time per host; outcomes keep probe order."""
+    loop = asyncio.get_running_loop()
+    hosts = {urlparse(request_url).netloc for _, _, request_url in probes}
+    limits = {host: asyncio.Semaphore(concurrency) for host in hosts}
+    with ThreadPoolExecutor(max_workers=min(len(probes), concurrency * len(hosts))) as executor:
+
+        async def probe(base_url, item, request_url):
+            async with limits[urlparse(request_url).netloc]:
+                return await loop.run_in_executor(
+                    executor, _probe_url, s, base_url, item, request_url, timeout, verify_json
+                )
+
+        return await asyncio.gather(*(probe(*args) for args in probes))
+
+
+def run_probes(
+    s,
+    probes,
+    timeout=DEFAULT_TIMEOUT,
+    verify_json=False,
+    concurrency=PROBE_HOST_CONCURRENCY,
+    stop_after=None,
+    stop_on_negative=False,
+):
+    """Probe (base_url, item, request_url) triples and return their outcomes in order.
+
+    With concurrency > 1 the probes of one portal run concurrently on an
+    asyncio loop (blocking requests calls in threads), so a portal takes
+    about as long as its slowest probes rather than the sum of all of them.
+
+    Early exit: with stop_on_negative, URL-map entries marked "decisive" run
+    first. A decisive entry that gets an HTTP response other than a match
+    (CKAN /api/3 answering 404 or HTML) rules out the entries of its family
+    (same id before ":", e.g. ckan:*) for that base URL; other entries such
+    as the DCAT exports are still probed, and timeouts and connection errors
+    do not count. With stop_after, probes run in batches of `concurrency` in
+    the given order and no further batch starts once that many endpoints are
+    found. Probes not run have outcome None.
+    """
+    decisive = [i for i, (_, item, _) in enumerate(probes) if item.get("decisive")] if stop_on_negative else []
+    if stop_after is None and not decisive:
+        if concurrency <= 1 or len(probes) < 2:
+            return [_probe_url(s, *args, timeout, verify_json) for args in probes]
+        return asyncio.run(_probe_all(s, probes, timeout, verify_json, concurrency))
+    outcomes = [None] * len(probes)
+    decisive_set = set(decisive)
+    rest = [i for i in range(len(probes)) if i not in decisive_set]
+    if stop_after is None:
+        # Only the decisive round waits; everything else runs together afterwards
+        batches = [decisive, rest]
+    else:
+        batch = max(1, concurrency)
+        batches = ([decisive] if decisive else []) + [rest[start : start + batch] for start in range(0, len(rest), batch)]
+    rejected = set()
+    found = 0
+    for indexes in batches:
+        if stop_after is not None and found >= stop_after:
+            break
+        indexes = [i for i in indexes if (probes[i][0], _urlmap_family(probes[i][1])) not in rejected]
+        batch_probes = [probes[i] for i in indexes]
+        for i, outcome in zip(indexes, run_probes(s, batch_probes, timeout, verify_json, concurrency)):
+            outcomes[i] = outcome
+            if outcome[0] == "found":
+                found += 1
+            elif i in decisive_set and "status" in outcome[1]:
+                rejected.add((probes[i][0], _urlmap_family(probes[i][1])))
+    return outcomes
+
+
+def _urlmap_family(item):
+    """Family of a URL-map entry: its id up to the first ":" (ckan for ckan:package-search)."""
+    return (item.get("id") or "").split(":", 1)[0]
+
+
+PROBE_STATS_PATH = os.path.join(_REPO_ROOT, "data", "datasets", "probe_stats.json")
+
+
+class ProbeStats:
+    """Attempts and hits per software and URL-map entry, recorded across detection runs.
+
+    With recording off the stored rates are only read, e.g. for offline
+    replays and dry runs.
+    """
+
+    def __init__(self, path=PROBE_STATS_PATH, recording=True):
+        self.path = os.fspath(path)
+        self.recording = recording
+        self.counts = {}
+        self._changed = False
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf8") as f:
+                    self.counts = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.getLogger(__name__).warning("Ignoring unreadable probe stats %s: %s", path, e)
+
+    @staticmethod
+    def key(item):
+        return f"{item['id']} {item.get('absolute_url') or item.get('url', '')}"
+
+    def hit_rate(self, software_id, item):
+        """Smoothed share of past probes of this entry that found an endpoint (0.5 when unseen)."""
+        attempts, hits = self.counts.get(software_id, {}).get(self.key(item), (0, 0))
+        return (hits + 1) / (attempts + 2)
+
+    def record(self, software_id, item, hit):
+        if not self.recording:
+            return
+        with self._lock:
+            counts = self.counts.setdefault(software_id, {}).setdefault(self.key(item), [0, 0])
+            counts[0] += 1
+            counts[1] += int(hit)
+            self._changed = True
+
+    def save(self):
+        """Write the counts back when anything was recorded."""
+        with self._lock:
+            if not self._changed:
+                return
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf8") as f:
+                json.dump(self.counts, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+# Hit-rate store used to order probes; None (the default) keeps URL-map order.
+# The CLI enables it, other callers use configure_probe_stats().
+_probe_stats = None
+
+
+def configure_probe_stats(path=PROBE_STATS_PATH, enabled=True, recording=True):
+    """Turn learned probe ordering (and, unless recording is False, hit recording) on or off; returns the store."""
+    global _probe_stats
+    _probe_stats = ProbeStats(path, recording=recording) if enabled else None
+    return _probe_stats
+
+
+def _stop_recording_in_dryrun(dryrun):
+    """A dry run writes nothing, learned probe stats included."""
+    if dryrun and _probe_stats is not None:
+        _probe_stats.recording = False
+
+
 def api_identifier(
-    website_url, software_id, verify_json=False, deep=False, timeout=DEFAULT_TIMEOUT
+    website_url,
+    software_id,
+    verify_json=False,
+    deep=False,
+    timeout=DEFAULT_TIMEOUT,
+    concurrency=PROBE_HOST_CONCURRENCY,
+    stop_after=None,
+    stop_on_negative=False,
 ):
     logger = logging.getLogger(__name__)
     url_map = CATALOGS_URLMAP[software_id]
     results = []
     found = []
-    s = requests.Session()
+    s = probe_session()
     original_url = website_url
     if software_id in {"scicat", "gin"}:
         host = urlparse(website_url).netloc.split(":")[0].lower()
@@ -2566,148 +2974,49 @@ def api_identifier(
     
     # Track URLs we've already tried to avoid duplicates
     tried_urls = set()
-    
+    probes = []
     for base_url in base_urls:
         for item in umap:
-            try:
-                if item.get("absolute_url"):
-                    request_url = item["absolute_url"]
-                else:
-                    request_url = (
-                        original_url
-                        if item.get("use_original_url")
-                        else base_url + item["url"]
-                    )
-                # Skip if we've already tried this URL
-                if request_url in tried_urls:
-                    continue
-                tried_urls.add(request_url)
-                logger.info("Requesting %s", request_url)
-                if "post_params" in item.keys():
-                    if "accept" in item.keys():
-                        response = s.post(
-                            request_url,
-                            verify=False,
-                            headers={"User-Agent": USER_AGENT, "Accept": item["accept"]},
-                            json=json.loads(item["post_params"]),
-                            timeout=(timeout, timeout),
-                        )
-                    else:
-                        response = s.post(
-                            request_url,
-                            verify=False,
-                            headers={"User-Agent": USER_AGENT},
-                            json=json.loads(item["post_params"]),
-                            timeout=(timeout, timeout),
-                        )
-                else:
-                    response = None
-                    if "prefetch" in item and item["prefetch"]:
-                        # Reuse prefetched response instead of issuing a duplicate request.
-                        response = s.get(
-                            request_url,
-                            headers={"User-Agent": USER_AGENT},
-                            timeout=(timeout, timeout),
-                        )
-                    # request_url already set above with base_url
-                    if response is None and "accept" in item.keys():
-                        response = s.get(
-                            request_url,
-                            verify=False,
-                            headers={"User-Agent": USER_AGENT, "Accept": item["accept"]},
-                            timeout=(timeout, timeout),
-                        )
-                    elif response is None:
-                        response = s.get(
-                            request_url,
-                            verify=False,
-                            headers={"User-Agent": USER_AGENT},
-                            timeout=(timeout, timeout),
-                        )
-                if response.status_code != 200:
-                    results.append(
-                        {
-                            "url": request_url,
-                            "status": response.status_code,
-                            "mime": (
-                                response.headers["Content-Type"].split(";", 1)[0].lower()
-                                if "content-type" in response.headers.keys()
-                                else ""
-                            ),
-                            "error": "Wrong status",
-                        }
-                    )
-                    continue
-            except requests.exceptions.Timeout:
-                results.append({"url": request_url, "error": "Timeout"})
-                continue
-            except requests.exceptions.SSLError:
-                results.append({"url": request_url, "error": "SSL Error"})
-                continue
-            except ConnectionError:
-                results.append({"url": request_url, "error": "no connection"})
-                continue
-            except TooManyRedirects:
-                results.append({"url": request_url, "error": "no connection"})
-                continue
-            except ContentDecodingError:
-                results.append({"url": request_url, "error": "content error"})
+            if item.get("absolute_url"):
+                request_url = item["absolute_url"]
+            else:
+                request_url = (
+                    original_url
+                    if item.get("use_original_url")
+                    else base_url + item["url"]
+                )
+            # Skip if we've already tried this URL
+            if request_url in tried_urls:
                 continue
-            logger.info("Finished request to %s", request_url)
-            if (
-                "expected_mime" in item.keys()
-                and item["expected_mime"] is not None
-                and "Content-Type" in response.headers.keys()
-            ):
-                if verify_json:
-                    if "is_json" in item.keys() and item["is_json"]:
-                        try:
-                            data = json.loads(response.content)
-                        except (json.JSONDecodeError, ValueError, TypeError):
-                            results.append(
-                                {
-                                    "url": request_url,
-                                    "status": response.status_code,
-                                    "mime": response.headers["Content-Type"]
-                                    .split(";", 1)[0]
-                                    .lower(),
-                                    "error": "Error loading JSON",
-                                }
-                            )
-                            continue
-                expected_mime = item["expected_mime"]
-                if isinstance(expected_mime, str):
-                    expected_mime = [expected_mime]
-                if (
-                    response.headers["Content-Type"].split(";", 1)[0].lower()
-                    not in expected_mime
-                ):
-                    results.append(
-                        {
-                            "url": request_url,
-                            "status": response.status_code,
-                            "mime": response.headers["Content-Type"]
-                            .split(";", 1)[0]
-                            .lower(),
-                            "error": "Wrong content type",
-                        }
-                    )
-                    continue
-            api = {
-                "type": item["id"],
-                "url": (
-                    base_url + item["display_url"]
-                    if "display_url" in item.keys()
-                    else request_url
-                ),
-            }
-            if item["version"]:
-                api["version"] = item["version"]
-            if "urlpat" in item.keys():
-                api["url_pattern"] = item["urlpat"]
-            found.append(api)
+            tried_urls.add(request_url)
+            probes.append((base_url, item, request_url))
+
+    # Run the entries most likely to hit first; results keep URL-map order
+    stats = _probe_stats
+    order = list(range(len(probes)))
+    if stats is not None:
+        order.sort(key=lambda i: -stats.hit_rate(software_id, probes[i][1]))
+    early_exit = {} if deep else {"stop_after": stop_after, "stop_on_negative": stop_on_negative}
+    outcomes = [None] * len(probes)
+    ordered = run_probes(s, [probes[i] for i in order], timeout, verify_json, concurrency, **early_exit)
+    for i, outcome in zip(order, ordered):
+        outcomes[i] = outcome
+    skipped = 0
+    for (base_url, item, request_url), outcome in zip(probes, outcomes):
+        if outcome is None:
+            skipped += 1
+            continue
+        # Only fresh responses teach anything; cache replays were counted when fetched
+        if stats is not None and outcome[2]:
+            stats.record(software_id, item, outcome[0] == "found")
+        if outcome[0] == "found":
+            found.append(outcome[1])
+        else:
+            results.append(outcome[1])
+    if skipped:
+        logger.info("Early exit, skipped %d of %d probes", skipped, len(probes))
     if software_id == "nyudatacatalog":
-        for item in analyze_root(original_url):
+        for item in analyze_root(original_url, session=s):
             if item.get("type") != "schemaorg:datacatalog":
                 continue
             if any(
@@ -2720,7 +3029,7 @@ def api_identifier(
     if deep:
         logger.info("Going deep")
         for func in DEEP_SEARCH_FUNCTIONS:
-            extracted = func(website_url)
+            extracted = func(website_url, session=s)
             if len(extracted) > 0:
                 found.extend(extracted)
     logger.info("Failures: %s", results)
@@ -2751,16 +3060,8 @@ def infer_endpoints_verified(record, timeout=DEFAULT_TIMEOUT):
         return []
 
 
-def __detect_one(
-    filename,
-    record,
-    software,
-    action,
-    deep,
-    filepath,
-    timeout=DEFAULT_TIMEOUT,
-    dryrun=False,
-):
+def _skip_detection(filename, record, action):
+    """True when a record already has endpoints and action does not replace or update them."""
     logger = logging.getLogger(__name__)
     logger.info("Processing %s", os.path.basename(filename).split(".", 1)[0])
     if (
@@ -2771,10 +3072,13 @@ def __detect_one(
         logger.info(
             " - skip, we have endpoints already and not in replace or update mode"
         )
-        return
-    found = api_identifier(
-        record["link"].rstrip("/"), software, deep=deep, timeout=timeout
-    )
+        return True
+    return False
+
+
+def _store_detected(filepath, record, found, action, dryrun=False):
+    """Merge detected endpoints into a record according to action and save it when any were added."""
+    logger = logging.getLogger(__name__)
     keys = []
     if action == "update":
         if "endpoints" in record.keys() and len(record["endpoints"]) > 0:
@@ -2805,20 +3109,91 @@ def __detect_one(
         logger.info("- no endpoints or no new endpoints, not updated")
 
 
-def _resolve_root_dir(mode):
-    return ENTRIES_DIR if mode == "entries" else SCHEDULED_DIR
+def __detect_one(
+    filename,
+    record,
+    software,
+    action,
+    deep,
+    filepath,
+    timeout=DEFAULT_TIMEOUT,
+    dryrun=False,
+    concurrency=PROBE_HOST_CONCURRENCY,
+):
+    if _skip_detection(filename, record, action):
+        return
+    found = api_identifier(
+        record["link"].rstrip("/"),
+        software,
+        deep=deep,
+        timeout=timeout,
+        concurrency=concurrency,
+    )
+    _store_detected(filepath, record, found, action, dryrun=dryrun)
+
+
+# Catalogs the detect-* commands probe at once, and at most per host
+DETECT_WORKERS = 8
+DETECT_HOST_LIMIT = 2
+
+
+def run_detection(jobs, probe, store, workers=DETECT_WORKERS, host_limit=DETECT_HOST_LIMIT):
+    """Probe many catalogs concurrently and store each result from the calling thread.
+
+    jobs are (filepath, record, url, software_id) tuples. probe(url, software_id)
+    runs in a pool of `workers` threads with at most `host_limit` catalogs of
+    one host in flight; store(filepath, record, found) runs on the calling
+    thread only, so YAML files have a single writer. A catalog whose probe
+    raises is logged and skipped. Returns the number of failed catalogs.
+    """
+    logger = logging.getLogger(__name__)
+    workers = max(1, workers)
+    host_limit = max(1, host_limit)
+    queues = {}
+    for job in jobs:
+        queues.setdefault(urlparse(job[2]).netloc, deque()).append(job)
+    total = sum(len(queue) for queue in queues.values())
+    ready = deque(queues)
+    active = Counter()
+    running = {}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor, tqdm.tqdm(
+        total=total, desc="Detecting endpoints", unit="catalogs"
+    ) as pbar:
+        while ready or running:
+            while ready and len(running) < workers:
+                host = ready.popleft()
+                job = queues[host].popleft()
+                active[host] += 1
+                running[executor.submit(probe, job[2], job[3])] = (job, host)
+                if queues[host] and active[host] < host_limit:
+                    ready.append(host)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                (filepath, record, url, software_id), host = running.pop(future)
+                active[host] -= 1
+                if queues[host] and active[host] == host_limit - 1:
+                    ready.append(host)
+                try:
+                    found = future.result()
+                except Exception as e:
+                    failed += 1
+                    logger.warning("Detection failed for %s: %s", url, e)
+                else:
+                    store(filepath, record, found)
+                pbar.update(1)
+    if failed:
+        logger.warning("%d catalogs failed", failed)
+    return failed
 
 
-def _iter_yaml_files(root_dir):
-    for root, _, files in os.walk(root_dir):
-        for fi in files:
-            if fi.endswith(".yaml"):
-                yield os.path.join(root, fi)
+def _resolve_root_dir(mode):
+    return ENTRIES_DIR if mode == "entries" else SCHEDULED_DIR
 
 
-def _load_record(filepath):
-    with open(filepath, "r", encoding="utf8") as f:
-        return yaml.load(f, Loader=Loader)
+def _iter_records(root_dir):
+    for filepath, record in iter_records(root_dir):
+        yield str(filepath), record
 
 
 def _save_record(filepath, record):
@@ -2833,6 +3208,44 @@ def _save_record(filepath, record):
         )
 
 
+def _record_software(record):
+    return record["software"]["id"] if record["software"]["id"] in CATALOGS_URLMAP else "custom"
+
+
+def _detect_records(
+    records,
+    action,
+    deep,
+    timeout=DEFAULT_TIMEOUT,
+    dryrun=False,
+    concurrency=PROBE_HOST_CONCURRENCY,
+    workers=DETECT_WORKERS,
+    host_limit=DETECT_HOST_LIMIT,
+    stop_after=None,
+    stop_on_negative=False,
+):
+    """Detect endpoints for (filepath, record) pairs concurrently, as __detect_one does for one."""
+    jobs = [
+        (filepath, record, record["link"].rstrip("/"), _record_software(record))
+        for filepath, record in records
+        if not _skip_detection(filepath, record, action)
+    ]
+    run_detection(
+        jobs,
+        partial(
+            api_identifier,
+            deep=deep,
+            timeout=timeout,
+            concurrency=concurrency,
+            stop_after=stop_after,
+            stop_on_negative=stop_on_negative,
+        ),
+        partial(_store_detected, action=action, dryrun=dryrun),
+        workers=workers,
+        host_limit=host_limit,
+    )
+
+
 def _detect_record(
     filename,
     filepath,
@@ -2841,8 +3254,9 @@ def _detect_record(
     deep,
     timeout=DEFAULT_TIMEOUT,
     dryrun=False,
+    concurrency=PROBE_HOST_CONCURRENCY,
 ):
-    software = record["software"]["id"] if record["software"]["id"] in CATALOGS_URLMAP else "custom"
+    software = _record_software(record)
     __detect_one(
         filename,
         record,
@@ -2852,15 +3266,13 @@ def _detect_record(
         filepath,
         timeout=timeout,
         dryrun=dryrun,
+        concurrency=concurrency,
     )
 
 
-def _replace_detected_endpoints(
-    filepath, record, software_id, base_url=None, dryrun=False
-):
+def _store_replaced(filepath, record, found, dryrun=False):
+    """Replace a record's endpoints with the detected ones and save it when any were found."""
     logger = logging.getLogger(__name__)
-    detection_base = base_url if base_url else record["link"].rstrip("/")
-    found = api_identifier(detection_base, software_id)
     record["endpoints"] = []
     for api in found:
         logger.info("- %s %s", api["type"], api["url"])
@@ -2875,6 +3287,48 @@ def _replace_detected_endpoints(
         logger.info("- no endpoints, not updated")
 
 
+def _replace_detected_endpoints(
+    filepath,
+    record,
+    software_id,
+    base_url=None,
+    dryrun=False,
+    concurrency=PROBE_HOST_CONCURRENCY,
+):
+    detection_base = base_url if base_url else record["link"].rstrip("/")
+    found = api_identifier(detection_base, software_id, concurrency=concurrency)
+    _store_replaced(filepath, record, found, dryrun=dryrun)
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    cache: Annotated[
+        bool, typer.Option("--cache/--no-cache", help="Reuse probe responses from data/datasets/response_cache.sqlite.")
+    ] = True,
+    cache_ttl: Annotated[
+        int, typer.Option("--cache-ttl", help="Seconds a cached response is reused without revalidation.")
+    ] = DEFAULT_TTL,
+    offline: Annotated[
+        bool, typer.Option("--offline", help="Replay cached responses only; uncached URLs fail as 'no connection'.")
+    ] = False,
+    pool_per_host: Annotated[
+        int, typer.Option("--pool-per-host", help="Keep-alive connections kept per host.")
+    ] = POOL_PER_HOST,
+    learn: Annotated[
+        bool, typer.Option("--learn/--no-learn", help="Order probes by hit rates from data/datasets/probe_stats.json.")
+    ] = True,
+):
+    """Detect data catalog API endpoints"""
+    response_cache = configure_response_cache(ttl=cache_ttl, offline=offline, enabled=cache)
+    if response_cache is not None:
+        ctx.call_on_close(response_cache.log_stats)
+    configure_connection_pool(per_host=pool_per_host)
+    stats = configure_probe_stats(enabled=learn, recording=not offline)
+    if stats is not None:
+        ctx.call_on_close(stats.save)
+
+
 @app.command()
 def detect_software(
     software,
@@ -2889,25 +3343,46 @@ def detect_software(
             help="Only process records with fewer than N endpoints. Use 1 for records with no endpoints.",
         ),
     ] = None,
+    workers: Annotated[
+        int, typer.Option("--workers", help="Catalogs probed at once.")
+    ] = DETECT_WORKERS,
+    per_host: Annotated[
+        int, typer.Option("--per-host", help="Catalogs of one host probed at once.")
+    ] = DETECT_HOST_LIMIT,
+    stop_after: Annotated[
+        Optional[int],
+        typer.Option("--stop-after", help="Stop probing a catalog after N endpoints (ignored with --deep)."),
+    ] = None,
+    stop_on_negative: Annotated[
+        bool,
+        typer.Option(
+            "--stop-on-negative/--probe-all",
+            help="Skip the ckan:* entries of a base URL once CKAN /api/3 fails; DCAT exports are still probed (ignored with --deep).",
+        ),
+    ] = False,
 ):
     """Enrich data catalogs with API endpoints by software"""
+    _stop_recording_in_dryrun(dryrun)
     root_dir = _resolve_root_dir(mode)
-    for filepath in _iter_yaml_files(root_dir):
-        record = _load_record(filepath)
+    records = []
+    for filepath, record in _iter_records(root_dir):
         if record["software"]["id"] != software:
             continue
         if max_endpoints is not None:
             endpoint_count = len(record.get("endpoints", []))
             if endpoint_count >= max_endpoints:
                 continue
-        _detect_record(
-            filepath,
-            filepath,
-            record,
-            action,
-            deep,
-            dryrun=dryrun,
-        )
+        records.append((filepath, record))
+    _detect_records(
+        records,
+        action,
+        deep,
+        dryrun=dryrun,
+        workers=workers,
+        host_limit=per_host,
+        stop_after=stop_after,
+        stop_on_negative=stop_on_negative,
+    )
 
 
 @app.command()
@@ -2918,12 +3393,16 @@ def detect_single(
     mode: str = "entries",
     deep: bool = False,
     timeout: int = DEFAULT_TIMEOUT,
+    concurrency: Annotated[
+        int,
+        typer.Option("--concurrency", help="Parallel probes per host (1 = one at a time)."),
+    ] = PROBE_HOST_CONCURRENCY,
 ):
     """Enrich single data catalog with API endpoints"""
+    _stop_recording_in_dryrun(dryrun)
     root_dir = _resolve_root_dir(mode)
     found = False
-    for filepath in _iter_yaml_files(root_dir):
-        record = _load_record(filepath)
+    for filepath, record in _iter_records(root_dir):
         idkeys = []
         for k in ["uid", "id", "link"]:
             if k in record.keys():
@@ -2939,6 +3418,7 @@ def detect_single(
             deep,
             timeout=timeout,
             dryrun=dryrun,
+            concurrency=concurrency,
         )
 
 
@@ -2949,21 +3429,42 @@ def detect_country(
     action: Annotated[str, typer.Option("--action")] = "insert",
     mode: str = "entries",
     deep: bool = False,
+    workers: Annotated[
+        int, typer.Option("--workers", help="Catalogs probed at once.")
+    ] = DETECT_WORKERS,
+    per_host: Annotated[
+        int, typer.Option("--per-host", help="Catalogs of one host probed at once.")
+    ] = DETECT_HOST_LIMIT,
+    stop_after: Annotated[
+        Optional[int],
+        typer.Option("--stop-after", help="Stop probing a catalog after N endpoints (ignored with --deep)."),
+    ] = None,
+    stop_on_negative: Annotated[
+        bool,
+        typer.Option(
+            "--stop-on-negative/--probe-all",
+            help="Skip the ckan:* entries of a base URL once CKAN /api/3 fails; DCAT exports are still probed (ignored with --deep).",
+        ),
+    ] = False,
 ):
     """Enrich data catalogs with API endpoints by country"""
+    _stop_recording_in_dryrun(dryrun)
     root_dir = _resolve_root_dir(mode)
-    for filepath in _iter_yaml_files(root_dir):
-        record = _load_record(filepath)
-        if record["owner"]["location"]["country"]["id"] != country:
-            continue
-        _detect_record(
-            filepath,
-            filepath,
-            record,
-            action,
-            deep,
-            dryrun=dryrun,
-        )
+    records = [
+        (filepath, record)
+        for filepath, record in _iter_records(root_dir)
+        if record["owner"]["location"]["country"]["id"] == country
+    ]
+    _detect_records(
+        records,
+        action,
+        deep,
+        dryrun=dryrun,
+        workers=workers,
+        host_limit=per_host,
+        stop_after=stop_after,
+        stop_on_negative=stop_on_negative,
+    )
 
 
 @app.command()
@@ -2973,29 +3474,50 @@ def detect_cattype(
     action: Annotated[str, typer.Option("--action")] = "insert",
     mode: str = "entries",
     deep: bool = False,
+    workers: Annotated[
+        int, typer.Option("--workers", help="Catalogs probed at once.")
+    ] = DETECT_WORKERS,
+    per_host: Annotated[
+        int, typer.Option("--per-host", help="Catalogs of one host probed at once.")
+    ] = DETECT_HOST_LIMIT,
+    stop_after: Annotated[
+        Optional[int],
+        typer.Option("--stop-after", help="Stop probing a catalog after N endpoints (ignored with --deep)."),
+    ] = None,
+    stop_on_negative: Annotated[
+        bool,
+        typer.Option(
+            "--stop-on-negative/--probe-all",
+            help="Skip the ckan:* entries of a base URL once CKAN /api/3 fails; DCAT exports are still probed (ignored with --deep).",
+        ),
+    ] = False,
 ):
     """Enrich data catalogs with API endpoints by catalog type"""
+    _stop_recording_in_dryrun(dryrun)
     root_dir = _resolve_root_dir(mode)
-    for filepath in _iter_yaml_files(root_dir):
-        record = _load_record(filepath)
-        if record["catalog_type"] != catalogtype:
-            continue
-        _detect_record(
-            filepath,
-            filepath,
-            record,
-            action,
-            deep,
-            dryrun=dryrun,
-        )
+    records = [
+        (filepath, record)
+        for filepath, record in _iter_records(root_dir)
+        if record["catalog_type"] == catalogtype
+    ]
+    _detect_records(
+        records,
+        action,
+        deep,
+        dryrun=dryrun,
+        workers=workers,
+        host_limit=per_host,
+        stop_after=stop_after,
+        stop_on_negative=stop_on_negative,
+    )
 
 
 @app.command()
 def detect_ckan(dryrun=False, replace_endpoints=True, mode="entries"):
     """Enrich data catalogs with API endpoints by CKAN instance (special function to update all endpoints"""
+    _stop_recording_in_dryrun(dryrun)
     root_dir = _resolve_root_dir(mode)
-    for filepath in _iter_yaml_files(root_dir):
-        record = _load_record(filepath)
+    for filepath, record in _iter_records(root_dir):
         if record["software"]["id"] == "ckan":
             logger = logging.getLogger(__name__)
             logger.info("Processing %s", os.path.basename(filepath).split(".", 1)[0])
@@ -3024,11 +3546,32 @@ def detect_all(
     status="undetected",
     replace_endpoints: Annotated[bool, typer.Option("--replace")] = False,
     mode="entries",
+    concurrency: Annotated[
+        int,
+        typer.Option("--concurrency", help="Parallel probes per host (1 = one at a time)."),
+    ] = PROBE_HOST_CONCURRENCY,
+    workers: Annotated[
+        int, typer.Option("--workers", help="Catalogs probed at once.")
+    ] = DETECT_WORKERS,
+    per_host: Annotated[
+        int, typer.Option("--per-host", help="Catalogs of one host probed at once.")
+    ] = DETECT_HOST_LIMIT,
+    stop_after: Annotated[
+        Optional[int],
+        typer.Option("--stop-after", help="Stop probing a catalog after N endpoints (ignored with --deep)."),
+    ] = None,
+    stop_on_negative: Annotated[
+        bool,
+        typer.Option(
+            "--stop-on-negative/--probe-all",
+            help="Skip the ckan:* entries of a base URL once CKAN /api/3 fails; DCAT exports are still probed (ignored with --deep).",
+        ),
+    ] = False,
 ):
     """Detect all known API endpoints"""
     root_dir = _resolve_root_dir(mode)
-    for filepath in _iter_yaml_files(root_dir):
-        record = _load_record(filepath)
+    jobs = []
+    for filepath, record in _iter_records(root_dir):
         if record["software"]["id"] in CATALOGS_URLMAP.keys():
             if "endpoints" not in record.keys() or len(record["endpoints"]) == 0:
                 if status == "undetected":
@@ -3047,11 +3590,26 @@ def detect_all(
                             " - skip, we have endpoints already and no replace mode"
                         )
                         continue
-                    _replace_detected_endpoints(
-                        filepath,
-                        record,
-                        record["software"]["id"],
+                    jobs.append(
+                        (
+                            filepath,
+                            record,
+                            record["link"].rstrip("/"),
+                            record["software"]["id"],
+                        )
                     )
+    run_detection(
+        jobs,
+        partial(
+            api_identifier,
+            concurrency=concurrency,
+            stop_after=stop_after,
+            stop_on_negative=stop_on_negative,
+        ),
+        _store_replaced,
+        workers=workers,
+        host_limit=per_host,
+    )
 
 
 @app.command()
@@ -3063,8 +3621,7 @@ def report(status="undetected", filename=None, mode="entries"):
 
     if status == "undetected":
         out.write(",".join(["id", "uid", "link", "software_id", "status"]) + "\n")
-    for filepath in _iter_yaml_files(root_dir):
-        record = _load_record(filepath)
+    for filepath, record in _iter_records(root_dir):
         if record["software"]["id"] in CATALOGS_URLMAP.keys():
             if "endpoints" not in record.keys() or len(record["endpoints"]) == 0:
                 if status == "undetected":
@@ -3092,8 +3649,7 @@ def update_broken_arcgis(
 ):
     """Detect all broken ArcGIS portals and update endpoints"""
     root_dir = _resolve_root_dir(mode)
-    for filepath in _iter_yaml_files(root_dir):
-        record = _load_record(filepath)
+    for filepath, record in _iter_records(root_dir):
         if record["software"]["id"] in ["arcgishub", "arcgisserver"]:
             if "endpoints" not in record.keys() or len(record["endpoints"]) < 2:
                 if status == "undetected":
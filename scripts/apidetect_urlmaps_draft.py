@@ -13,6 +13,8 @@ Confidence tiers:
   D – no standard relative API on catalog link (skip or sitemap-only)
 """
 
+from response_cache import CAPABILITIES_TTL
+
 # Re-use MIME lists from apidetect.py when merging:
 # from apidetect import JSON_MIMETYPES, XML_MIMETYPES, HTML_MIMETYPES
 
@@ -118,6 +120,7 @@ RASDAMAN_URLMAP = [
     {
         "id": "wcs201",
         "url": "/rasdaman/ows?service=WCS&version=2.0.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.1",
@@ -125,6 +128,7 @@ RASDAMAN_URLMAP = [
     {
         "id": "wms130",
         "url": "/rasdaman/ows?service=WMS&version=1.3.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.3.0",
@@ -359,6 +363,7 @@ LIZMAP_URLMAP = [
     {
         "id": "lizmap:service:wms",
         "url": "/index.php/lizmap/service/?SERVICE=WMS&REQUEST=GetCapabilities&VERSION=1.3.0",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.3.0",
@@ -366,6 +371,7 @@ LIZMAP_URLMAP = [
     {
         "id": "lizmap:service:wms:alt",
         "url": "/lizmap/www/index.php/lizmap/service/?SERVICE=WMS&REQUEST=GetCapabilities&VERSION=1.3.0",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.3.0",
@@ -373,6 +379,7 @@ LIZMAP_URLMAP = [
     {
         "id": "wms111",
         "url": "/index.php/lizmap/service/?SERVICE=WMS&REQUEST=GetCapabilities&VERSION=1.1.1",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -464,6 +471,7 @@ GISWEBSE_URLMAP = [
     {
         "id": "wms130",
         "url": "/GISWebServiceSE/service.php?SERVICE=WMS&REQUEST=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.3.0",
@@ -471,6 +479,7 @@ GISWEBSE_URLMAP = [
     {
         "id": "wfs200",
         "url": "/GISWebServiceSE/service.php?SERVICE=WFS&REQUEST=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.0",
@@ -478,6 +487,7 @@ GISWEBSE_URLMAP = [
     {
         "id": "wmts100",
         "url": "/GISWebServiceSE/service.php?SERVICE=WMTS&REQUEST=GetCapabilities&VERSION=1.0.0",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -785,6 +795,7 @@ GEOMAPFISH_URLMAP = [
     {
         "id": "wms111",
         "url": "/mapserv_proxy?SERVICE=WMS&VERSION=1.1.1&REQUEST=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": OGC_XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -792,6 +803,7 @@ GEOMAPFISH_URLMAP = [
     {
         "id": "wms130",
         "url": "/mapserv_proxy?SERVICE=WMS&VERSION=1.3.0&REQUEST=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": OGC_XML_MIMETYPES,
         "is_json": False,
         "version": "1.3.0",
@@ -799,6 +811,7 @@ GEOMAPFISH_URLMAP = [
     {
         "id": "wfs200",
         "url": "/mapserv_proxy?SERVICE=WFS&VERSION=2.0.0&REQUEST=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": OGC_XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.0",
@@ -816,6 +829,7 @@ GETSDIPORTAL_URLMAP = [
     {
         "id": "wms111",
         "url": "/geoserver/ows?service=WMS&version=1.1.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": OGC_XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -823,6 +837,7 @@ GETSDIPORTAL_URLMAP = [
     {
         "id": "wms130",
         "url": "/geoserver/ows?service=WMS&version=1.3.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": OGC_XML_MIMETYPES,
         "is_json": False,
         "version": "1.3.0",
@@ -830,6 +845,7 @@ GETSDIPORTAL_URLMAP = [
     {
         "id": "wfs100",
         "url": "/geoserver/ows?service=WFS&version=1.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": OGC_XML_MIMETYPES,
         "is_json": False,
         "version": "1.0.0",
@@ -837,6 +853,7 @@ GETSDIPORTAL_URLMAP = [
     {
         "id": "wfs110",
         "url": "/geoserver/ows?service=WFS&version=1.1.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": OGC_XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.0",
@@ -844,6 +861,7 @@ GETSDIPORTAL_URLMAP = [
     {
         "id": "wfs200",
         "url": "/geoserver/ows?service=WFS&version=2.0.0&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": OGC_XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.0",
@@ -851,6 +869,7 @@ GETSDIPORTAL_URLMAP = [
     {
         "id": "wcs111",
         "url": "/geoserver/ows?service=WCS&version=1.1.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": OGC_XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
@@ -858,6 +877,7 @@ GETSDIPORTAL_URLMAP = [
     {
         "id": "wcs201",
         "url": "/geoserver/ows?service=WCS&version=2.0.1&request=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": OGC_XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.1",
@@ -1084,6 +1104,7 @@ INGRID_URLMAP = [
     {
         "id": "csw202",
         "url": "/csw?SERVICE=CSW&VERSION=2.0.2&REQUEST=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.2",
@@ -1091,6 +1112,7 @@ INGRID_URLMAP = [
     {
         "id": "csw202",
         "url": "/interface/csw?SERVICE=CSW&VERSION=2.0.2&REQUEST=GetCapabilities",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": XML_MIMETYPES,
         "is_json": False,
         "version": "2.0.2",
@@ -1101,6 +1123,7 @@ ERDASAPOLLO_URLMAP = [
     {
         "id": "wms130",
         "url": "/erdas-iws/ogc/wms/?service=WMS&request=GetCapabilities&version=1.3.0",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": OGC_XML_MIMETYPES,
         "is_json": False,
         "version": "1.3.0",
@@ -1108,6 +1131,7 @@ ERDASAPOLLO_URLMAP = [
     {
         "id": "wms111",
         "url": "/erdas-iws/ogc/wms/?service=WMS&request=GetCapabilities&version=1.1.1",
+        "cache_ttl": CAPABILITIES_TTL,
         "expected_mime": OGC_XML_MIMETYPES,
         "is_json": False,
         "version": "1.1.1",
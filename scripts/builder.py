@@ -24,15 +24,21 @@ import csv
 import glob
 import json
 import os
+import pickle
 import shutil
 import pprint
 import tqdm
 import zstandard as zstd
 import duckdb
 import hashlib
+import heapq
 import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, OrderedDict
 from typing import List, Dict, Any, Optional
 
 from constants import (
@@ -55,6 +61,21 @@ from constants import (
     PATH_COUNTRY_ALLOWLIST,
     PATH_COUNTRY_ALIASES,
 )
+from duckdb_export import (
+    CATALOG_JSON_SCHEMA_PATH,
+    SOFTWARE_SCHEMA_PATH,
+    DuckDBTableSink,
+    columns_from_cerberus,
+    columns_from_json_schema,
+    create_catalog_child_tables,
+    create_indexes,
+    export_parquet,
+    export_quality_report_parquet,
+    load_schema,
+)
+from quality_regression import write_report_counts
+from record_store import RecordIndex, calculate_file_hash, canonical_link as canonicalize_url, index_entry, index_key
+from schema_validator import load_validator
 
 # Configure logging
 logging.basicConfig(
@@ -102,79 +123,6 @@ def load_jsonl(filepath):
     return data
 
 
-def load_jsonl_zst(filepath):
-    """Load and decompress JSONL.zst file"""
-    data = []
-    dctx = zstd.ZstdDecompressor()
-    with open(filepath, "rb") as f:
-        with dctx.stream_reader(f) as reader:
-            text_stream = reader.read().decode("utf-8")
-            for line in text_stream.strip().split("\n"):
-                if line:
-                    data.append(json.loads(line))
-    return data
-
-
-def normalize_for_duckdb(record: Dict[str, Any]) -> Dict[str, Any]:
-    """Convert nested structures (lists, dicts) to JSON strings for DuckDB compatibility.
-    
-    DuckDB can have issues inferring types from nested JSON structures, especially when
-    there are mixed types or when it tries to cast values incorrectly. By converting
-    complex nested structures to JSON strings, we avoid type inference issues.
-    
-    Also ensures boolean fields are properly typed.
-    """
-    normalized = {}
-    for key, value in record.items():
-        if isinstance(value, (dict, list)):
-            # Convert nested structures to JSON strings
-            normalized[key] = json.dumps(value, ensure_ascii=False)
-        elif key == 'api' and not isinstance(value, bool) and value is not None:
-            # Ensure 'api' field is always boolean or None
-            # If it's a string like 'dataset', convert to False
-            if isinstance(value, str):
-                logger.warning(f"Record {record.get('id', 'unknown')} has non-boolean 'api' value: {value}, converting to False")
-                normalized[key] = False
-            else:
-                normalized[key] = bool(value)
-        else:
-            # Keep primitive types as-is (str, int, float, bool, None)
-            normalized[key] = value
-    return normalized
-
-
-def compress_jsonl(input_path, output_path, compression_level=19):
-    """Compress JSONL file with zstandard compression"""
-    input_file = os.path.join(DATASETS_DIR, input_path)
-    output_file = os.path.join(DATASETS_DIR, output_path)
-    
-    # Get file size for progress bar
-    input_size = os.path.getsize(input_file)
-    
-    cctx = zstd.ZstdCompressor(level=compression_level)
-    with open(input_file, "rb") as ifh:
-        with open(output_file, "wb") as ofh:
-            with tqdm.tqdm(
-                total=input_size,
-                unit="B",
-                unit_scale=True,
-                desc=f"Compressing {os.path.basename(input_path)}",
-            ) as pbar:
-                compressor = cctx.stream_writer(ofh)
-                while True:
-                    chunk = ifh.read(8192)
-                    if not chunk:
-                        break
-                    compressor.write(chunk)
-                    pbar.update(len(chunk))
-                compressor.flush(zstd.FLUSH_FRAME)
-    logger.info(
-        "Compressed %s to %s",
-        os.path.basename(input_path),
-        os.path.basename(output_path),
-    )
-
-
 def verify_both_formats_exist(jsonl_filename):
     """Verify that both JSONL and JSONL.zst files exist"""
     jsonl_path = os.path.join(DATASETS_DIR, jsonl_filename)
@@ -204,45 +152,274 @@ def verify_both_formats_exist(jsonl_filename):
         return False
 
 
-def build_dataset(datapath, dataset_filename):
-    # Collect all YAML files first
+# zstd level of the .zst dumps: full (release) builds squeeze them at 19, which
+# takes about 25 s per 40 MB dump; incremental builds use 9 (under 1 s, ~17% larger)
+RELEASE_COMPRESSION_LEVEL = 19
+INCREMENTAL_COMPRESSION_LEVEL = 9
+
+
+class JsonlSink:
+    """Build sink writing a dataset as JSONL and, optionally, JSONL.zst in the same pass."""
+
+    def __init__(self, dataset_filename, compress=True, compression_level=RELEASE_COMPRESSION_LEVEL):
+        self.path = os.path.join(DATASETS_DIR, dataset_filename)
+        self.count = 0
+        self._out = open(self.path, "w", encoding="utf8")
+        self._compressor = None
+        if compress:
+            cctx = zstd.ZstdCompressor(level=compression_level, threads=-1)
+            self._compressor = cctx.stream_writer(open(self.path + ".zst", "wb"))
+
+    def write(self, line):
+        data = line + "\n"
+        self._out.write(data)
+        if self._compressor is not None:
+            self._compressor.write(data.encode("utf8"))
+        self.count += 1
+
+    def close(self):
+        self._out.close()
+        if self._compressor is not None:
+            self._compressor.flush(zstd.FLUSH_FRAME)
+            self._compressor.close()
+        logger.info("Wrote %d records to %s", self.count, os.path.basename(self.path))
+
+
+def resolve_workers(workers: int) -> int:
+    """Return the effective worker count; 0 or less means one per CPU core."""
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def list_yaml_files(datapath) -> List[str]:
+    """Return all YAML file paths under datapath, sorted for deterministic output."""
     all_files = []
     for root, dirs, files in os.walk(datapath):
         all_files.extend(
             [os.path.join(root, fi) for fi in files if fi.endswith(".yaml")]
         )
-    
-    out = open(os.path.join(DATASETS_DIR, dataset_filename), "w", encoding="utf8")
-    validation_errors = []
-    
+    return sorted(all_files)
+
+
+def _load_yaml_file(filename):
+    """Parse one YAML file. Module-level so it can run in a worker process."""
+    with open(filename, "r", encoding="utf8") as f:
+        return yaml.load(f, Loader=Loader)
+
+
+def iter_parsed_yaml(filenames: List[str], workers: int = 1):
+    """Yield (filename, data) pairs in input order, parsing in a process pool when workers > 1."""
+    if workers <= 1 or len(filenames) < 2:
+        for filename in filenames:
+            yield filename, _load_yaml_file(filename)
+        return
+    chunksize = max(1, len(filenames) // (workers * 16))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from zip(filenames, pool.map(_load_yaml_file, filenames, chunksize=chunksize))
+
+
+BUILD_MANIFEST_VERSION = 1
+
+
+def get_manifest_path(dataset_filename):
+    """Return the build manifest path for a dataset (catalogs.jsonl -> catalogs.manifest.jsonl)."""
+    stem = os.path.basename(dataset_filename).rsplit(".", 1)[0]
+    return os.path.join(DATASETS_DIR, f"{stem}.manifest.jsonl")
+
+
+def load_build_manifest(dataset_filename) -> Dict[str, Dict[str, Any]]:
+    """Load manifest entries keyed by relative YAML path. Returns {} if missing or outdated."""
+    manifest_path = get_manifest_path(dataset_filename)
+    if not os.path.exists(manifest_path):
+        return {}
+    entries = {}
+    with open(manifest_path, "r", encoding="utf8") as f:
+        header = f.readline()
+        try:
+            if json.loads(header).get("version") != BUILD_MANIFEST_VERSION:
+                return {}
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry["path"]] = entry
+        except (json.JSONDecodeError, AttributeError, KeyError):
+            logger.warning("Ignoring unreadable build manifest %s", manifest_path)
+            return {}
+    return entries
+
+
+def save_build_manifest(dataset_filename, entries: List[Dict[str, Any]]):
+    """Write manifest entries (path, mtime, size, hash, line) for the next incremental build."""
+    manifest_path = get_manifest_path(dataset_filename)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf8") as f:
+        f.write(json.dumps({"version": BUILD_MANIFEST_VERSION}) + "\n")
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, manifest_path)
+
+
+def hash_paths(paths, salt: str) -> str:
+    """MD5 over salt and the relative names and contents of files (directories walked); missing paths count too."""
+    digest = hashlib.md5(salt.encode())
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(root, fi) for root, _, names in os.walk(path) for fi in names)
+        elif os.path.exists(path):
+            files = [path]
+        else:
+            digest.update(f"missing:{os.path.basename(path)}".encode())
+            continue
+        for filename in files:
+            digest.update(os.path.relpath(filename, _REPO_ROOT).encode())
+            with open(filename, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+# Code and schemas that shape the build outputs besides the YAML records
+BUILD_FINGERPRINT_PATHS = [
+    os.path.abspath(__file__),
+    os.path.join(_SCRIPT_DIR, "duckdb_export.py"),
+    os.path.join(_REPO_ROOT, "data", "schemes"),
+]
+
+# Files every complete build leaves in DATASETS_DIR
+BUILD_OUTPUTS = [
+    f"{name}{suffix}"
+    for name in ("software.jsonl", "catalogs.jsonl", "scheduled.jsonl", "full.jsonl")
+    for suffix in ("", ".zst")
+] + ["datasets.duckdb", "full.parquet"]
+
+
+def get_build_state_path():
+    return os.path.join(DATASETS_DIR, "build_state.json")
+
+
+def build_is_current(
+    scans, partitioned: bool = False, compression_level: int = INCREMENTAL_COMPRESSION_LEVEL
+) -> bool:
+    """True when no YAML file changed since the last complete build and its outputs are all there.
+
+    Outputs compressed at a lower zstd level than compression_level count as out of date.
+    """
+    if any(stale_files or removed for _, _, stale_files, removed in scans):
+        return False
+    try:
+        with open(get_build_state_path(), "r", encoding="utf8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if state.get("fingerprint") != hash_paths(BUILD_FINGERPRINT_PATHS, "build"):
+        return False
+    if partitioned and not state.get("partitioned"):
+        return False
+    if state.get("compression_level", RELEASE_COMPRESSION_LEVEL) < compression_level:
+        return False
+    return all(os.path.exists(os.path.join(DATASETS_DIR, name)) for name in BUILD_OUTPUTS)
+
+
+def scan_dataset(datapath, dataset_filename, incremental: bool = False):
+    """Compare the YAML tree under datapath with its build manifest.
+
+    Returns (all_files, entries, stale_files, removed): manifest entries keyed
+    by relative path, with cached lines kept where mtime/size or content hash
+    match, the files that must be parsed again, and the number of manifest
+    entries whose file is gone. Without incremental every file is stale.
+    """
+    all_files = list_yaml_files(datapath)
+    cached_entries = load_build_manifest(dataset_filename) if incremental else {}
+
+    entries = {}
+    stale_files = []
+    for filename in all_files:
+        rel_path = os.path.relpath(filename, datapath)
+        stat = os.stat(filename)
+        cached = cached_entries.get(rel_path)
+        if cached and cached["mtime"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            entries[rel_path] = cached
+            continue
+        content_hash = calculate_file_hash(filename)
+        if cached and cached["hash"] == content_hash:
+            entries[rel_path] = dict(cached, mtime=stat.st_mtime_ns)
+            continue
+        entries[rel_path] = {
+            "path": rel_path,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": content_hash,
+            "line": None,
+        }
+        stale_files.append(filename)
+    removed = len(set(cached_entries) - set(entries))
+    return all_files, entries, stale_files, removed
+
+
+def build_dataset(datapath, dataset_filename, workers: int = 1, incremental: bool = False, sinks=None, scan=None):
+    """Write one JSON line per YAML record under datapath.
+
+    Each line is passed to every sink in order (objects with write(line));
+    the caller owns and closes the sinks. Without sinks, a plain JSONL file
+    DATASETS_DIR/dataset_filename is written.
+
+    Every run records a manifest of (path, mtime, size, content hash, JSON line).
+    With incremental=True, files whose mtime/size or content hash match the
+    manifest are not parsed again; their cached lines are spliced back in order.
+    scan is a scan_dataset() result to reuse. Returns the manifest entries in
+    path order.
+    """
+    if scan is None:
+        scan = scan_dataset(datapath, dataset_filename, incremental=incremental)
+    all_files, entries, stale_files, removed = scan
+
+    if incremental:
+        logger.info(
+            "%s: reusing %d cached records, parsing %d changed files, dropping %d removed",
+            os.path.basename(dataset_filename),
+            len(all_files) - len(stale_files),
+            len(stale_files),
+            removed,
+        )
+
     with tqdm.tqdm(
-        total=len(all_files),
+        total=len(stale_files),
         desc=f"Building {os.path.basename(dataset_filename)}",
         unit="files",
     ) as pbar:
-        for filename in all_files:
-            f = open(filename, "r", encoding="utf8")
-            data = yaml.load(f, Loader=Loader)
-            f.close()
-            
-            # Skip records without id (invalid catalog entries)
-            if not data or not data.get("id"):
-                pbar.update(1)
-                continue
-
-            # Validate software profile if building software dataset
-            if dataset_filename == "software.jsonl" and data:
-                issues = validate_software_profile(data)
-                if issues:
-                    rel_path = os.path.relpath(filename, datapath)
-                    for issue in issues:
-                        issue["file_path"] = rel_path
-                        issue["record_id"] = data.get("id", "unknown")
-                        validation_errors.append(issue)
-            
-            out.write(json.dumps(data, ensure_ascii=False) + "\n")
+        for filename, data in iter_parsed_yaml(stale_files, workers):
+            # Records without id (invalid catalog entries) are remembered but not written
+            if data and data.get("id"):
+                entries[os.path.relpath(filename, datapath)]["line"] = json.dumps(data, ensure_ascii=False)
             pbar.update(1)
-    out.close()
+
+    own_sinks = sinks is None
+    if own_sinks:
+        sinks = [JsonlSink(dataset_filename, compress=False)]
+    validation_errors = []
+    for filename in all_files:
+        rel_path = os.path.relpath(filename, datapath)
+        line = entries[rel_path]["line"]
+        if line is None:
+            continue
+
+        # Validate software profile if building software dataset
+        if dataset_filename == "software.jsonl":
+            data = json.loads(line)
+            issues = validate_software_profile(data)
+            if issues:
+                for issue in issues:
+                    issue["file_path"] = rel_path
+                    issue["record_id"] = data.get("id", "unknown")
+                    validation_errors.append(issue)
+
+        for sink in sinks:
+            sink.write(line)
+    if own_sinks:
+        for sink in sinks:
+            sink.close()
+    manifest = [entries[os.path.relpath(fn, datapath)] for fn in all_files]
+    save_build_manifest(dataset_filename, manifest)
     
     if validation_errors:
         logger.warning(f"Found {len(validation_errors)} validation issues in software profiles:")
@@ -252,45 +429,7 @@ def build_dataset(datapath, dataset_filename):
             logger.warning(f"  ... and {len(validation_errors) - 10} more issues")
     
     logger.info("Processed %d files", len(all_files))
-
-
-def merge_datasets(list_datasets, result_file):
-    # Count total lines for progress bar
-    total_lines = 0
-    for filename in list_datasets:
-        filepath = os.path.join(DATASETS_DIR, filename)
-        if os.path.exists(filepath):
-            with open(filepath, "r", encoding="utf8") as f:
-                total_lines += sum(1 for _ in f)
-    
-    out = open(os.path.join(DATASETS_DIR, result_file), "w", encoding="utf8")
-    processed_lines = 0
-    with tqdm.tqdm(
-        total=total_lines,
-        desc=f"Merging to {os.path.basename(result_file)}",
-        unit="lines",
-    ) as pbar:
-        for filename in list_datasets:
-            logger.info("adding %s", os.path.basename(filename).split(".", 1)[0])
-            filepath = os.path.join(DATASETS_DIR, filename)
-            if os.path.exists(filepath):
-                f = open(filepath, "r", encoding="utf8")
-                for line in f:
-                    line = line.rstrip()
-                    if not line:
-                        pbar.update(1)
-                        continue
-                    try:
-                        record = json.loads(line)
-                        if record and record.get("id"):
-                            out.write(line + "\n")
-                            processed_lines += 1
-                    except json.JSONDecodeError:
-                        out.write(line + "\n")
-                        processed_lines += 1
-                    pbar.update(1)
-                f.close()
-    out.close()
+    return manifest
 
 
 @app.command()
@@ -300,138 +439,156 @@ def build(
         "--jsonld",
         help="Emit data/datasets/catalogs.jsonld with JSON-LD framing",
     ),
+    workers: int = typer.Option(
+        0,
+        "--workers",
+        help="Processes used to parse YAML (0 = one per CPU core, 1 = serial)",
+    ),
+    incremental: bool = typer.Option(
+        True,
+        "--incremental/--full",
+        help="Re-parse only YAML files changed since the last build manifest (--full re-parses everything)",
+    ),
+    partitioned: bool = typer.Option(
+        False,
+        "--partitioned",
+        help="Also write Hive-partitioned Parquet (country=XX/catalog_type=...) to data/datasets/full_partitioned/",
+    ),
+    compression_level: Optional[int] = typer.Option(
+        None,
+        "--compression-level",
+        help=(
+            f"zstd level of the .zst dumps (default {INCREMENTAL_COMPRESSION_LEVEL} for incremental builds, "
+            f"{RELEASE_COMPRESSION_LEVEL} with --full; use --full for release builds)"
+        ),
+    ),
 ):
     """Build datasets as JSONL from entities as YAML"""
+    workers = resolve_workers(workers)
+    if compression_level is None:
+        compression_level = INCREMENTAL_COMPRESSION_LEVEL if incremental else RELEASE_COMPRESSION_LEVEL
+
+    scans = {
+        dataset_filename: scan_dataset(datapath, dataset_filename, incremental=incremental)
+        for datapath, dataset_filename in (
+            (SOFTWARE_DIR, "software.jsonl"),
+            (ROOT_DIR, "catalogs.jsonl"),
+            (SCHEDULED_DIR, "scheduled.jsonl"),
+        )
+    }
+    if incremental and build_is_current(scans.values(), partitioned=partitioned, compression_level=compression_level):
+        # Rewriting every dump and the DuckDB database is pointless when nothing changed
+        for dataset_filename, (_, entries, _, _) in scans.items():
+            save_build_manifest(dataset_filename, list(entries.values()))
+        logger.info("No YAML changes since the last build, outputs are up to date")
+    else:
+        build_outputs(
+            scans, workers=workers, incremental=incremental, partitioned=partitioned,
+            compression_level=compression_level,
+        )
+
+    if jsonld:
+        from jsonld_export import export_catalogs_jsonld
+
+        exported = export_catalogs_jsonld()
+        logger.info(
+            "Exported %d catalog records to %s",
+            exported,
+            os.path.join(DATASETS_DIR, "catalogs.jsonld"),
+        )
+
+
+def build_outputs(
+    scans,
+    workers: int = 1,
+    incremental: bool = False,
+    partitioned: bool = False,
+    compression_level: int = RELEASE_COMPRESSION_LEVEL,
+):
+    """Write every JSONL/zstd dump, the DuckDB database and Parquet from scan_dataset() results."""
+    # A build that stops half way must not look complete to the next one
+    if os.path.exists(get_build_state_path()):
+        os.remove(get_build_state_path())
+
+    # Every artifact is produced from one read of the YAML tree: each record
+    # line is fanned out to the JSONL/zstd writers and the DuckDB table sinks.
+    db_path = os.path.join(DATASETS_DIR, "datasets.duckdb")
+    logger.info("Building DuckDB database at %s", db_path)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    conn = duckdb.connect(db_path)
+
     logger.info("Started building software dataset")
-    build_dataset(SOFTWARE_DIR, "software.jsonl")
-    logger.info(
-        "Finished building software dataset. File saved as %s",
-        os.path.join(DATASETS_DIR, "software.jsonl"),
+    software_jsonl = JsonlSink("software.jsonl", compression_level=compression_level)
+    software_table = DuckDBTableSink(
+        conn, "software", columns_from_cerberus(load_schema(SOFTWARE_SCHEMA_PATH))
     )
-    
-    logger.info("Compressing software dataset")
-    compress_jsonl("software.jsonl", "software.jsonl.zst")
+    build_dataset(
+        SOFTWARE_DIR, "software.jsonl", workers=workers, incremental=incremental,
+        sinks=[software_jsonl, software_table], scan=scans["software.jsonl"],
+    )
+    software_jsonl.close()
+    software_table.close()
     verify_both_formats_exist("software.jsonl")
-    
+
+    full_jsonl = JsonlSink("full.jsonl", compression_level=compression_level)
+    catalogs_table = DuckDBTableSink(
+        conn, "catalogs", columns_from_json_schema(load_schema(CATALOG_JSON_SCHEMA_PATH))
+    )
+
     logger.info("Started building catalogs dataset")
-    build_dataset(ROOT_DIR, "catalogs.jsonl")
-    logger.info(
-        "Finished building catalogs dataset. File saved as %s",
-        os.path.join(DATASETS_DIR, "catalogs.jsonl"),
+    catalogs_jsonl = JsonlSink("catalogs.jsonl", compression_level=compression_level)
+    catalogs_manifest = build_dataset(
+        ROOT_DIR, "catalogs.jsonl", workers=workers, incremental=incremental,
+        sinks=[catalogs_jsonl, full_jsonl, catalogs_table], scan=scans["catalogs.jsonl"],
     )
-    
-    logger.info("Compressing catalogs dataset")
-    compress_jsonl("catalogs.jsonl", "catalogs.jsonl.zst")
+    catalogs_jsonl.close()
     verify_both_formats_exist("catalogs.jsonl")
-    
+
     logger.info("Started building scheduled dataset")
-    build_dataset(SCHEDULED_DIR, "scheduled.jsonl")
-    logger.info(
-        "Finished building scheduled dataset. File saved as %s",
-        os.path.join(DATASETS_DIR, "scheduled.jsonl"),
+    scheduled_jsonl = JsonlSink("scheduled.jsonl", compression_level=compression_level)
+    scheduled_manifest = build_dataset(
+        SCHEDULED_DIR, "scheduled.jsonl", workers=workers, incremental=incremental,
+        sinks=[scheduled_jsonl, full_jsonl, catalogs_table], scan=scans["scheduled.jsonl"],
     )
-    
-    logger.info("Compressing scheduled dataset")
-    compress_jsonl("scheduled.jsonl", "scheduled.jsonl.zst")
+    scheduled_jsonl.close()
     verify_both_formats_exist("scheduled.jsonl")
-    
-    merge_datasets(["catalogs.jsonl", "scheduled.jsonl"], "full.jsonl")
+
+    full_jsonl.close()
+    verify_both_formats_exist("full.jsonl")
+
+    # Lookup sidecar for tools that need id/uid/URL/host/re3data lookups
+    with RecordIndex(os.path.join(DATASETS_DIR, "record_index.sqlite")) as record_index:
+        record_index.update_from_manifest("entities", ROOT_DIR, catalogs_manifest)
+        record_index.update_from_manifest("scheduled", SCHEDULED_DIR, scheduled_manifest)
     logger.info(
         "Merged datasets %s as %s",
         ",".join(["catalogs.jsonl", "scheduled.jsonl"]),
         "full.jsonl",
     )
-    
-    logger.info("Compressing full dataset")
-    compress_jsonl("full.jsonl", "full.jsonl.zst")
-    verify_both_formats_exist("full.jsonl")
-    
-    # Build DuckDB database
-    db_path = os.path.join(DATASETS_DIR, "datasets.duckdb")
-    logger.info("Building DuckDB database at %s", db_path)
-    
-    # Remove existing database if it exists
-    if os.path.exists(db_path):
-        os.remove(db_path)
-    
-    conn = duckdb.connect(db_path)
-    
-    # Create catalogs table from full.jsonl.zst
-    logger.info("Creating catalogs table from full.jsonl.zst")
-    full_jsonl_zst_path = os.path.join(DATASETS_DIR, "full.jsonl.zst")
-    
-    # Decompress and load into DuckDB
-    # DuckDB can read JSONL directly, but we need to handle decompression
-    # We'll decompress to a temporary file or use DuckDB's JSON reading
-    with tqdm.tqdm(desc="Loading catalogs into DuckDB", unit="records") as pbar:
-        # Read compressed file and insert into DuckDB
-        dctx = zstd.ZstdDecompressor()
-        temp_data = []
-        with open(full_jsonl_zst_path, "rb") as f:
-            with dctx.stream_reader(f) as reader:
-                text_stream = reader.read().decode("utf-8")
-                for line in text_stream.strip().split("\n"):
-                    if line:
-                        record = json.loads(line)
-                        # Normalize nested structures to JSON strings to avoid type inference issues
-                        normalized_record = normalize_for_duckdb(record)
-                        temp_data.append(normalized_record)
-                        pbar.update(1)
-        
-        # Create table from JSON data
-        if temp_data:
-            import pandas as pd
-            df = pd.DataFrame(temp_data)
-            conn.execute("CREATE TABLE catalogs AS SELECT * FROM df")
-            logger.info("Created catalogs table with %d records", len(temp_data))
-    
-    # Create software table from software.jsonl.zst
-    logger.info("Creating software table from software.jsonl.zst")
-    software_jsonl_zst_path = os.path.join(DATASETS_DIR, "software.jsonl.zst")
-    
-    with tqdm.tqdm(desc="Loading software into DuckDB", unit="records") as pbar:
-        dctx = zstd.ZstdDecompressor()
-        temp_data = []
-        with open(software_jsonl_zst_path, "rb") as f:
-            with dctx.stream_reader(f) as reader:
-                text_stream = reader.read().decode("utf-8")
-                for line in text_stream.strip().split("\n"):
-                    if line:
-                        record = json.loads(line)
-                        # Normalize nested structures to JSON strings to avoid type inference issues
-                        normalized_record = normalize_for_duckdb(record)
-                        temp_data.append(normalized_record)
-                        pbar.update(1)
-        
-        if temp_data:
-            import pandas as pd
-            df = pd.DataFrame(temp_data)
-            conn.execute("CREATE TABLE software AS SELECT * FROM df")
-            logger.info("Created software table with %d records", len(temp_data))
-    
+
+    catalogs_table.close()
+    create_catalog_child_tables(conn)
+    create_indexes(conn)
+
+    parquet_path = os.path.join(DATASETS_DIR, "full.parquet")
+    logger.info("Building final parquet file %s", parquet_path)
+    export_parquet(
+        conn,
+        parquet_path,
+        partitioned_dir=os.path.join(DATASETS_DIR, "full_partitioned") if partitioned else None,
+    )
     conn.close()
     logger.info("DuckDB database created successfully at %s", db_path)
-    
-    # Keep existing parquet file generation
-    logger.info(
-        "Building final parquet file %s", os.path.join(DATASETS_DIR, "full.parquet")
-    )
-    os.system(
-        "duckdb -c \"copy '%s' to '%s'  (FORMAT 'parquet', COMPRESSION 'zstd');\""
-        % (
-            os.path.join(DATASETS_DIR, "full.jsonl"),
-            os.path.join(DATASETS_DIR, "full.parquet"),
-        )
-    )
-
-    if jsonld:
-        from jsonld_export import export_catalogs_jsonld
 
-        exported = export_catalogs_jsonld()
-        logger.info(
-            "Exported %d catalog records to %s",
-            exported,
-            os.path.join(DATASETS_DIR, "catalogs.jsonld"),
+    with open(get_build_state_path(), "w", encoding="utf8") as f:
+        json.dump(
+            {
+                "fingerprint": hash_paths(BUILD_FINGERPRINT_PATHS, "build"),
+                "partitioned": partitioned,
+                "compression_level": compression_level,
+            },
+            f,
         )
 
 
@@ -625,19 +782,27 @@ def assign(
         assign_by_dir("temp", SCHEDULED_DIR, dryrun=dryrun)
 
 
+CATALOG_SCHEMA_FILE = os.path.join(_REPO_ROOT, "data", "schemes", "catalog.json")
+
+_catalog_validator = None
+
+
+def catalog_validator():
+    """Compiled validator for the Cerberus catalog schema, built once per process."""
+    global _catalog_validator
+    if _catalog_validator is None:
+        _catalog_validator = load_validator(CATALOG_SCHEMA_FILE)
+    return _catalog_validator
+
+
 @app.command()
 def validate():
     """Validates the built JSONL export (full.jsonl) against the Cerberus catalog schema."""
-    from cerberus import Validator
-
-    schema_file = os.path.join(_REPO_ROOT, "data", "schemes", "catalog.json")
-    f = open(schema_file, "r", encoding="utf8")
-    schema = json.load(f)
-    f.close()
     records = load_jsonl(os.path.join(DATASETS_DIR, "full.jsonl"))
     typer.echo("Loaded %d data catalog records" % (len(records)))
 
-    v = Validator(schema)
+    v = catalog_validator()
+    schema = v.schema
     errors = []
     total = 0
     valid = 0
@@ -702,6 +867,128 @@ def _validate_yaml_files(filenames: List[str], schema: dict, v) -> tuple:
     return errors, total, valid
 
 
+def _validate_yaml_chunk(filenames: List[str]) -> tuple:
+    """Worker: validate a chunk of YAML files with this process's catalog validator."""
+    v = catalog_validator()
+    return _validate_yaml_files(filenames, v.schema, v)
+
+
+def validate_yaml_files(filenames: List[str], workers: int = 1) -> tuple:
+    """Validate YAML files against the catalog schema, in a process pool when workers > 1.
+
+    Returns (errors, total, valid) with errors in input order.
+    """
+    chunk_size = max(1, len(filenames) // (max(workers, 1) * 16))
+    chunks = [filenames[i:i + chunk_size] for i in range(0, len(filenames), chunk_size)]
+    if workers <= 1 or len(chunks) < 2:
+        results = map(_validate_yaml_chunk, chunks)
+        return _merge_validation_results(results)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _merge_validation_results(pool.map(_validate_yaml_chunk, chunks))
+
+
+def _merge_validation_results(results) -> tuple:
+    errors = []
+    total = 0
+    valid = 0
+    for chunk_errors, chunk_total, chunk_valid in results:
+        errors.extend(chunk_errors)
+        total += chunk_total
+        valid += chunk_valid
+    return errors, total, valid
+
+
+VALIDATION_CACHE_VERSION = 1
+
+# Inputs of schema validation besides the YAML file; any change invalidates the cache
+VALIDATION_FINGERPRINT_PATHS = [
+    CATALOG_SCHEMA_FILE,
+    os.path.join(_SCRIPT_DIR, "schema_validator.py"),
+]
+
+
+def validation_fingerprint() -> str:
+    """Hash of the catalog schema and the validator code."""
+    digest = hashlib.md5(f"validation-cache-v{VALIDATION_CACHE_VERSION}".encode())
+    for filename in VALIDATION_FINGERPRINT_PATHS:
+        with open(filename, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def get_validation_cache_path():
+    return os.path.join(DATASETS_DIR, "validation_cache.pickle")
+
+
+def validate_yaml_cached(filenames: List[str], workers: int = 1, incremental: bool = True) -> tuple:
+    """validate_yaml_files() that reuses cached results of unchanged files.
+
+    Results are cached per path relative to the repository root with mtime,
+    size and content hash, under validation_fingerprint(); a file whose content
+    matches any cached file (e.g. one moved from scheduled to entities) reuses
+    that result. With incremental=False every file is re-validated, but cached
+    entries of other files are kept. Returns (errors, total, valid, reused).
+    """
+    fingerprint = validation_fingerprint()
+    cache_path = get_validation_cache_path()
+    cached = load_pickle_cache(cache_path, fingerprint)
+    entries = {key: entry for key, entry in cached.items() if os.path.exists(os.path.join(_REPO_ROOT, key))}
+    if not incremental:
+        cached = {}
+    by_hash = {entry["hash"]: entry for entry in cached.values()}
+    results = {}
+    stale_files = []
+    for filename in filenames:
+        key = os.path.relpath(filename, _REPO_ROOT)
+        stat = os.stat(filename)
+        entry = cached.get(key)
+        if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            results[filename] = entry["error"]
+            continue
+        content_hash = calculate_file_hash(filename)
+        match = entry if entry and entry["hash"] == content_hash else by_hash.get(content_hash)
+        if match is not None:
+            entries[key] = dict(match, mtime=stat.st_mtime_ns, size=stat.st_size)
+            results[filename] = match["error"]
+            continue
+        entries[key] = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "hash": content_hash}
+        stale_files.append(filename)
+
+    stale_errors, _, _ = validate_yaml_files(stale_files, workers)
+    stale_errors = dict(stale_errors)
+    for filename in stale_files:
+        results[filename] = stale_errors.get(filename)
+        entries[os.path.relpath(filename, _REPO_ROOT)]["error"] = results[filename]
+    save_pickle_cache(cache_path, fingerprint, entries)
+
+    errors = [(filename, results[filename]) for filename in filenames if results[filename] is not None]
+    return errors, len(filenames), len(filenames) - len(errors), len(filenames) - len(stale_files)
+
+
+def changed_yaml_files(ref: str) -> Optional[List[str]]:
+    """Entity and scheduled YAML files added or modified since a git ref, including uncommitted and untracked ones.
+
+    Returns None when the catalog schema itself changed, since then every file
+    needs validating.
+    """
+    roots = [os.path.relpath(path, _REPO_ROOT) for path in (ROOT_DIR, SCHEDULED_DIR)]
+    schema_path = os.path.relpath(CATALOG_SCHEMA_FILE, _REPO_ROOT)
+    commands = [
+        ["git", "diff", "--name-only", "--diff-filter=d", ref, "--", schema_path, *roots],
+        ["git", "ls-files", "--others", "--exclude-standard", "--", *roots],
+    ]
+    names = []
+    for command in commands:
+        result = subprocess.run(command, cwd=_REPO_ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise ValueError(result.stderr.strip() or f"{' '.join(command)} failed")
+        names.extend(result.stdout.splitlines())
+    if schema_path.replace(os.sep, "/") in names:
+        return None
+    paths = {os.path.normpath(os.path.join(_REPO_ROOT, name)) for name in names if name.endswith(".yaml")}
+    return sorted(path for path in paths if os.path.exists(path))
+
+
 @app.command()
 def validate_yaml(
     file: Optional[str] = typer.Option(
@@ -715,19 +1002,30 @@ def validate_yaml(
         "--id", "-i",
         help="Catalog ID to validate (finds {id}.yaml in entities and scheduled)",
     ),
+    workers: int = typer.Option(
+        0,
+        "--workers",
+        help="Processes used to parse and validate YAML (0 = one per CPU core, 1 = serial)",
+    ),
+    changed_since: Optional[str] = typer.Option(
+        None,
+        "--changed-since",
+        help="Validate entity and scheduled YAML changed since this git ref (plus uncommitted and untracked files)",
+    ),
+    stdin_paths: bool = typer.Option(
+        False,
+        "--stdin-paths",
+        help="Validate the YAML paths read from stdin, one per line",
+    ),
+    incremental: bool = typer.Option(
+        True,
+        "--incremental/--full",
+        help="Reuse cached results for files whose content and the schema are unchanged",
+    ),
 ):
-    """Validates YAML files against Cerberus schema. Without --file or --id, validates all entities."""
-    from cerberus import Validator
-
-    schema_file = os.path.join(_REPO_ROOT, "data", "schemes", "catalog.json")
-    f = open(schema_file, "r", encoding="utf8")
-    schema = json.load(f)
-    f.close()
-
-    v = Validator(schema)
-    errors = []
-    total = 0
-    valid = 0
+    """Validates YAML files against Cerberus schema. Without --file, --id, --changed-since or --stdin-paths, validates all entities."""
+    workers = resolve_workers(workers)
+    filenames = None
 
     if file is not None:
         # Single file path
@@ -741,7 +1039,7 @@ def validate_yaml(
             typer.echo(f"Error: File must be a YAML file: {path}", err=True)
             raise typer.Exit(1)
         typer.echo(f"Validating single file: {path}")
-        errors, total, valid = _validate_yaml_files([path], schema, v)
+        filenames = [path]
     elif id is not None:
         # Find by catalog ID
         pattern = os.path.join("**", f"{id}.yaml")
@@ -756,8 +1054,34 @@ def validate_yaml(
         if len(candidates) > 1:
             typer.echo(f"Found {len(candidates)} files for id '{id}', validating all")
         typer.echo(f"Validating: {', '.join(candidates)}")
-        errors, total, valid = _validate_yaml_files(candidates, schema, v)
-    else:
+        filenames = candidates
+    elif changed_since is not None:
+        # Files touched since a git ref; a schema change means everything
+        try:
+            filenames = changed_yaml_files(changed_since)
+        except ValueError as e:
+            typer.echo(f"Error: {e}", err=True)
+            raise typer.Exit(1)
+        if filenames is None:
+            typer.echo(f"Catalog schema changed since {changed_since}; validating all entities")
+        else:
+            typer.echo(f"Validating {len(filenames)} YAML files changed since {changed_since}")
+    elif stdin_paths:
+        # Paths piped in by a pre-commit hook or CI, relative to the repository root
+        filenames = []
+        for line in sys.stdin:
+            path = os.path.normpath(line.strip())
+            if not line.strip() or not path.endswith(".yaml"):
+                continue
+            if not os.path.isabs(path):
+                path = os.path.join(_REPO_ROOT, path)
+            if not os.path.exists(path):
+                typer.echo(f"Skipping missing file: {path}", err=True)
+                continue
+            filenames.append(path)
+        typer.echo(f"Validating {len(filenames)} YAML files from stdin")
+
+    if filenames is None:
         # All entities
         typer.echo("Validating YAML files in entities directory...")
         filenames = []
@@ -765,10 +1089,12 @@ def validate_yaml(
             filenames.extend(
                 os.path.join(root, fi) for fi in files if fi.endswith(".yaml")
             )
-        errors, total, valid = _validate_yaml_files(filenames, schema, v)
+    errors, total, valid, reused = validate_yaml_cached(filenames, workers, incremental)
 
     typer.echo(f"\nValidation complete:")
     typer.echo(f"  Total files: {total}")
+    if incremental:
+        typer.echo(f"  Re-validated: {total - reused} ({reused} unchanged, reused from cache)")
     typer.echo(f"  Valid: {valid}")
     typer.echo(f"  Errors: {len(errors)}")
 
@@ -3089,59 +3415,29 @@ def _validate_url_format(url, field_path, issue_type):
     return None
 
 
-def canonicalize_url(url):
-    """Normalize URL for duplicate comparison."""
-    if not url or not isinstance(url, str):
-        return None
-    raw = url.strip()
-    if not raw:
-        return None
+def link_keeper_score(link):
+    """Link part of score_duplicate_keeper(); analyze_quality stores it per record as link_score."""
+    score = 0
     try:
-        parsed = urlparse(raw)
+        parsed = urlparse(link or "")
     except Exception:
-        return None
-    if not parsed.scheme or not parsed.netloc:
-        return None
-
-    scheme = (parsed.scheme or "").lower()
+        return score
+    if (parsed.scheme or "").lower() == "https":
+        score += 100
     host = (parsed.hostname or "").lower()
-    if host.startswith("www."):
-        host = host[4:]
-    if not host:
-        return None
-
-    port = parsed.port
-    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
-        host = f"{host}:{port}"
-
-    path = parsed.path or ""
-    if path == "/":
-        path = ""
-    elif path.endswith("/"):
-        path = path.rstrip("/")
-
-    query = f"?{parsed.query}" if parsed.query else ""
-    return f"{scheme}://{host}{path}{query}"
+    if host and not host.startswith("www."):
+        score += 50
+    # Prefer cleaner shorter paths among equivalent hosts
+    score -= min(len(parsed.path or ""), 40)
+    return score
 
 
 def score_duplicate_keeper(meta):
     """Higher score = preferred keeper when resolving duplicate link groups."""
-    link = meta.get("link") or ""
     file_path = (meta.get("file_path") or "").replace("\\", "/")
-    score = 0
-    try:
-        parsed = urlparse(link)
-    except Exception:
-        parsed = None
-
-    if parsed:
-        if (parsed.scheme or "").lower() == "https":
-            score += 100
-        host = (parsed.hostname or "").lower()
-        if host and not host.startswith("www."):
-            score += 50
-        # Prefer cleaner shorter paths among equivalent hosts
-        score -= min(len(parsed.path or ""), 40)
+    score = meta.get("link_score")
+    if score is None:
+        score = link_keeper_score(meta.get("link"))
 
     normalized_path = file_path.lower()
     if normalized_path.startswith("unknown/") or "/unknown/" in normalized_path:
@@ -3160,6 +3456,23 @@ def choose_duplicate_keeper(metas):
     return max(metas, key=score_duplicate_keeper)
 
 
+def _index_duplicate_groups(groups, column, records_metadata):
+    """(shared column value, metas) per RecordIndex.groups() group, in the order analyze_quality walked the files.
+
+    records_metadata maps index path keys to duplicate-rule metadata; groups
+    left with fewer than two analyzed records are dropped.
+    """
+    result = []
+    for rows in groups:
+        metas = sorted(
+            (records_metadata[row["path"]] for row in rows if row["path"] in records_metadata),
+            key=lambda meta: meta["position"],
+        )
+        if len(metas) > 1:
+            result.append((rows[0][column], metas))
+    return sorted(result, key=lambda group: group[1][0]["position"])
+
+
 def check_identifier_urls(record):
     """Validate identifier URLs when present."""
     issues = []
@@ -3791,20 +4104,31 @@ def get_cached_software_map():
     return _software_map_cache
 
 
-# Fix command helper functions
-def calculate_file_hash(file_path: str) -> Optional[str]:
-    """Calculate MD5 hash of a file."""
+def load_pickle_cache(cache_path: str, fingerprint: str) -> Dict[str, Dict[str, Any]]:
+    """Entries of a per-file pickle cache; {} if missing, unreadable or written under another fingerprint."""
+    if not os.path.exists(cache_path):
+        return {}
     try:
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        with open(cache_path, "rb") as f:
+            payload = pickle.load(f)
     except Exception as e:
-        logger.debug(f"Error calculating hash for {file_path}: {e}")
-        return None
+        logger.warning("Ignoring unreadable cache %s: %s", cache_path, e)
+        return {}
+    if payload.get("fingerprint") != fingerprint:
+        return {}
+    return payload.get("entries", {})
+
 
+def save_pickle_cache(cache_path: str, fingerprint: str, entries: Dict[str, Dict[str, Any]]):
+    """Atomically write a per-file pickle cache under fingerprint."""
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"fingerprint": fingerprint, "entries": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
 
+
+# Fix command helper functions
 def read_jsonl_issues(file_path: str) -> List[Dict[str, Any]]:
     """Read and parse JSONL file for issues."""
     records = []
@@ -3925,6 +4249,7 @@ class RecordStats:
     changed: bool = False
     error: Optional[str] = None
     changes_detail: Optional[Dict[str, List[Dict[str, Any]]]] = None
+    remaining_issues: Optional[int] = None
 
 
 @dataclass
@@ -3940,8 +4265,19 @@ class SummaryStats:
     total_fields_removed: int = 0
 
 
-def process_record(record: Dict[str, Any], stats: SummaryStats, current_index: int, base_dir: str) -> RecordStats:
-    """Process a single record with change detection."""
+def process_record(
+    record: Dict[str, Any],
+    stats: SummaryStats,
+    current_index: int,
+    base_dir: str,
+    quality_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> RecordStats:
+    """Process a single record with change detection.
+
+    When quality_cache (analyze-quality's per-file cache) is given, an edited
+    record is re-checked with only the rules that read a changed field and its
+    cache entry is updated.
+    """
     record_id = record.get('record_id', 'unknown')
     file_path_str = record.get('file_path', '')
     issues = record.get('issues', [])
@@ -4062,6 +4398,12 @@ def process_record(record: Dict[str, Any], stats: SummaryStats, current_index: i
             
         except Exception as e:
             logger.warning(f"  Warning: Could not detect detailed changes: {e}")
+
+        if quality_cache is not None:
+            try:
+                recheck_quality_entry(full_file_path, file_path_str, quality_cache, record_stats)
+            except Exception as e:
+                logger.warning(f"  Warning: Could not re-check quality rules: {e}")
     else:
         logger.info(f"  ○ No changes detected for {record_id}")
         logger.info(f"  File unchanged: {file_path_str}")
@@ -4070,6 +4412,29 @@ def process_record(record: Dict[str, Any], stats: SummaryStats, current_index: i
     return record_stats
 
 
+def recheck_quality_entry(
+    full_file_path: str, rel_file_path: str, quality_cache: Dict[str, Dict[str, Any]], record_stats: RecordStats
+) -> None:
+    """Re-run the quality rules affected by an edit and store the result in quality_cache."""
+    with open(full_file_path, "r", encoding="utf-8") as f:
+        record = yaml.load(f, Loader=Loader)
+    cached = quality_cache.get(rel_file_path) or {}
+    rule_stats = {}
+    result = analyze_quality_record(record, rel_file_path, rule_stats, cached.get("result"))
+    stat = os.stat(full_file_path)
+    quality_cache[rel_file_path] = {
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "hash": calculate_file_hash(full_file_path),
+        "result": result,
+    }
+    record_stats.remaining_issues = len(result["issues"])
+    logger.info(
+        f"  Re-checked {len(rule_stats)}/{len(QUALITY_RULES)} quality rules: "
+        f"{record_stats.remaining_issues} issue(s) remain"
+    )
+
+
 def detect_yaml_changes(before_dict: Dict[str, Any], after_dict: Dict[str, Any], path: str = "") -> Dict[str, List[Dict[str, Any]]]:
     """
     Recursively compare two YAML dictionaries and detect changes.
@@ -4142,111 +4507,301 @@ def detect_yaml_changes(before_dict: Dict[str, Any], after_dict: Dict[str, Any],
     return changes
 
 
-def generate_full_report(issues, records_with_issues, total_records, output_path):
-    """Generate the full comprehensive report."""
-    report_lines = []
-    report_lines.append("DATA QUALITY ANALYSIS REPORT")
-    report_lines.append("=" * 80)
-    report_lines.append(f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    report_lines.append(f"Total Records Analyzed: {total_records}")
-    report_lines.append(f"Total Issues Found: {len(issues)}")
-    report_lines.append(f"Records with Issues: {len(records_with_issues)}")
-    report_lines.append("")
-    
-    # Group issues by type
-    issues_by_type = {}
-    for issue in issues:
+REPORT_SPOOL_MAX_OPEN = 64
+REPORT_SORT_RUN_SIZE = 20000
+
+
+def _iter_pickles(path):
+    """Yield the objects pickled one after another into path."""
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+class IssueSpool:
+    """Append-only spool files of (sort key, issue) pairs, one per report group.
+
+    At most max_open spool files are open at once; the least recently used one
+    is closed when another group needs a handle. read_sorted() merges sorted
+    runs of at most run_size issues, so memory does not grow with the spool.
+    """
+
+    def __init__(self, spool_dir: str, max_open: int = REPORT_SPOOL_MAX_OPEN, run_size: int = REPORT_SORT_RUN_SIZE):
+        self.spool_dir = spool_dir
+        self.max_open = max_open
+        self.run_size = run_size
+        self._paths = {}
+        self._handles = OrderedDict()
+
+    def append(self, kind: str, group: str, sort_key: tuple, issue: Dict[str, Any]) -> None:
+        key = (kind, group)
+        handle = self._handles.get(key)
+        if handle is None:
+            if key not in self._paths:
+                self._paths[key] = os.path.join(self.spool_dir, f"{kind}-{len(self._paths)}.pickle")
+            if len(self._handles) >= self.max_open:
+                _, oldest = self._handles.popitem(last=False)
+                oldest.close()
+            handle = open(self._paths[key], "ab")
+            self._handles[key] = handle
+        else:
+            self._handles.move_to_end(key)
+        pickle.dump((sort_key, issue), handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def groups(self, kind: str) -> List[str]:
+        """Groups of one kind in first-append order."""
+        return [group for spool_kind, group in self._paths if spool_kind == kind]
+
+    def close_handles(self) -> None:
+        while self._handles:
+            _, handle = self._handles.popitem(last=False)
+            handle.close()
+
+    def read_sorted(self, kind: str, group: str):
+        """Yield a group's issues ordered by sort key (external merge sort)."""
+        path = self._paths.get((kind, group))
+        if path is None:
+            return
+        self.close_handles()
+        runs = []
+        chunk = []
+        for item in _iter_pickles(path):
+            chunk.append(item)
+            if len(chunk) >= self.run_size:
+                runs.append(self._write_run(chunk))
+                chunk = []
+        chunk.sort(key=lambda item: item[0])
+        if not runs:
+            for _, issue in chunk:
+                yield issue
+            return
+        runs.append(self._write_run(chunk))
+        try:
+            for _, issue in heapq.merge(*(_iter_pickles(run) for run in runs), key=lambda item: item[0]):
+                yield issue
+        finally:
+            for run in runs:
+                os.remove(run)
+
+    def _write_run(self, chunk) -> str:
+        chunk.sort(key=lambda item: item[0])
+        fd, run_path = tempfile.mkstemp(suffix=".run", dir=self.spool_dir)
+        with os.fdopen(fd, "wb") as f:
+            for item in chunk:
+                pickle.dump(item, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return run_path
+
+
+class QualityReport:
+    """Issues of one analyze-quality run, streamed to disk as they are produced.
+
+    add_issue() writes each issue to full_report.jsonl and appends it to
+    per-country, per-priority and per-rule spools; the generate_*_report
+    functions read those back in report order. Only counters, the first
+    FULL_REPORT_SAMPLE issues per type and each record's unique issues (for
+    primary_priority.jsonl) stay in memory.
+    """
+
+    FULL_REPORT_SAMPLE = 50
+
+    def __init__(self, jsonl_path: str):
+        self.spool_dir = tempfile.mkdtemp(prefix="dataquality-spool-")
+        self.spool = IssueSpool(self.spool_dir)
+        self.jsonl = open(jsonl_path, "w", encoding="utf8")
+        self.jsonl_count = 0
+        self.total = 0
+        # Records with issues keyed by file path, in order of their first issue
+        self.records = {}
+        self.type_counts = Counter()
+        self.type_priority = {}
+        self.type_samples = defaultdict(list)
+        self.priority_counts = Counter()
+        self.type_priority_counts = Counter()
+        self.country_counts = Counter()
+        self.country_records = defaultdict(list)
+        self.country_type_counts = defaultdict(Counter)
+        self.priority_type_counts = defaultdict(Counter)
+        self.priority_country_counts = defaultdict(Counter)
+        self.rule_country_counts = defaultdict(Counter)
+        self.rule_record_counts = defaultdict(Counter)
+
+    def record_entry(self, record_id: str, file_path: str, country_codes: List[str]) -> Dict[str, Any]:
+        """Entry for a record with issues, created on its first issue."""
+        entry = self.records.get(file_path)
+        if entry is None:
+            entry = {
+                "record_id": record_id,
+                "file_path": file_path,
+                "country_code": country_codes[0],
+                "all_country_codes": country_codes,
+                "unique_issues": [],
+                "seq": len(self.records),
+            }
+            self.records[file_path] = entry
+            for country_code in country_codes:
+                self.country_records[country_code].append(file_path)
+        return entry
+
+    def add_issue(self, issue: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        seq = self.total
+        self.total += 1
         issue_type = issue["issue_type"]
-        if issue_type not in issues_by_type:
-            issues_by_type[issue_type] = []
-        issues_by_type[issue_type].append(issue)
-    
+        priority = issue.get("priority", "MEDIUM")
+        country_code = issue.get("country_code", "UNKNOWN")
+
+        try:
+            # Ensure all values are JSON-serializable
+            json_issue = {
+                "issue_type": issue.get("issue_type"),
+                "field": issue.get("field"),
+                "current_value": issue.get("current_value"),
+                "suggested_action": issue.get("suggested_action"),
+                "file_path": issue.get("file_path"),
+                "record_id": issue.get("record_id"),
+                "priority": issue.get("priority"),
+                "country_code": issue.get("country_code"),
+            }
+            self.jsonl.write(json.dumps(json_issue, ensure_ascii=False) + "\n")
+            self.jsonl_count += 1
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Failed to serialize issue for record {issue.get('record_id', 'unknown')}: {str(e)}")
+
+        self.type_counts[issue_type] += 1
+        self.type_priority.setdefault(issue_type, priority)
+        if len(self.type_samples[issue_type]) < self.FULL_REPORT_SAMPLE:
+            self.type_samples[issue_type].append(issue)
+        self.priority_counts[priority] += 1
+        self.type_priority_counts[(issue_type, priority)] += 1
+        self.country_counts[country_code] += 1
+        self.priority_type_counts[priority][issue_type] += 1
+        self.priority_country_counts[priority][country_code] += 1
+        self.rule_country_counts[issue_type][country_code] += 1
+        self.rule_record_counts[issue_type][issue.get("record_id", "unknown")] += 1
+
+        self.spool.append("priorities", priority, (issue_type, seq), issue)
+        self.spool.append("rules", issue_type, (seq,), issue)
+        # Country reports list a record's issues under every country it covers, in record order
+        issue_key = (issue_type, entry["seq"], len(entry["unique_issues"]))
+        for country in entry["all_country_codes"]:
+            self.spool.append("countries", country, issue_key, issue)
+            self.country_type_counts[country][issue_type] += 1
+        entry["unique_issues"].append(issue)
+
+    def countries(self) -> List[str]:
+        return self.spool.groups("countries")
+
+    def close(self) -> None:
+        self.spool.close_handles()
+        if not self.jsonl.closed:
+            self.jsonl.close()
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+
+def write_report_lines(path: str, lines) -> None:
+    """Write an iterable of lines like "\\n".join(lines), without building the string."""
+    with open(path, "w", encoding="utf8") as f:
+        for i, line in enumerate(lines):
+            if i:
+                f.write("\n")
+            f.write(line)
+
+
+def generate_full_report(report: QualityReport, total_records: int, output_path: str) -> None:
+    """Generate the full comprehensive report."""
+    write_report_lines(output_path, _full_report_lines(report, total_records))
+
+
+def _full_report_lines(report: QualityReport, total_records: int):
+    yield "DATA QUALITY ANALYSIS REPORT"
+    yield "=" * 80
+    yield f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    yield f"Total Records Analyzed: {total_records}"
+    yield f"Total Issues Found: {report.total}"
+    yield f"Records with Issues: {len(report.records)}"
+    yield ""
+
     # Report issues by type
-    report_lines.append("=== ISSUES BY TYPE ===")
-    report_lines.append("")
-    
-    for issue_type in sorted(issues_by_type.keys()):
-        issues_list = issues_by_type[issue_type]
-        report_lines.append(f"[{issue_type}]")
-        report_lines.append(f"Count: {len(issues_list)}")
-        report_lines.append(f"Priority: {issues_list[0].get('priority', 'MEDIUM')}")
-        report_lines.append("")
-        
-        for issue in issues_list[:50]:  # Limit to first 50 per type for readability
-            report_lines.append(f"File: {issue['file_path']}")
-            report_lines.append(f"Record ID: {issue['record_id']}")
-            report_lines.append(f"Country: {issue.get('country_code', 'UNKNOWN')}")
-            report_lines.append(f"Issue: {issue_type}")
-            report_lines.append(f"Field: {issue['field']}")
-            report_lines.append(f"Current Value: {issue['current_value']}")
-            report_lines.append(f"Suggested Action: {issue['suggested_action']}")
-            report_lines.append("")
-        
-        if len(issues_list) > 50:
-            n = len(issues_list) - 50
-            report_lines.append(f"... and {n} more record" + ("s" if n != 1 else "") + " with this issue")
-            report_lines.append("")
-    
+    yield "=== ISSUES BY TYPE ==="
+    yield ""
+
+    for issue_type in sorted(report.type_counts):
+        count = report.type_counts[issue_type]
+        yield f"[{issue_type}]"
+        yield f"Count: {count}"
+        yield f"Priority: {report.type_priority[issue_type]}"
+        yield ""
+
+        for issue in report.type_samples[issue_type]:  # Limit to first 50 per type for readability
+            yield f"File: {issue['file_path']}"
+            yield f"Record ID: {issue['record_id']}"
+            yield f"Country: {issue.get('country_code', 'UNKNOWN')}"
+            yield f"Issue: {issue_type}"
+            yield f"Field: {issue['field']}"
+            yield f"Current Value: {issue['current_value']}"
+            yield f"Suggested Action: {issue['suggested_action']}"
+            yield ""
+
+        if count > report.FULL_REPORT_SAMPLE:
+            n = count - report.FULL_REPORT_SAMPLE
+            yield f"... and {n} more record" + ("s" if n != 1 else "") + " with this issue"
+            yield ""
+
     # Summary by issue type
-    report_lines.append("")
-    report_lines.append("=== SUMMARY BY ISSUE TYPE ===")
-    report_lines.append("")
-    for issue_type in sorted(issues_by_type.keys()):
-        count = len(issues_by_type[issue_type])
-        priority = issues_by_type[issue_type][0].get("priority", "MEDIUM") if issues_by_type[issue_type] else "MEDIUM"
-        report_lines.append(f"{issue_type} ({priority}): {count} issue" + ("s" if count != 1 else ""))
-    
+    yield ""
+    yield "=== SUMMARY BY ISSUE TYPE ==="
+    yield ""
+    for issue_type in sorted(report.type_counts):
+        count = report.type_counts[issue_type]
+        yield f"{issue_type} ({report.type_priority[issue_type]}): {count} issue" + ("s" if count != 1 else "")
+
     # Summary by priority
-    report_lines.append("")
-    report_lines.append("=== SUMMARY BY PRIORITY ===")
-    report_lines.append("")
-    issues_by_priority = {}
-    for issue in issues:
-        priority = issue.get("priority", "MEDIUM")
-        if priority not in issues_by_priority:
-            issues_by_priority[priority] = []
-        issues_by_priority[priority].append(issue)
-    
-    for priority in ["CRITICAL", "IMPORTANT", "MEDIUM", "LOW"]:
-        if priority in issues_by_priority:
-            count = len(issues_by_priority[priority])
-            report_lines.append(f"{priority}: {count} issue" + ("s" if count != 1 else ""))
-    
-    # Records with multiple issues
-    report_lines.append("")
-    report_lines.append("=== RECORDS WITH MULTIPLE ISSUES (3+) ===")
-    report_lines.append("")
-    
-    multi_issue_records = {
-        rid: data for rid, data in records_with_issues.items() if len(data["issues"]) >= 3
-    }
-    
+    yield ""
+    yield "=== SUMMARY BY PRIORITY ==="
+    yield ""
+    for priority in PRIORITY_ORDER:
+        if priority in report.priority_counts:
+            count = report.priority_counts[priority]
+            yield f"{priority}: {count} issue" + ("s" if count != 1 else "")
+
+    # Records with multiple issues; each issue is counted once per country the record covers
+    yield ""
+    yield "=== RECORDS WITH MULTIPLE ISSUES (3+) ==="
+    yield ""
+
+    multi_issue_records = [
+        entry
+        for entry in report.records.values()
+        if len(entry["unique_issues"]) * len(entry["all_country_codes"]) >= 3
+    ]
+
     if multi_issue_records:
-        for record_id, data in sorted(multi_issue_records.items(), key=lambda x: len(x[1]["issues"]), reverse=True)[:100]:
-            report_lines.append(f"Record ID: {record_id}")
-            report_lines.append(f"File: {data['file_path']}")
-            report_lines.append(f"Country: {data.get('country_code', 'UNKNOWN')}")
-            report_lines.append(f"Issue Count: {len(data['issues'])}")
-            report_lines.append("Issues:")
-            for issue in data["issues"]:
-                report_lines.append(f"  - {issue['issue_type']} ({issue.get('priority', 'MEDIUM')}): {issue['field']}")
-            report_lines.append("")
+        multi_issue_records.sort(
+            key=lambda entry: len(entry["unique_issues"]) * len(entry["all_country_codes"]), reverse=True
+        )
+        for entry in multi_issue_records[:100]:
+            yield f"Record ID: {entry['record_id']}"
+            yield f"File: {entry['file_path']}"
+            yield f"Country: {entry['country_code']}"
+            yield f"Issue Count: {len(entry['unique_issues']) * len(entry['all_country_codes'])}"
+            yield "Issues:"
+            for issue in entry["unique_issues"]:
+                for _ in entry["all_country_codes"]:
+                    yield f"  - {issue['issue_type']} ({issue.get('priority', 'MEDIUM')}): {issue['field']}"
+            yield ""
     else:
-        report_lines.append("No records found with 3+ issues")
-    
-    # Write report to file
-    report_content = "\n".join(report_lines)
-    with open(output_path, "w", encoding="utf8") as f:
-        f.write(report_content)
+        yield "No records found with 3+ issues"
 
 
-def generate_country_reports(issues_by_country, records_by_country, output_dir):
+def generate_country_reports(report: QualityReport, output_dir: str) -> None:
     """Generate reports for each country."""
     countries_dir = os.path.join(output_dir, "countries")
     os.makedirs(countries_dir, exist_ok=True)
 
     # Remove stale reports for countries that no longer have issues
-    countries_with_issues = {c for c, issues in issues_by_country.items() if issues}
+    countries_with_issues = set(report.countries())
     if os.path.exists(countries_dir):
         for f in os.listdir(countries_dir):
             if f.endswith(".txt"):
@@ -4255,177 +4810,152 @@ def generate_country_reports(issues_by_country, records_by_country, output_dir):
                     stale_file = os.path.join(countries_dir, f)
                     os.remove(stale_file)
 
-    for country_code, country_issues in issues_by_country.items():
-        if not country_issues:
-            continue
-        
-        country_records = records_by_country.get(country_code, {})
-        
-        report_lines = []
-        report_lines.append(f"DATA QUALITY REPORT - COUNTRY: {country_code}")
-        report_lines.append("=" * 80)
-        report_lines.append(f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report_lines.append(f"Country Code: {country_code}")
-        report_lines.append(f"Total Records with Issues: {len(country_records)}")
-        report_lines.append(f"Total Issues Found: {len(country_issues)}")
-        report_lines.append("")
-        
-        # Group issues by type
-        issues_by_type = {}
-        for issue in country_issues:
-            issue_type = issue["issue_type"]
-            if issue_type not in issues_by_type:
-                issues_by_type[issue_type] = []
-            issues_by_type[issue_type].append(issue)
-        
-        # Report issues by type
-        report_lines.append("=== ISSUES BY TYPE ===")
-        report_lines.append("")
-        
-        for issue_type in sorted(issues_by_type.keys()):
-            issues_list = issues_by_type[issue_type]
-            report_lines.append(f"[{issue_type}]")
-            report_lines.append(f"Count: {len(issues_list)}")
-            report_lines.append(f"Priority: {issues_list[0].get('priority', 'MEDIUM')}")
-            report_lines.append("")
-            
-            for issue in issues_list[:100]:  # Show more for country-specific reports
-                report_lines.append(f"File: {issue['file_path']}")
-                report_lines.append(f"Record ID: {issue['record_id']}")
-                report_lines.append(f"Issue: {issue_type}")
-                report_lines.append(f"Field: {issue['field']}")
-                report_lines.append(f"Current Value: {issue['current_value']}")
-                report_lines.append(f"Suggested Action: {issue['suggested_action']}")
-                report_lines.append("")
-            
-            if len(issues_list) > 100:
-                n = len(issues_list) - 100
-                report_lines.append(f"... and {n} more record" + ("s" if n != 1 else "") + " with this issue")
-                report_lines.append("")
-        
-        # Summary by issue type
-        report_lines.append("")
-        report_lines.append("=== SUMMARY BY ISSUE TYPE ===")
-        report_lines.append("")
-        for issue_type in sorted(issues_by_type.keys()):
-            count = len(issues_by_type[issue_type])
-            report_lines.append(f"{issue_type}: {count} issue" + ("s" if count != 1 else ""))
-        
-        # Records with multiple issues
-        multi_issue_records = {
-            rid: data for rid, data in country_records.items() if len(data["issues"]) >= 3
-        }
-        
-        if multi_issue_records:
-            report_lines.append("")
-            report_lines.append("=== RECORDS WITH MULTIPLE ISSUES (3+) ===")
-            report_lines.append("")
-            for record_id, data in sorted(multi_issue_records.items(), key=lambda x: len(x[1]["issues"]), reverse=True)[:50]:
-                report_lines.append(f"Record ID: {record_id}")
-                report_lines.append(f"File: {data['file_path']}")
-                report_lines.append(f"Issue Count: {len(data['issues'])}")
-                report_lines.append("Issues:")
-                for issue in data["issues"]:
-                    report_lines.append(f"  - {issue['issue_type']}: {issue['field']}")
-                report_lines.append("")
-        
-        # Write country report
+    for country_code in report.countries():
         country_file = os.path.join(countries_dir, f"{country_code}.txt")
-        report_content = "\n".join(report_lines)
-        with open(country_file, "w", encoding="utf8") as f:
-            f.write(report_content)
+        write_report_lines(country_file, _country_report_lines(report, country_code))
 
 
-def generate_priority_reports(issues_by_priority, output_dir):
+def _country_report_lines(report: QualityReport, country_code: str):
+    type_counts = report.country_type_counts[country_code]
+    country_records = [report.records[path] for path in report.country_records[country_code]]
+
+    yield f"DATA QUALITY REPORT - COUNTRY: {country_code}"
+    yield "=" * 80
+    yield f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    yield f"Country Code: {country_code}"
+    yield f"Total Records with Issues: {len(country_records)}"
+    yield f"Total Issues Found: {sum(type_counts.values())}"
+    yield ""
+
+    # Report issues by type
+    yield "=== ISSUES BY TYPE ==="
+    yield ""
+
+    issue_type = None
+    shown = 0
+    for issue in report.spool.read_sorted("countries", country_code):
+        if issue["issue_type"] != issue_type:
+            if issue_type is not None:
+                yield from _more_issues_lines(type_counts[issue_type], 100)
+            issue_type = issue["issue_type"]
+            shown = 0
+            yield f"[{issue_type}]"
+            yield f"Count: {type_counts[issue_type]}"
+            yield f"Priority: {issue.get('priority', 'MEDIUM')}"
+            yield ""
+        if shown < 100:  # Show more for country-specific reports
+            shown += 1
+            yield f"File: {issue['file_path']}"
+            yield f"Record ID: {issue['record_id']}"
+            yield f"Issue: {issue_type}"
+            yield f"Field: {issue['field']}"
+            yield f"Current Value: {issue['current_value']}"
+            yield f"Suggested Action: {issue['suggested_action']}"
+            yield ""
+    if issue_type is not None:
+        yield from _more_issues_lines(type_counts[issue_type], 100)
+
+    # Summary by issue type
+    yield ""
+    yield "=== SUMMARY BY ISSUE TYPE ==="
+    yield ""
+    for issue_type in sorted(type_counts):
+        count = type_counts[issue_type]
+        yield f"{issue_type}: {count} issue" + ("s" if count != 1 else "")
+
+    # Records with multiple issues
+    multi_issue_records = [entry for entry in country_records if len(entry["unique_issues"]) >= 3]
+
+    if multi_issue_records:
+        yield ""
+        yield "=== RECORDS WITH MULTIPLE ISSUES (3+) ==="
+        yield ""
+        multi_issue_records.sort(key=lambda entry: len(entry["unique_issues"]), reverse=True)
+        for entry in multi_issue_records[:50]:
+            yield f"Record ID: {entry['record_id']}"
+            yield f"File: {entry['file_path']}"
+            yield f"Issue Count: {len(entry['unique_issues'])}"
+            yield "Issues:"
+            for issue in entry["unique_issues"]:
+                yield f"  - {issue['issue_type']}: {issue['field']}"
+            yield ""
+
+
+def _more_issues_lines(count: int, shown: int):
+    if count > shown:
+        n = count - shown
+        yield f"... and {n} more record" + ("s" if n != 1 else "") + " with this issue"
+        yield ""
+
+
+def generate_priority_reports(report: QualityReport, output_dir: str) -> None:
     """Generate reports for each priority level."""
     priorities_dir = os.path.join(output_dir, "priorities")
     os.makedirs(priorities_dir, exist_ok=True)
-    
-    for priority in ["CRITICAL", "IMPORTANT", "MEDIUM", "LOW"]:
-        priority_issues = issues_by_priority.get(priority, [])
-        report_lines = []
-        if not priority_issues:
-            report_lines.append(f"DATA QUALITY REPORT - PRIORITY: {priority}")
-            report_lines.append("=" * 80)
-            report_lines.append(f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            report_lines.append(f"Priority Level: {priority}")
-            report_lines.append(f"Total Issues Found: 0")
-            report_lines.append("")
-            report_lines.append("No issues at this priority level.")
-            priority_file = os.path.join(priorities_dir, f"{priority}.txt")
-            with open(priority_file, "w", encoding="utf8") as f:
-                f.write("\n".join(report_lines))
-            continue
 
-        report_lines = []
-        report_lines.append(f"DATA QUALITY REPORT - PRIORITY: {priority}")
-        report_lines.append("=" * 80)
-        report_lines.append(f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report_lines.append(f"Priority Level: {priority}")
-        report_lines.append(f"Total Issues Found: {len(priority_issues)}")
-        report_lines.append("")
-        
-        # Group issues by type
-        issues_by_type = {}
-        for issue in priority_issues:
-            issue_type = issue["issue_type"]
-            if issue_type not in issues_by_type:
-                issues_by_type[issue_type] = []
-            issues_by_type[issue_type].append(issue)
-        
-        # Report issues by type
-        report_lines.append("=== ISSUES BY TYPE ===")
-        report_lines.append("")
-        
-        for issue_type in sorted(issues_by_type.keys()):
-            issues_list = issues_by_type[issue_type]
-            report_lines.append(f"[{issue_type}]")
-            report_lines.append(f"Count: {len(issues_list)}")
-            report_lines.append("")
-            
-            for issue in issues_list[:100]:
-                report_lines.append(f"File: {issue['file_path']}")
-                report_lines.append(f"Record ID: {issue['record_id']}")
-                report_lines.append(f"Country: {issue.get('country_code', 'UNKNOWN')}")
-                report_lines.append(f"Issue: {issue_type}")
-                report_lines.append(f"Field: {issue['field']}")
-                report_lines.append(f"Current Value: {issue['current_value']}")
-                report_lines.append(f"Suggested Action: {issue['suggested_action']}")
-                report_lines.append("")
-            
-            if len(issues_list) > 100:
-                n = len(issues_list) - 100
-                report_lines.append(f"... and {n} more record" + ("s" if n != 1 else "") + " with this issue")
-                report_lines.append("")
-        
-        # Summary by issue type
-        report_lines.append("")
-        report_lines.append("=== SUMMARY BY ISSUE TYPE ===")
-        report_lines.append("")
-        for issue_type in sorted(issues_by_type.keys()):
-            count = len(issues_by_type[issue_type])
-            report_lines.append(f"{issue_type}: {count} issue" + ("s" if count != 1 else ""))
-        
-        # Summary by country
-        report_lines.append("")
-        report_lines.append("=== SUMMARY BY COUNTRY ===")
-        report_lines.append("")
-        issues_by_country = {}
-        for issue in priority_issues:
-            country_code = issue.get("country_code", "UNKNOWN")
-            if country_code not in issues_by_country:
-                issues_by_country[country_code] = []
-            issues_by_country[country_code].append(issue)
-        
-        for country_code in sorted(issues_by_country.keys()):
-            count = len(issues_by_country[country_code])
-            report_lines.append(f"{country_code}: {count} issue" + ("s" if count != 1 else ""))
-        
-        # Write priority report
+    for priority in PRIORITY_ORDER:
         priority_file = os.path.join(priorities_dir, f"{priority}.txt")
-        report_content = "\n".join(report_lines)
-        with open(priority_file, "w", encoding="utf8") as f:
-            f.write(report_content)
+        write_report_lines(priority_file, _priority_report_lines(report, priority))
+
+
+def _priority_report_lines(report: QualityReport, priority: str):
+    total = report.priority_counts.get(priority, 0)
+    yield f"DATA QUALITY REPORT - PRIORITY: {priority}"
+    yield "=" * 80
+    yield f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    yield f"Priority Level: {priority}"
+    yield f"Total Issues Found: {total}"
+    yield ""
+    if not total:
+        yield "No issues at this priority level."
+        return
+
+    type_counts = report.priority_type_counts[priority]
+
+    # Report issues by type
+    yield "=== ISSUES BY TYPE ==="
+    yield ""
+
+    issue_type = None
+    shown = 0
+    for issue in report.spool.read_sorted("priorities", priority):
+        if issue["issue_type"] != issue_type:
+            if issue_type is not None:
+                yield from _more_issues_lines(type_counts[issue_type], 100)
+            issue_type = issue["issue_type"]
+            shown = 0
+            yield f"[{issue_type}]"
+            yield f"Count: {type_counts[issue_type]}"
+            yield ""
+        if shown < 100:
+            shown += 1
+            yield f"File: {issue['file_path']}"
+            yield f"Record ID: {issue['record_id']}"
+            yield f"Country: {issue.get('country_code', 'UNKNOWN')}"
+            yield f"Issue: {issue_type}"
+            yield f"Field: {issue['field']}"
+            yield f"Current Value: {issue['current_value']}"
+            yield f"Suggested Action: {issue['suggested_action']}"
+            yield ""
+    if issue_type is not None:
+        yield from _more_issues_lines(type_counts[issue_type], 100)
+
+    # Summary by issue type
+    yield ""
+    yield "=== SUMMARY BY ISSUE TYPE ==="
+    yield ""
+    for issue_type in sorted(type_counts):
+        count = type_counts[issue_type]
+        yield f"{issue_type}: {count} issue" + ("s" if count != 1 else "")
+
+    # Summary by country
+    yield ""
+    yield "=== SUMMARY BY COUNTRY ==="
+    yield ""
+    country_counts = report.priority_country_counts[priority]
+    for country_code in sorted(country_counts):
+        count = country_counts[country_code]
+        yield f"{country_code}: {count} issue" + ("s" if count != 1 else "")
 
 
 RULE_DESCRIPTIONS = {
@@ -4518,85 +5048,17 @@ RULE_DESCRIPTIONS = {
     ),
 }
 
-def generate_rule_reports(issues_by_type, output_dir):
-    """Generate reports for each issue type (rule)."""
+def generate_rule_reports(report: QualityReport, output_dir: str) -> int:
+    """Generate reports for each issue type (rule); returns the number of issues written."""
     rules_dir = os.path.join(output_dir, "rules")
     os.makedirs(rules_dir, exist_ok=True)
 
-    for issue_type in sorted(issues_by_type.keys()):
-        issues_list = issues_by_type[issue_type]
-        if not issues_list:
-            continue
-
-        priority = issues_list[0].get("priority", "MEDIUM")
-        report_lines = []
-        report_lines.append(f"DATA QUALITY REPORT - RULE: {issue_type}")
-        report_lines.append("=" * 80)
-        report_lines.append(f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report_lines.append(f"Issue Type: {issue_type}")
-        report_lines.append(f"Priority: {priority}")
-        report_lines.append(f"Total Issues Found: {len(issues_list)}")
-        rule_desc = RULE_DESCRIPTIONS.get(issue_type)
-        if not rule_desc and issue_type.startswith("SOFTWARE_EXPECTED_ENDPOINTS_MISSING_"):
-            software_suffix = issue_type.replace("SOFTWARE_EXPECTED_ENDPOINTS_MISSING_", "").lower()
-            rule_desc = (
-                f"Identifies records using software.id='{software_suffix}' (API-capable per software definitions) "
-                "that have no endpoints listed. Add at least one API endpoint for discovery and integration."
-            )
-        if rule_desc:
-            report_lines.append("")
-            report_lines.append(f"Rule: {rule_desc}")
-        report_lines.append("")
-
-        # Summary by country
-        issues_by_country = {}
-        for issue in issues_list:
-            country = issue.get("country_code", "UNKNOWN")
-            issues_by_country[country] = issues_by_country.get(country, 0) + 1
-
-        report_lines.append("=== SUMMARY BY COUNTRY ===")
-        report_lines.append("")
-        for country_code in sorted(issues_by_country.keys()):
-            c = issues_by_country[country_code]
-            report_lines.append(f"{country_code}: {c} issue" + ("s" if c != 1 else ""))
-        report_lines.append("")
-
-        # Summary by record
-        issues_by_record = {}
-        for issue in issues_list:
-            rid = issue.get("record_id", "unknown")
-            issues_by_record[rid] = issues_by_record.get(rid, 0) + 1
-
-        report_lines.append("=== SUMMARY BY RECORD ===")
-        report_lines.append("")
-        for rid, count in sorted(issues_by_record.items(), key=lambda x: x[1], reverse=True):
-            report_lines.append(f"{rid}: {count} issue" + ("s" if count != 1 else ""))
-        report_lines.append("")
-
-        # List all issues (no limit)
-        report_lines.append("=== ISSUES ===")
-        report_lines.append("")
-        for issue in issues_list:
-            report_lines.append(f"File: {issue['file_path']}")
-            report_lines.append(f"Record ID: {issue['record_id']}")
-            report_lines.append(f"Country: {issue.get('country_code', 'UNKNOWN')}")
-            report_lines.append(f"Issue: {issue_type}")
-            report_lines.append(f"Field: {issue['field']}")
-            current_val = issue["current_value"]
-            if isinstance(current_val, dict):
-                current_val_str = json.dumps(current_val, ensure_ascii=False)
-            else:
-                current_val_str = str(current_val) if current_val is not None else ""
-            report_lines.append(f"Current Value: {current_val_str}")
-            report_lines.append(f"Suggested Action: {issue['suggested_action']}")
-            report_lines.append("")
-
+    written = Counter()
+    for issue_type in sorted(report.type_counts):
         # Write rule report with sanitized filename
         safe_name = re.sub(r"[^A-Za-z0-9_-]+", "_", issue_type)
         rule_file = os.path.join(rules_dir, f"{safe_name}.txt")
-        report_content = "\n".join(report_lines)
-        with open(rule_file, "w", encoding="utf8") as f:
-            f.write(report_content)
+        write_report_lines(rule_file, _rule_report_lines(report, issue_type, written))
 
     # Remove stale rule reports for issue types that now have 0 issues
     known_issue_types = (
@@ -4606,7 +5068,7 @@ def generate_rule_reports(issues_by_type, output_dir):
         + ISSUE_PRIORITY_MAP.get("LOW", [])
     )
     for issue_type in known_issue_types:
-        if issues_by_type.get(issue_type):
+        if report.type_counts.get(issue_type):
             continue
         safe_name = re.sub(r"[^A-Za-z0-9_-]+", "_", issue_type)
         rule_file = os.path.join(rules_dir, f"{safe_name}.txt")
@@ -4621,14 +5083,488 @@ def generate_rule_reports(issues_by_type, output_dir):
     # Remove stale SOFTWARE_EXPECTED_ENDPOINTS_MISSING_* rule files with 0 issues
     for rule_path in glob.glob(os.path.join(rules_dir, "SOFTWARE_EXPECTED_ENDPOINTS_MISSING_*.txt")):
         stem = os.path.basename(rule_path)[:-4]  # strip .txt
-        if not issues_by_type.get(stem):
+        if not report.type_counts.get(stem):
             os.remove(rule_path)
 
+    return sum(written.values())
+
+
+def _rule_report_lines(report: QualityReport, issue_type: str, written: Counter):
+    yield f"DATA QUALITY REPORT - RULE: {issue_type}"
+    yield "=" * 80
+    yield f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    yield f"Issue Type: {issue_type}"
+    yield f"Priority: {report.type_priority[issue_type]}"
+    yield f"Total Issues Found: {report.type_counts[issue_type]}"
+    rule_desc = RULE_DESCRIPTIONS.get(issue_type)
+    if not rule_desc and issue_type.startswith("SOFTWARE_EXPECTED_ENDPOINTS_MISSING_"):
+        software_suffix = issue_type.replace("SOFTWARE_EXPECTED_ENDPOINTS_MISSING_", "").lower()
+        rule_desc = (
+            f"Identifies records using software.id='{software_suffix}' (API-capable per software definitions) "
+            "that have no endpoints listed. Add at least one API endpoint for discovery and integration."
+        )
+    if rule_desc:
+        yield ""
+        yield f"Rule: {rule_desc}"
+    yield ""
+
+    # Summary by country
+    country_counts = report.rule_country_counts[issue_type]
+    yield "=== SUMMARY BY COUNTRY ==="
+    yield ""
+    for country_code in sorted(country_counts):
+        c = country_counts[country_code]
+        yield f"{country_code}: {c} issue" + ("s" if c != 1 else "")
+    yield ""
+
+    # Summary by record
+    yield "=== SUMMARY BY RECORD ==="
+    yield ""
+    for rid, count in sorted(report.rule_record_counts[issue_type].items(), key=lambda x: x[1], reverse=True):
+        yield f"{rid}: {count} issue" + ("s" if count != 1 else "")
+    yield ""
+
+    # List all issues (no limit)
+    yield "=== ISSUES ==="
+    yield ""
+    for issue in report.spool.read_sorted("rules", issue_type):
+        written[issue_type] += 1
+        yield f"File: {issue['file_path']}"
+        yield f"Record ID: {issue['record_id']}"
+        yield f"Country: {issue.get('country_code', 'UNKNOWN')}"
+        yield f"Issue: {issue_type}"
+        yield f"Field: {issue['field']}"
+        current_val = issue["current_value"]
+        if isinstance(current_val, dict):
+            current_val_str = json.dumps(current_val, ensure_ascii=False)
+        else:
+            current_val_str = str(current_val) if current_val is not None else ""
+        yield f"Current Value: {current_val_str}"
+        yield f"Suggested Action: {issue['suggested_action']}"
+        yield ""
+
+
+PRIORITY_ORDER = ["CRITICAL", "IMPORTANT", "MEDIUM", "LOW"]
+
+
+@dataclass(frozen=True)
+class QualityRule:
+    """Registry entry for one per-record check run by analyze-quality.
+
+    issue_types are the codes the check can emit (SOFTWARE_EXPECTED_ENDPOINTS_MISSING
+    also covers its per-software suffixes), fields the top-level record keys it
+    reads (including the _file_path/_directory helpers), and cost a rough class
+    (cheap, moderate, expensive) from rule_profile.json measurements.
+    """
+
+    check: Any
+    issue_types: tuple
+    fields: tuple
+    cost: str = "cheap"
+
+    @property
+    def id(self) -> str:
+        return self.check.__name__[len("check_"):].upper()
+
+    @property
+    def priority(self) -> str:
+        """Highest priority among the issue types the rule can emit."""
+        return min((get_priority_level(t) for t in self.issue_types), key=PRIORITY_ORDER.index)
+
+    @property
+    def track(self) -> str:
+        """enrichment when every issue type is enrichment debt, otherwise integrity."""
+        if all(is_enrichment_issue_type(t) for t in self.issue_types):
+            return "enrichment"
+        return "integrity"
+
+
+# Per-record quality rules run by analyze-quality, in report order
+QUALITY_RULES = [
+    QualityRule(check_missing_topics, ("MISSING_TOPICS",), ("topics",), "cheap"),
+    QualityRule(check_missing_tags, ("MISSING_TAGS",), ("tags",), "cheap"),
+    QualityRule(check_missing_description, ("MISSING_DESCRIPTION",), ("description",), "cheap"),
+    QualityRule(check_missing_langs, ("MISSING_LANGS",), ("langs",), "cheap"),
+    QualityRule(check_missing_endpoints, ("MISSING_ENDPOINTS",), ("api", "endpoints"), "cheap"),
+    QualityRule(
+        check_software_expected_endpoints,
+        ("SOFTWARE_EXPECTED_ENDPOINTS_MISSING",),
+        ("api", "endpoints", "link", "software", "status"),
+        "cheap",
+    ),
+    QualityRule(
+        check_owner_info,
+        (
+            "MISSING_OWNER_LINK",
+            "MISSING_OWNER_LOCATION",
+            "MISSING_OWNER_NAME",
+            "MISSING_OWNER_TYPE",
+            "OWNER_LOCATION_SUBREGION_REQUIRED",
+            "OWNER_SUBREGION_FEDERAL_DIRECTORY_MISMATCH",
+            "PLACEHOLDER_OWNER_NAME",
+        ),
+        ("owner", "_file_path"),
+        "moderate",
+    ),
+    QualityRule(check_coverage, ("MISSING_COVERAGE",), ("coverage",), "cheap"),
+    QualityRule(
+        check_placeholder_values,
+        ("PLACEHOLDER_CATALOG_TYPE", "PLACEHOLDER_SOFTWARE", "PLACEHOLDER_STATUS"),
+        ("catalog_type", "software", "status"),
+        "cheap",
+    ),
+    QualityRule(
+        check_urls,
+        ("INVALID_URL", "INVALID_OWNER_URL", "INVALID_ENDPOINT_URL", "INVALID_CATALOG_EXPORT_URL"),
+        ("link", "owner", "endpoints", "catalog_export"),
+        "expensive",
+    ),
+    QualityRule(
+        check_required_fields,
+        ("MISSING_REQUIRED_FIELD",),
+        ("id", "uid", "name", "link", "catalog_type", "status", "software", "owner"),
+        "cheap",
+    ),
+    QualityRule(check_identifiers, ("INCOMPLETE_IDENTIFIER",), ("identifiers",), "cheap"),
+    QualityRule(check_license_completeness, ("INCONSISTENT_LICENSE",), ("rights",), "cheap"),
+    QualityRule(
+        check_api_status_coherence,
+        ("API_STATUS_MISMATCH", "MISSING_API_STATUS"),
+        ("api", "api_status", "endpoints"),
+        "cheap",
+    ),
+    QualityRule(
+        check_content_types_access_mode,
+        ("MISSING_ACCESS_MODE", "MISSING_CONTENT_TYPES"),
+        ("access_mode", "content_types"),
+        "cheap",
+    ),
+    QualityRule(check_language_validation, ("INVALID_LANGUAGE",), ("langs",), "cheap"),
+    QualityRule(
+        check_coverage_normalization,
+        ("COVERAGE_NORMALIZATION", "DUPLICATE_COVERAGE"),
+        ("coverage",),
+        "cheap",
+    ),
+    QualityRule(
+        check_software_normalization,
+        ("SOFTWARE_ID_UNKNOWN", "SOFTWARE_NAME_MISMATCH"),
+        ("software",),
+        "cheap",
+    ),
+    QualityRule(
+        check_catalog_software_coherence,
+        ("CATALOG_SOFTWARE_MISMATCH",),
+        ("catalog_type", "software"),
+        "cheap",
+    ),
+    QualityRule(
+        check_tag_topic_hygiene,
+        ("DUPLICATE_TAGS", "TAG_HYGIENE", "TOPIC_INCOMPLETE", "TOPIC_SCHEMA_VIOLATION"),
+        ("tags", "topics"),
+        "moderate",
+    ),
+    QualityRule(check_description_quality, ("SHORT_DESCRIPTION",), ("description",), "cheap"),
+    QualityRule(check_uid_id_consistency, ("INVALID_ID", "INVALID_UID"), ("id", "uid"), "cheap"),
+    QualityRule(check_contact_info, ("MISSING_CONTACT_INFO",), ("access_mode", "owner", "status"), "cheap"),
+    QualityRule(
+        check_status_directory_uid_consistency,
+        ("STATUS_DIRECTORY_MISMATCH",),
+        ("status", "uid", "_directory"),
+        "cheap",
+    ),
+    QualityRule(
+        check_status_api_status_coherence_extended,
+        ("STATUS_API_STATUS_MISMATCH",),
+        ("api_status", "endpoints", "status"),
+        "cheap",
+    ),
+    QualityRule(check_title_quality, ("PLACEHOLDER_TITLE",), ("link", "name"), "expensive"),
+    QualityRule(check_rights_completeness, ("RIGHTS_INCOMPLETE",), ("rights",), "cheap"),
+    QualityRule(
+        check_subregion_unk_placeholder,
+        ("SUBREGION_UNK_PLACEHOLDER",),
+        ("coverage", "owner", "_file_path"),
+        "moderate",
+    ),
+    QualityRule(
+        check_subregion_iso3166_2,
+        ("SUBREGION_INVALID_ISO3166_2",),
+        ("coverage", "owner"),
+        "moderate",
+    ),
+    QualityRule(check_access_mode_values, ("INVALID_ACCESS_MODE",), ("access_mode",), "cheap"),
+    QualityRule(check_catalog_type_values, ("INVALID_CATALOG_TYPE",), ("catalog_type",), "cheap"),
+    QualityRule(check_status_values, ("INVALID_STATUS",), ("status",), "cheap"),
+    QualityRule(check_api_status_values, ("INVALID_API_STATUS",), ("api_status",), "cheap"),
+    QualityRule(check_trust_score_bounds, ("TRUST_SCORE_OUT_OF_BOUNDS",), ("trust_score",), "cheap"),
+    QualityRule(check_identifier_urls, ("INVALID_IDENTIFIER_URL",), ("identifiers",), "cheap"),
+    QualityRule(check_rights_urls, ("INVALID_RIGHTS_URL",), ("rights",), "cheap"),
+    QualityRule(
+        check_catalog_type_directory,
+        ("CATALOG_TYPE_DIRECTORY_MISMATCH",),
+        ("catalog_type", "_file_path"),
+        "cheap",
+    ),
+    QualityRule(check_country_codes, ("INVALID_COUNTRY_CODE",), ("coverage", "owner"), "moderate"),
+    QualityRule(
+        check_country_subregion_name_consistency,
+        ("COUNTRY_NAME_ID_MISMATCH", "SUBREGION_NAME_ID_MISMATCH"),
+        ("coverage", "owner"),
+        "expensive",
+    ),
+    QualityRule(
+        check_unknown_country_macroregion,
+        ("UNKNOWN_COUNTRY_OR_MACROREGION",),
+        ("coverage", "owner"),
+        "moderate",
+    ),
+    QualityRule(
+        check_owner_type_values,
+        ("INVALID_OWNER_TYPE", "OWNER_TYPE_NONCANONICAL"),
+        ("owner",),
+        "cheap",
+    ),
+    QualityRule(
+        check_path_country_consistency,
+        ("PATH_COUNTRY_MISMATCH",),
+        ("coverage", "owner", "_file_path"),
+        "cheap",
+    ),
+]
+
+
+def record_field_hashes(record: Dict[str, Any]) -> Dict[str, str]:
+    """MD5 of each top-level field value, used to tell which fields an edit touched."""
+    return {
+        key: hashlib.md5(json.dumps(value, sort_keys=True, default=str).encode("utf8")).hexdigest()
+        for key, value in record.items()
+        if not key.startswith("_")
+    }
+
+
+def changed_fields(before: Dict[str, str], after: Dict[str, str]) -> set:
+    """Top-level fields added, removed or modified between two record_field_hashes() results."""
+    return {key for key in before.keys() | after.keys() if before.get(key) != after.get(key)}
+
+
+def rules_for_fields(fields) -> List[QualityRule]:
+    """Rules that read any of the given top-level fields, in report order."""
+    fields = set(fields)
+    return [rule for rule in QUALITY_RULES if fields.intersection(rule.fields)]
+
+
+def analyze_quality_record(record, rel_file_path, rule_stats=None, previous=None):
+    """Run QUALITY_RULES on one record and return its report entry.
+
+    Issues carry file_path, record_id, priority and the primary country_code.
+    When rule_stats is a dict, each rule's seconds, calls and issues are added
+    to rule_stats[rule.id]. previous is an earlier entry for the same file: only
+    rules reading a field that changed since then are run, the other rules'
+    issues are carried over.
+    """
+    record_id = record.get("id", "unknown")
+    country_codes = extract_country_codes(record)
+    primary_country = country_codes[0] if country_codes else "UNKNOWN"
+    field_hashes = record_field_hashes(record)
+
+    # Attach helper metadata for advanced checks
+    record["_file_path"] = rel_file_path
+    record["_country_codes"] = country_codes
+    record["_directory"] = "entities"
+
+    if previous is not None and "field_hashes" in previous:
+        rules_to_run = {rule.id for rule in rules_for_fields(changed_fields(previous["field_hashes"], field_hashes))}
+    else:
+        rules_to_run = None
+
+    issues = []
+    rule_issues_by_id = {}
+    for rule in QUALITY_RULES:
+        if rules_to_run is not None and rule.id not in rules_to_run:
+            rule_issues = [dict(issue) for issue in previous["rule_issues"].get(rule.id, [])]
+        else:
+            if rule_stats is not None:
+                started = time.perf_counter()
+            result = rule.check(record)
+            rule_issues = (result if isinstance(result, list) else [result]) if result else []
+            if rule_stats is not None:
+                stats = rule_stats.setdefault(rule.id, {"seconds": 0.0, "calls": 0, "issues": 0})
+                stats["seconds"] += time.perf_counter() - started
+                stats["calls"] += 1
+                stats["issues"] += len(rule_issues)
+        for issue in rule_issues:
+            issue["file_path"] = rel_file_path
+            issue["record_id"] = record_id
+            issue["priority"] = get_priority_level(issue["issue_type"])
+            issue["country_code"] = primary_country
+            issues.append(issue)
+        if rule_issues:
+            rule_issues_by_id[rule.id] = rule_issues
+
+    return {
+        "record_id": record_id,
+        "file_path": rel_file_path,
+        "country_codes": country_codes,
+        "link": record.get("link"),
+        # Record index row and keeper score for the duplicate rules, computed once per changed record
+        "index_entry": index_entry(record),
+        "link_score": link_keeper_score(record.get("link")),
+        "issues": issues,
+        "field_hashes": field_hashes,
+        "rule_issues": rule_issues_by_id,
+    }
+
+
+def _analyze_quality_chunk(items):
+    """Worker: analyze a chunk of (YAML file, previous entry) pairs, returning ([(rel path, record entry)], per-rule stats).
+
+    Empty files yield a None entry; files that fail to parse or check are logged and left out.
+    """
+    results = []
+    rule_stats = {}
+    for filename, previous in items:
+        rel_file_path = os.path.relpath(filename, ROOT_DIR)
+        try:
+            with open(filename, "r", encoding="utf8") as f:
+                record = yaml.load(f, Loader=Loader)
+            if record is None:
+                results.append((rel_file_path, None))
+                continue
+            results.append(
+                (rel_file_path, analyze_quality_record(record, rel_file_path, rule_stats, previous))
+            )
+        except yaml.YAMLError as e:
+            logger.warning(f"YAML parsing error in {filename}: {str(e)}")
+        except Exception as e:
+            logger.warning(f"Error processing {filename}: {str(e)}")
+    return results, rule_stats
+
+
+def merge_rule_stats(total: Dict[str, Dict[str, Any]], partial: Dict[str, Dict[str, Any]]) -> None:
+    """Add one chunk's per-rule stats into the running totals."""
+    for rule_id, stats in partial.items():
+        entry = total.setdefault(rule_id, {"seconds": 0.0, "calls": 0, "issues": 0})
+        for key in ("seconds", "calls", "issues"):
+            entry[key] += stats[key]
+
+
+def write_rule_profile(rule_stats: Dict[str, Dict[str, Any]], records_checked: int, workers: int, path: str) -> None:
+    """Write per-rule cost (cumulative seconds, calls, issues emitted) to a JSON file, slowest first."""
+    rules = []
+    for rule in QUALITY_RULES:
+        stats = rule_stats.get(rule.id, {"seconds": 0.0, "calls": 0, "issues": 0})
+        rules.append(
+            {
+                "id": rule.id,
+                "check": rule.check.__name__,
+                "priority": rule.priority,
+                "track": rule.track,
+                "cost": rule.cost,
+                "fields": list(rule.fields),
+                "calls": stats["calls"],
+                "issues": stats["issues"],
+                "seconds": round(stats["seconds"], 6),
+                "mean_us": round(stats["seconds"] / stats["calls"] * 1e6, 2) if stats["calls"] else 0.0,
+            }
+        )
+    rules.sort(key=lambda item: item["seconds"], reverse=True)
+    payload = {
+        "generated": datetime.datetime.now().isoformat(timespec="seconds"),
+        "records_checked": records_checked,
+        "workers": workers,
+        "total_seconds": round(sum(item["seconds"] for item in rules), 6),
+        "rules": rules,
+    }
+    with open(path, "w", encoding="utf8") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+
+
+def iter_quality_chunks(filenames: List[str], workers: int = 1, previous: Optional[Dict[str, Any]] = None):
+    """Yield per-chunk (record entries, rule stats) in file order, in a process pool when workers > 1.
+
+    previous maps paths relative to ROOT_DIR to earlier entries; those records
+    re-run only the rules that read a changed field.
+    """
+    previous = previous or {}
+    items = [(filename, previous.get(os.path.relpath(filename, ROOT_DIR))) for filename in filenames]
+    chunk_size = max(1, len(items) // (max(workers, 1) * 16))
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    with tqdm.tqdm(total=len(filenames), desc="Analyzing quality", unit="files") as pbar:
+        if workers <= 1 or len(chunks) < 2:
+            for chunk in chunks:
+                yield _analyze_quality_chunk(chunk)
+                pbar.update(len(chunk))
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk, partial in zip(chunks, pool.map(_analyze_quality_chunk, chunks)):
+                yield partial
+                pbar.update(len(chunk))
+
+
+QUALITY_CACHE_VERSION = 4
+
+# Inputs of the quality checks besides the record itself; any change invalidates the cache
+QUALITY_FINGERPRINT_PATHS = [
+    os.path.abspath(__file__),
+    os.path.join(_SCRIPT_DIR, "constants.py"),
+    os.path.join(_REPO_ROOT, "data", "reference"),
+    os.path.join(_REPO_ROOT, "data", "schemes"),
+]
+
+
+def quality_fingerprint() -> str:
+    """Hash of the check code and the reference data the checks read.
+
+    Includes software.jsonl, which the software rules read through
+    get_cached_software_map(); it is resolved against DATASETS_DIR at call time.
+    """
+    return hash_paths(
+        QUALITY_FINGERPRINT_PATHS + [os.path.join(DATASETS_DIR, "software.jsonl")],
+        f"quality-cache-v{QUALITY_CACHE_VERSION}",
+    )
+
+
+def get_quality_cache_path():
+    return os.path.join(DATASETS_DIR, "quality_cache.pickle")
+
+
+def load_quality_cache(fingerprint: str) -> Dict[str, Dict[str, Any]]:
+    """Per-file cached check results keyed by path relative to ROOT_DIR; {} if missing or stale."""
+    return load_pickle_cache(get_quality_cache_path(), fingerprint)
+
+
+def save_quality_cache(fingerprint: str, entries: Dict[str, Dict[str, Any]]):
+    """Write per-file (mtime, size, hash, result) entries for the next incremental run."""
+    save_pickle_cache(get_quality_cache_path(), fingerprint, entries)
+
 
 @app.command()
-def analyze_quality(output: str = None):
+def analyze_quality(
+    output: str = None,
+    workers: int = typer.Option(
+        0,
+        "--workers",
+        help="Processes used to run the checks (0 = one per CPU core, 1 = serial)",
+    ),
+    incremental: bool = typer.Option(
+        True,
+        "--incremental/--full",
+        help="Re-check only records changed since the last run (--full re-checks everything)",
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Re-check every record and write per-rule cost to rule_profile.json",
+    ),
+):
     """Analyze data portal records for missing values and data quality issues, generating organized reports"""
     typer.echo("Analyzing data quality in YAML files...")
+    workers = resolve_workers(workers)
+    if profile:
+        # Cached records would leave their rules out of the profile
+        incremental = False
     
     # Verify path exists
     if not os.path.exists(ROOT_DIR):
@@ -4650,201 +5586,98 @@ def analyze_quality(output: str = None):
     typer.echo(f"Scanning entities directory: {ROOT_DIR}")
     typer.echo(f"Output directory: {output_dir}")
     
-    all_issues = []
-    total_records = 0
-    records_with_issues = {}
-    records_metadata = []
-    
-    # Walk through all YAML files
-    for root, dirs, files in tqdm.tqdm(os.walk(ROOT_DIR)):
-        files = [os.path.join(root, fi) for fi in files if fi.endswith(".yaml")]
-        for filename in files:
-            total_records += 1
-            try:
-                f = open(filename, "r", encoding="utf8")
-                record = yaml.load(f, Loader=Loader)
-                f.close()
-                
-                if record is None:
-                    continue
-                
-                record_id = record.get("id", "unknown")
-                record_issues = []  # All issues with country-specific duplicates (for country reports)
-                unique_record_issues = []  # Unique issues per record (for primary priority report)
-                
-                # Calculate relative path from ROOT_DIR for report
-                rel_file_path = os.path.relpath(filename, ROOT_DIR)
-                
-                # Extract country codes from record
-                country_codes = extract_country_codes(record)
-
-                # Attach helper metadata for advanced checks
-                record["_file_path"] = rel_file_path
-                record["_country_codes"] = country_codes
-                record["_directory"] = "entities"
-                
-                # Run all quality checks
-                checks = [
-                    check_missing_topics,
-                    check_missing_tags,
-                    check_missing_description,
-                    check_missing_langs,
-                    check_missing_endpoints,
-                    check_software_expected_endpoints,
-                    check_owner_info,
-                    check_coverage,
-                    check_placeholder_values,
-                    check_urls,
-                    check_required_fields,
-                    check_identifiers,
-                    check_license_completeness,
-                    check_api_status_coherence,
-                    check_content_types_access_mode,
-                    check_language_validation,
-                    check_coverage_normalization,
-                    check_software_normalization,
-                    check_catalog_software_coherence,
-                    check_tag_topic_hygiene,
-                    check_description_quality,
-                    check_uid_id_consistency,
-                    check_contact_info,
-                    check_status_directory_uid_consistency,
-                    check_status_api_status_coherence_extended,
-                    check_title_quality,
-                    check_rights_completeness,
-                    check_subregion_unk_placeholder,
-                    check_subregion_iso3166_2,
-                    check_access_mode_values,
-                    check_catalog_type_values,
-                    check_status_values,
-                    check_api_status_values,
-                    check_trust_score_bounds,
-                    check_identifier_urls,
-                    check_rights_urls,
-                    check_catalog_type_directory,
-                    check_country_codes,
-                    check_country_subregion_name_consistency,
-                    check_unknown_country_macroregion,
-                    check_owner_type_values,
-                    check_path_country_consistency,
-                ]
-                
-                for check_func in checks:
-                    result = check_func(record)
-                    if result:
-                        primary_country = country_codes[0] if country_codes else "UNKNOWN"
-                        
-                        if isinstance(result, list):
-                            for issue in result:
-                                issue["file_path"] = rel_file_path
-                                issue["record_id"] = record_id
-                                issue["priority"] = get_priority_level(issue["issue_type"])
-                                issue["country_code"] = primary_country
-                                
-                                # Add to all_issues once (for full/priority reports) - use primary country
-                                all_issues.append(issue)
-                                
-                                # Add unique issue to unique_record_issues (for primary priority report)
-                                unique_record_issues.append(issue)
-                                
-                                # Add to record_issues with all country codes (for country reports)
-                                for country_code in country_codes:
-                                    issue_copy = issue.copy()
-                                    issue_copy["country_code"] = country_code
-                                    record_issues.append(issue_copy)
-                        else:
-                            result["file_path"] = rel_file_path
-                            result["record_id"] = record_id
-                            result["priority"] = get_priority_level(result["issue_type"])
-                            result["country_code"] = primary_country
-                            
-                            # Add to all_issues once (for full/priority reports) - use primary country
-                            all_issues.append(result)
-                            
-                            # Add unique issue to unique_record_issues (for primary priority report)
-                            unique_record_issues.append(result)
-                            
-                            # Add to record_issues with all country codes (for country reports)
-                            for country_code in country_codes:
-                                result_copy = result.copy()
-                                result_copy["country_code"] = country_code
-                                record_issues.append(result_copy)
-                
-                if record_issues:
-                    # Store record info with primary country code and all country codes
-                    primary_country = country_codes[0] if country_codes else "UNKNOWN"
-                    records_with_issues[record_id] = {
-                        "file_path": rel_file_path,
-                        "issues": record_issues,  # This contains issues with all country codes
-                        "unique_issues": unique_record_issues,  # Unique issues per record
-                        "country_code": primary_country,
-                        "all_country_codes": country_codes,  # Store all countries for this record
-                    }
+    records_metadata = {}
+    rule_stats = {}
+
+    # Same file order as the serial os.walk so report files are identical for any --workers
+    quality_files = []
+    for root, dirs, files in os.walk(ROOT_DIR):
+        quality_files.extend(os.path.join(root, fi) for fi in files if fi.endswith(".yaml"))
+    total_records = len(quality_files)
+
+    # Per-record results are cached by content hash under a fingerprint of the
+    # check code and reference data; only changed records are re-checked.
+    fingerprint = quality_fingerprint()
+    cached_entries = load_quality_cache(fingerprint) if incremental else {}
+    cache_entries = {}
+    stale_files = []
+    # Earlier results of edited records: only rules reading a changed field are re-run
+    previous_results = {}
+    for filename in quality_files:
+        rel_file_path = os.path.relpath(filename, ROOT_DIR)
+        stat = os.stat(filename)
+        cached = cached_entries.get(rel_file_path)
+        if cached and cached["mtime"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            cache_entries[rel_file_path] = cached
+            continue
+        content_hash = calculate_file_hash(filename)
+        if cached and cached["hash"] == content_hash:
+            cache_entries[rel_file_path] = dict(cached, mtime=stat.st_mtime_ns)
+            continue
+        cache_entries[rel_file_path] = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "hash": content_hash}
+        stale_files.append(filename)
+        if cached and cached.get("result"):
+            previous_results[rel_file_path] = cached["result"]
+    if incremental:
+        typer.echo(f"Re-checking {len(stale_files)} changed records, reusing {total_records - len(stale_files)} cached")
+
+    for chunk_results, chunk_stats in iter_quality_chunks(stale_files, workers, previous_results):
+        merge_rule_stats(rule_stats, chunk_stats)
+        for rel_file_path, result in chunk_results:
+            cache_entries[rel_file_path]["result"] = result
+    # Files that failed to load have no result and are re-checked next time
+    cache_entries = {path: entry for path, entry in cache_entries.items() if "result" in entry}
+    save_quality_cache(fingerprint, cache_entries)
+
+    # Issues are streamed to full_report.jsonl and the report spools as they are produced
+    report = QualityReport(os.path.join(output_dir, "full_report.jsonl"))
+
+    for filename in quality_files:
+        entry = cache_entries.get(os.path.relpath(filename, ROOT_DIR))
+        if entry is None or entry["result"] is None:
+            continue
+        result = entry["result"]
+        record_id = result["record_id"]
+        rel_file_path = result["file_path"]
+        country_codes = result["country_codes"]
+        if result["issues"]:
+            record_entry = report.record_entry(record_id, rel_file_path, country_codes)
+            for issue in result["issues"]:
+                report.add_issue(issue, record_entry)
+
+        # Metadata for the cross-record duplicate rules, keyed like the record index
+        records_metadata[index_key(ROOT_DIR, rel_file_path)] = {
+            "record_id": record_id,
+            "file_path": rel_file_path,
+            "country_codes": country_codes if country_codes else ["UNKNOWN"],
+            "link": result["link"],
+            "link_score": result["link_score"],
+            "position": len(records_metadata),
+        }
 
-                # Collect metadata for cross-record duplicate detection
-                link = record.get("link")
-                records_metadata.append(
-                    {
-                        "record_id": record_id,
-                        "file_path": rel_file_path,
-                        "country_codes": country_codes if country_codes else ["UNKNOWN"],
-                        "link": link,
-                    }
-                )
-                    
-            except yaml.YAMLError as e:
-                logger.warning(f"YAML parsing error in {filename}: {str(e)}")
-            except Exception as e:
-                logger.warning(f"Error processing {filename}: {str(e)}")
-
-    # Detect duplicate links across records
-    link_to_records = {}
-    normalized_link_to_records = {}
-
-    for meta in records_metadata:
-        link = meta.get("link")
-        if link:
-            link_to_records.setdefault(link, []).append(meta)
-            normalized = canonicalize_url(link)
-            if normalized:
-                normalized_link_to_records.setdefault(normalized, []).append(meta)
-
-    def _ensure_record_entry(record_id, file_path, country_codes):
-        primary_country = country_codes[0] if country_codes else "UNKNOWN"
-        if record_id not in records_with_issues:
-            records_with_issues[record_id] = {
-                "file_path": file_path,
-                "issues": [],
-                "unique_issues": [],
-                "country_code": primary_country,
-                "all_country_codes": country_codes if country_codes else [primary_country],
-            }
-        return records_with_issues[record_id]
+    # Cross-record duplicates are GROUP BY queries on the record index (the
+    # same sidecar build maintains); only rows of changed files are rewritten.
+    index_entries = (
+        (path, entry["mtime"], entry["size"], entry["result"]["index_entry"] if entry["result"] else index_entry(None))
+        for path, entry in cache_entries.items()
+    )
+    with RecordIndex(os.path.join(DATASETS_DIR, "record_index.sqlite")) as record_index:
+        record_index.update_entries("entities", ROOT_DIR, index_entries)
+        id_groups, link_groups, normalized_link_groups = (
+            _index_duplicate_groups(record_index.groups(column, "entities", varying=varying), column, records_metadata)
+            for column, varying in (("id", None), ("link", None), ("canonical_link", "link"))
+        )
 
     def _emit_cross_record_issue(base_issue, meta):
-        record_id = meta["record_id"]
-        file_path = meta["file_path"]
         country_codes = meta["country_codes"] or ["UNKNOWN"]
-        all_issues.append(base_issue)
-        entry = _ensure_record_entry(record_id, file_path, country_codes)
-        entry["unique_issues"].append(base_issue)
-        for country_code in entry.get("all_country_codes", country_codes):
-            issue_copy = base_issue.copy()
-            issue_copy["country_code"] = country_code
-            entry["issues"].append(issue_copy)
+        report.add_issue(base_issue, report.record_entry(meta["record_id"], meta["file_path"], country_codes))
 
     # Same catalog id used in multiple file paths
-    id_to_metas = {}
-    for meta in records_metadata:
-        rid = meta.get("record_id")
-        if rid and rid != "unknown":
-            id_to_metas.setdefault(rid, []).append(meta)
-
-    for record_id, metas in id_to_metas.items():
-        unique_paths = {m.get("file_path") for m in metas if m.get("file_path")}
-        if len(unique_paths) <= 1:
+    for _, metas in id_groups:
+        record_id = metas[0]["record_id"]
+        if record_id == "unknown":
             continue
-        file_paths = sorted(unique_paths)
+        file_paths = sorted(m["file_path"] for m in metas)
         for meta in metas:
             country_codes = meta["country_codes"] or ["UNKNOWN"]
             base_issue = {
@@ -4866,10 +5699,7 @@ def analyze_quality(output: str = None):
             _emit_cross_record_issue(base_issue, meta)
 
     # Duplicate links
-    for link, metas in link_to_records.items():
-        if not link or len(metas) <= 1:
-            continue
-
+    for link, metas in link_groups:
         record_ids_for_link = [m["record_id"] for m in metas]
         keeper = choose_duplicate_keeper(metas)
         keeper_id = keeper.get("record_id") if keeper else None
@@ -4911,16 +5741,9 @@ def analyze_quality(output: str = None):
             }
             _emit_cross_record_issue(base_issue, meta)
 
-    # Duplicate links by canonicalized URL
-    for normalized_link, metas in normalized_link_to_records.items():
-        if not normalized_link or len(metas) <= 1:
-            continue
-
-        unique_raw_links = {m.get("link") for m in metas if m.get("link")}
-        # exact duplicates are handled above; normalized rule focuses on canonical-only collisions
-        if len(unique_raw_links) <= 1:
-            continue
-
+    # Duplicate links by canonicalized URL; the query keeps only groups with
+    # differing raw links, exact duplicates are handled above
+    for normalized_link, metas in normalized_link_groups:
         record_ids_for_link = [m["record_id"] for m in metas]
         keeper = choose_duplicate_keeper(metas)
         keeper_id = keeper.get("record_id") if keeper else None
@@ -4963,87 +5786,37 @@ def analyze_quality(output: str = None):
             }
             _emit_cross_record_issue(base_issue, meta)
 
-    # Group issues by country (for country reports - include issues for all countries a record spans)
-    issues_by_country = {}
-    records_by_country = {}
-    
-    # Process records_with_issues to get all country-specific issues
-    for record_id, record_data in records_with_issues.items():
-        # Get all country codes this record spans
-        record_country_codes = record_data.get("all_country_codes", [record_data.get("country_code", "UNKNOWN")])
-        
-        # For each country, add the record's issues
-        for country_code in record_country_codes:
-            if country_code not in records_by_country:
-                records_by_country[country_code] = {}
-                issues_by_country[country_code] = []
-            
-            # Create a country-specific record entry
-            country_record_data = {
-                "file_path": record_data["file_path"],
-                "issues": [issue for issue in record_data["issues"] if issue.get("country_code") == country_code],
-                "country_code": country_code,
-            }
-            records_by_country[country_code][record_id] = country_record_data
-            
-            # Add issues for this country
-            for issue in record_data["issues"]:
-                if issue.get("country_code") == country_code:
-                    issues_by_country[country_code].append(issue)
-    
-    # Group issues by priority
-    issues_by_priority = {}
-    for issue in all_issues:
-        priority = issue.get("priority", "MEDIUM")
-        if priority not in issues_by_priority:
-            issues_by_priority[priority] = []
-        issues_by_priority[priority].append(issue)
-
-    # Group issues by type (for rule reports)
-    issues_by_type = {}
-    for issue in all_issues:
-        issue_type = issue["issue_type"]
-        if issue_type not in issues_by_type:
-            issues_by_type[issue_type] = []
-        issues_by_type[issue_type].append(issue)
-    
     # Generate all reports
     typer.echo("\nGenerating reports...")
     
+    report.jsonl.close()
+    full_report_jsonl_path = report.jsonl.name
+    jsonl_count = report.jsonl_count
+
     # Full report (text)
     full_report_path = os.path.join(output_dir, "full_report.txt")
-    generate_full_report(all_issues, records_with_issues, total_records, full_report_path)
+    generate_full_report(report, total_records, full_report_path)
     typer.echo(f"  Full report (text): {full_report_path}")
-    
-    # Full report (JSONL) - structured output for automated processing
-    full_report_jsonl_path = os.path.join(output_dir, "full_report.jsonl")
-    jsonl_count = 0
-    with open(full_report_jsonl_path, "w", encoding="utf8") as f:
-        for issue in all_issues:
-            try:
-                # Ensure all values are JSON-serializable
-                json_issue = {
-                    "issue_type": issue.get("issue_type"),
-                    "field": issue.get("field"),
-                    "current_value": issue.get("current_value"),
-                    "suggested_action": issue.get("suggested_action"),
-                    "file_path": issue.get("file_path"),
-                    "record_id": issue.get("record_id"),
-                    "priority": issue.get("priority"),
-                    "country_code": issue.get("country_code"),
-                }
-                f.write(json.dumps(json_issue, ensure_ascii=False) + "\n")
-                jsonl_count += 1
-            except (TypeError, ValueError) as e:
-                logger.warning(f"Failed to serialize issue for record {issue.get('record_id', 'unknown')}: {str(e)}")
     typer.echo(f"  Full report (JSONL): {full_report_jsonl_path} ({jsonl_count} issues)")
+
+    # Columnar copy for regression checks and triage queries
+    full_report_parquet_path = os.path.join(output_dir, "full_report.parquet")
+    export_quality_report_parquet(full_report_jsonl_path, full_report_parquet_path)
+    typer.echo(f"  Full report (Parquet): {full_report_parquet_path}")
+
+    # Precomputed counts let the CI regression guard skip re-reading the report
+    issue_counts_path = os.path.join(output_dir, "issue_counts.json")
+    write_report_counts(
+        issue_counts_path, report.type_priority_counts, report.country_counts, total_records, full_report_jsonl_path
+    )
+    typer.echo(f"  Issue counts: {issue_counts_path}")
     
     # Primary priority report (JSONL) - records with most errors (at least 3 issues)
     primary_priority_path = os.path.join(output_dir, "primary_priority.jsonl")
     # Filter records with at least 3 issues, then sort by number of unique issues (descending), then by priority breakdown
     filtered_records = [
-        (record_id, record_data)
-        for record_id, record_data in records_with_issues.items()
+        (record_data["record_id"], record_data)
+        for record_data in report.records.values()
         if len(record_data.get("unique_issues", [])) >= 3
     ]
     sorted_records = sorted(
@@ -5094,26 +5867,26 @@ def analyze_quality(output: str = None):
     typer.echo(f"  Primary priority report (JSONL): {primary_priority_path} ({priority_count} records)")
     
     # Country reports
-    generate_country_reports(issues_by_country, records_by_country, output_dir)
-    country_count = len([c for c in issues_by_country.keys() if issues_by_country[c]])
+    generate_country_reports(report, output_dir)
+    country_count = len(report.countries())
     typer.echo(f"  Country reports: {country_count} files in {os.path.join(output_dir, 'countries')}")
     
     # Priority reports
-    generate_priority_reports(issues_by_priority, output_dir)
-    priority_count = len([p for p in issues_by_priority.keys() if issues_by_priority[p]])
+    generate_priority_reports(report, output_dir)
+    priority_count = len(report.priority_counts)
     typer.echo(f"  Priority reports: {priority_count} files in {os.path.join(output_dir, 'priorities')}")
 
     # Rule reports
-    generate_rule_reports(issues_by_type, output_dir)
-    rule_count = len([r for r in issues_by_type.keys() if issues_by_type[r]])
+    rules_aggregate_count = generate_rule_reports(report, output_dir)
+    rule_count = len(report.type_counts)
     typer.echo(f"  Rule reports: {rule_count} files in {os.path.join(output_dir, 'rules')}")
 
     # Consistency guard between aggregate outputs
-    aggregate_count = len(all_issues)
-    rules_aggregate_count = sum(len(v) for v in issues_by_type.values())
+    aggregate_count = report.total
+    report.close()
     if jsonl_count != aggregate_count or rules_aggregate_count != aggregate_count:
         typer.echo("Error: inconsistent issue counts across generated reports.")
-        typer.echo(f"  all_issues: {aggregate_count}")
+        typer.echo(f"  issues found: {aggregate_count}")
         typer.echo(f"  full_report.jsonl: {jsonl_count}")
         typer.echo(f"  rules/*.txt aggregate: {rules_aggregate_count}")
         raise typer.Exit(1)
@@ -5121,30 +5894,31 @@ def analyze_quality(output: str = None):
     # Summary output
     typer.echo(f"\nAnalysis complete!")
     typer.echo(f"  Total records analyzed: {total_records}")
-    typer.echo(f"  Total issues found: {len(all_issues)}")
-    typer.echo(f"  Records with issues: {len(records_with_issues)}")
+    typer.echo(f"  Total issues found: {report.total}")
+    typer.echo(f"  Records with issues: {len(report.records)}")
     typer.echo(f"  Countries affected: {country_count}")
     
     # Print summary by priority
     typer.echo("\nIssue summary by priority:")
-    for priority in ["CRITICAL", "IMPORTANT", "MEDIUM", "LOW"]:
-        if priority in issues_by_priority:
-            count = len(issues_by_priority[priority])
+    for priority in PRIORITY_ORDER:
+        if priority in report.priority_counts:
+            count = report.priority_counts[priority]
             typer.echo(f"  {priority}: {count} issue" + ("s" if count != 1 else ""))
     
     # Print summary by issue type
-    issues_by_type = {}
-    for issue in all_issues:
-        issue_type = issue["issue_type"]
-        if issue_type not in issues_by_type:
-            issues_by_type[issue_type] = []
-        issues_by_type[issue_type].append(issue)
-    
     typer.echo("\nIssue summary by type:")
-    for issue_type in sorted(issues_by_type.keys()):
-        count = len(issues_by_type[issue_type])
-        priority = issues_by_type[issue_type][0].get("priority", "MEDIUM") if issues_by_type[issue_type] else "MEDIUM"
-        typer.echo(f"  {issue_type} ({priority}): {count}")
+    for issue_type in sorted(report.type_counts):
+        typer.echo(f"  {issue_type} ({report.type_priority[issue_type]}): {report.type_counts[issue_type]}")
+
+    # Rule timings are summed across workers (CPU time, not wall time)
+    typer.echo(f"\nRule timing ({workers} worker" + ("s" if workers != 1 else "") + ", slowest first):")
+    for rule_id, stats in sorted(rule_stats.items(), key=lambda item: item[1]["seconds"], reverse=True):
+        typer.echo(f"  {rule_id}: {stats['seconds']:.2f}s")
+
+    if profile:
+        profile_path = os.path.join(output_dir, "rule_profile.json")
+        write_rule_profile(rule_stats, len(stale_files), workers, profile_path)
+        typer.echo(f"\nRule profile: {profile_path}")
 
 
 @app.command()
@@ -5182,12 +5956,19 @@ def fix():
     # Initialize stats
     stats = SummaryStats()
     stats.total = len(records)
+
+    # Edited records are re-checked against the analyze-quality cache, rule by rule
+    fingerprint = quality_fingerprint()
+    quality_cache = load_quality_cache(fingerprint)
     
     # Process each record
     for index, record in enumerate(records):
-        record_stats = process_record(record, stats, index, _REPO_ROOT)
+        record_stats = process_record(record, stats, index, _REPO_ROOT, quality_cache)
         stats.records.append(record_stats)
         logger.info("")
+
+    if stats.updated > 0:
+        save_quality_cache(fingerprint, quality_cache)
     
     # Print summary
     logger.info("=" * 60)
@@ -5198,6 +5979,12 @@ def fix():
     logger.info(f"Successfully updated: {stats.updated}")
     logger.info(f"No changes detected: {stats.no_change}")
     logger.info(f"Failed: {stats.failed}")
+    rechecked = [r for r in stats.records if r.remaining_issues is not None]
+    if rechecked:
+        logger.info(
+            f"Issues remaining in {len(rechecked)} re-checked record(s): "
+            f"{sum(r.remaining_issues for r in rechecked)}"
+        )
     logger.info("")
     
     # Print change statistics
@@ -5254,14 +6041,12 @@ def country_report():
     from rich.table import Table
 
     #    data = load_jsonl(os.path.join(DATASETS_DIR, 'full.jsonl'))
-    ids = (
-        duckdb.sql(
-            "select distinct(unnest(coverage).location.country.id) as id from '%s';"
-            % (os.path.join(DATASETS_DIR, "full.parquet"))
-        )
-        .df()
-        .id.tolist()
-    )
+    conn = duckdb.connect(os.path.join(DATASETS_DIR, "datasets.duckdb"), read_only=True)
+    ids = [
+        row[0]
+        for row in conn.execute("select distinct country_id from catalog_coverage").fetchall()
+    ]
+    conn.close()
     #    ids = duckdb.sql("select distinct(unnest(source.countries).id) as id from '%s' where source.catalog_type != 'Indicators catalog';" % (os.path.join("../../cdi-data/search", 'dateno.parquet'))).df().id.tolist()
     #    print(ids)
     reg_countries = set(ids)
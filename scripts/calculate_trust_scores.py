@@ -10,10 +10,7 @@ from typing import Dict, Any, Optional, Tuple
 from collections import defaultdict
 import tqdm
 
-try:
-    from yaml import CLoader as Loader, CDumper as Dumper
-except ImportError:
-    from yaml import Loader, Dumper
+from record_store import iter_records
 
 # Configure logging
 logging.basicConfig(
@@ -211,18 +208,14 @@ def calculate(
     re3data_trust_seals = load_re3data_trust_seals(re3data_file)
     logger.info(f"Loaded {len(re3data_trust_seals)} re3data trust seal mappings")
 
-    # Collect all YAML files
-    all_files = []
-    for root, dirs, files in os.walk(ROOT_DIR):
-        all_files.extend(
-            [os.path.join(root, fi) for fi in files if fi.endswith(".yaml")]
-        )
+    # Load all catalogs (unchanged files come from the record cache)
+    all_records = list(iter_records(ROOT_DIR))
 
-    logger.info(f"Found {len(all_files)} catalog files")
+    logger.info(f"Found {len(all_records)} catalog files")
 
     # Statistics
     stats = {
-        "total": len(all_files),
+        "total": len(all_records),
         "processed": 0,
         "updated": 0,
         "skipped": 0,
@@ -233,13 +226,9 @@ def calculate(
     }
 
     # Process each file
-    with tqdm.tqdm(total=len(all_files), desc="Calculating trust scores") as pbar:
-        for filepath in all_files:
+    with tqdm.tqdm(total=len(all_records), desc="Calculating trust scores") as pbar:
+        for filepath, catalog in all_records:
             try:
-                # Load YAML
-                with open(filepath, "r", encoding="utf-8") as f:
-                    catalog = yaml.load(f, Loader=Loader)
-
                 if not catalog:
                     stats["skipped"] += 1
                     pbar.update(1)
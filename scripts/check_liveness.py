@@ -18,12 +18,8 @@ from pathlib import Path
 from typing import Iterator, Optional
 
 import requests
-import yaml
 
-try:
-    from yaml import CLoader as Loader
-except ImportError:
-    from yaml import Loader
+from record_store import iter_records
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 DEFAULT_ENTITIES = REPO_ROOT / "data" / "entities"
@@ -89,16 +85,14 @@ def iter_catalog_records(
 ) -> Iterator[dict]:
     """Yield catalog records with uid and link from entity YAML files."""
     country_code = country.upper() if country else None
-    for yaml_path in sorted(entities_dir.rglob("*.yaml")):
-        rel_parts = yaml_path.relative_to(entities_dir).parts
+    for yaml_path, record in iter_records(entities_dir):
+        rel_parts = yaml_path.relative_to(entities_dir.resolve()).parts
         if not rel_parts:
             continue
         file_country = rel_parts[0]
         if country_code and file_country != country_code:
             continue
 
-        with yaml_path.open("r", encoding="utf-8") as handle:
-            record = yaml.load(handle, Loader=Loader)
         if not record:
             continue
 
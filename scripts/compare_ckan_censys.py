@@ -6,12 +6,12 @@ Output: dev/data/ckan_for_review.txt
 import json
 import os
 import re
-from urllib.parse import urlparse
+
+from record_store import open_record_index
 
 _SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 _REPO_ROOT = os.path.dirname(_SCRIPT_DIR)
 CENSYS_PATH = os.path.join(_REPO_ROOT, "dev", "data", "censys_ckan_list.json")
-FULL_JSONL_PATH = os.path.join(_REPO_ROOT, "data", "datasets", "full.jsonl")
 OUTPUT_PATH = os.path.join(_REPO_ROOT, "dev", "data", "ckan_for_review.txt")
 
 # IP address pattern - exclude these from domain comparison
@@ -43,42 +43,10 @@ def normalize_domain(hostname: str) -> str:
     return hostname
 
 
-def extract_domain_from_url(url: str) -> str | None:
-    """Extract hostname from URL."""
-    if not url or not isinstance(url, str):
-        return None
-    try:
-        parsed = urlparse(url if url.startswith("http") else f"https://{url}")
-        return parsed.netloc.lower() if parsed.netloc else None
-    except Exception:
-        return None
-
-
 def load_registry_domains() -> set[str]:
-    """Load all domains from full.jsonl (link + endpoints)."""
-    domains = set()
-    with open(FULL_JSONL_PATH, "r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                record = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            # Main link
-            link = record.get("link")
-            if link:
-                domain = extract_domain_from_url(link)
-                if domain:
-                    domains.add(normalize_domain(domain))
-            # Endpoints
-            for ep in record.get("endpoints", []) or []:
-                url = ep.get("url") if isinstance(ep, dict) else None
-                if url:
-                    domain = extract_domain_from_url(url)
-                    if domain:
-                        domains.add(normalize_domain(domain))
-    return domains
+    """Load all hosts (link + endpoints) of entities and scheduled records from the record index."""
+    with open_record_index() as index:
+        return index.hosts()
 
 
 def main():
@@ -126,7 +94,7 @@ def main():
 
     print(f"Censys CKAN hosts (total): {len(censys_hosts)}")
     print(f"Censys CKAN hostnames (excl. IPs): {len([h for h in censys_hosts if not is_ip_address(h)])}")
-    print(f"Registry domains (from full.jsonl): {len(registry_domains)}")
+    print(f"Registry domains (from record index): {len(registry_domains)}")
     print(f"Missing domains (for review): {len(missing)}")
     print(f"Output: {OUTPUT_PATH}")
 
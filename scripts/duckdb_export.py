@@ -0,0 +1,429 @@
+"""DuckDB sinks for builder.py: load dataset records into datasets.duckdb and write Parquet exports."""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import shutil
+from pathlib import Path
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCHEMES_DIR = REPO_ROOT / "data" / "schemes"
+CATALOG_SCHEMA_PATH = SCHEMES_DIR / "catalog.json"
+CATALOG_JSON_SCHEMA_PATH = SCHEMES_DIR / "catalog.schema.json"
+SOFTWARE_SCHEMA_PATH = SCHEMES_DIR / "software.json"
+
+# Records are handed to DuckDB in batches of raw JSON lines, so peak memory is
+# bounded by the batch size rather than by the number of records in the registry.
+DEFAULT_BATCH_SIZE = 5000
+
+CERBERUS_TO_DUCKDB = {
+    "string": "VARCHAR",
+    "boolean": "BOOLEAN",
+    "integer": "BIGINT",
+    "number": "DOUBLE",
+    "float": "DOUBLE",
+}
+
+
+def load_schema(schema_path: Path) -> dict:
+    with Path(schema_path).open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def columns_from_cerberus(schema: dict) -> Dict[str, str]:
+    """Map top-level Cerberus fields to DuckDB column types, in schema order.
+
+    Scalars keep their type; lists, dicts and union (anyof) fields are stored
+    as DuckDB JSON text.
+    """
+    columns = {}
+    for name, rules in schema.items():
+        columns[name] = CERBERUS_TO_DUCKDB.get(rules.get("type"), "JSON")
+    return columns
+
+
+JSON_SCHEMA_TO_DUCKDB = {
+    "string": "VARCHAR",
+    "boolean": "BOOLEAN",
+    "integer": "BIGINT",
+    "number": "DOUBLE",
+}
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _json_schema_node_type(node: dict, defs: dict):
+    """Return (DuckDB type, from_json structure) for one JSON Schema node."""
+    while "$ref" in node:
+        node = defs[node["$ref"].rsplit("/", 1)[-1]]
+    variants = node.get("oneOf") or node.get("anyOf")
+    if variants:
+        kinds = {variant.get("type") for variant in variants}
+        if kinds <= {"string", "integer", "number"}:
+            # Mixed scalar ids (e.g. country id "US" or 900) are kept as text
+            return "VARCHAR", "VARCHAR"
+        return "JSON", "JSON"
+    node_type = node.get("type")
+    if isinstance(node_type, list):
+        non_null = [t for t in node_type if t != "null"]
+        node_type = non_null[0] if len(non_null) == 1 else None
+    if node_type == "array":
+        item_type, item_structure = _json_schema_node_type(node.get("items", {}), defs)
+        return f"{item_type}[]", [item_structure]
+    if node_type == "object":
+        properties = node.get("properties")
+        if not properties:
+            return "JSON", "JSON"
+        fields = []
+        structure = {}
+        for name, child in properties.items():
+            child_type, child_structure = _json_schema_node_type(child, defs)
+            fields.append(f"{_quote(name)} {child_type}")
+            structure[name] = child_structure
+        return f"STRUCT({', '.join(fields)})", structure
+    if node_type in JSON_SCHEMA_TO_DUCKDB:
+        return JSON_SCHEMA_TO_DUCKDB[node_type], JSON_SCHEMA_TO_DUCKDB[node_type]
+    return "JSON", "JSON"
+
+
+def columns_from_json_schema(schema: dict) -> Dict[str, Tuple[str, Any]]:
+    """Map JSON Schema properties to typed DuckDB columns, in schema order.
+
+    Objects with declared properties become STRUCTs and arrays become LISTs,
+    so nested fields (coverage, endpoints, owner...) are queryable without
+    json_extract. Free-form objects and string/object unions stay JSON.
+    Returns {name: (DuckDB type, from_json structure)}.
+    """
+    defs = schema.get("$defs", {})
+    return {
+        name: _json_schema_node_type(node, defs)
+        for name, node in schema.get("properties", {}).items()
+    }
+
+
+# Values from_json would drop under the declared structure (undeclared keys,
+# values of another type) are kept in this JSON column, keyed by path.
+UNMAPPED_COLUMN = "_unmapped"
+
+# Python types each scalar column keeps without loss; numbers are accepted as
+# text for mixed ids such as country id "US" or 900.
+SCALAR_PYTHON_TYPES = {
+    "VARCHAR": (str, int, float),
+    "BIGINT": (int,),
+    "DOUBLE": (int, float),
+    "BOOLEAN": (bool,),
+}
+
+
+def unmapped_values(value: Any, structure: Any, path: str = "") -> Dict[str, Any]:
+    """Values in a record that from_json would drop or coerce under structure, keyed by path.
+
+    Paths are dotted with list indexes (coverage[0].location.macroregion).
+    Nulls and anything under a JSON column always map.
+    """
+    if value is None or structure == "JSON":
+        return {}
+    if isinstance(structure, dict):
+        if not isinstance(value, dict):
+            return {path: value}
+        unmapped = {}
+        for key, child in value.items():
+            child_path = f"{path}.{key}" if path else key
+            if key in structure:
+                unmapped.update(unmapped_values(child, structure[key], child_path))
+            else:
+                unmapped[child_path] = child
+        return unmapped
+    if isinstance(structure, list):
+        if not isinstance(value, list):
+            return {path: value}
+        unmapped = {}
+        for index, item in enumerate(value):
+            unmapped.update(unmapped_values(item, structure[0], f"{path}[{index}]"))
+        return unmapped
+    accepted = SCALAR_PYTHON_TYPES.get(structure)
+    if accepted is None:
+        return {}
+    if not isinstance(value, accepted) or (isinstance(value, bool) and structure != "BOOLEAN"):
+        return {path: value}
+    return {}
+
+
+class DuckDBTableSink:
+    """Build sink that streams JSON lines into a DuckDB table with a fixed schema.
+
+    Lines are buffered up to batch_size and inserted with DuckDB's from_json,
+    which parses each batch natively against the explicit column types,
+    including nested STRUCT/LIST columns. from_json silently drops keys and
+    values the types do not cover, so those are stored in the _unmapped JSON
+    column instead and summarized in a warning on close.
+    """
+
+    def __init__(
+        self,
+        conn,
+        table: str,
+        columns: Dict[str, Union[str, Tuple[str, Any]]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.conn = conn
+        self.table = table
+        # Plain type strings (columns_from_cerberus) double as their own from_json structure
+        self.columns = {
+            name: ctype if isinstance(ctype, str) else ctype[0] for name, ctype in columns.items()
+        }
+        structure = {
+            name: ctype if isinstance(ctype, str) else ctype[1] for name, ctype in columns.items()
+        }
+        self.batch_size = batch_size
+        self.count = 0
+        self.unmapped: Counter = Counter()
+        self._batch: List[str] = []
+        self._unmapped_batch: List[Optional[str]] = []
+        column_defs = ", ".join(f"{_quote(name)} {ctype}" for name, ctype in self.columns.items())
+        conn.execute(f"CREATE TABLE {_quote(table)} ({column_defs}, {_quote(UNMAPPED_COLUMN)} JSON)")
+        self._structure_spec = structure
+        self._structure = json.dumps(structure)
+        self._insert_sql = self._build_insert_sql()
+
+    def _build_insert_sql(self) -> str:
+        selects = []
+        for name, ctype in self.columns.items():
+            field = f"r.{_quote(name)}"
+            if ctype == "BOOLEAN":
+                # Non-boolean values (e.g. api: dataset) load as false instead of NULL
+                path = "$." + _quote(name)
+                field = (
+                    f"CASE WHEN json_type(line, '{path}') IN ('VARCHAR', 'BIGINT', 'UBIGINT', 'DOUBLE') "
+                    f"THEN false ELSE {field} END"
+                )
+            selects.append(field)
+        selects.append("unmapped::JSON")
+        return (
+            f"INSERT INTO {_quote(self.table)} SELECT {', '.join(selects)} "
+            "FROM (SELECT line, unmapped, from_json(line, $structure) AS r "
+            "FROM (SELECT unnest($lines) AS line, unnest($unmapped) AS unmapped))"
+        )
+
+    def write(self, line: str) -> None:
+        unmapped = unmapped_values(json.loads(line), self._structure_spec)
+        for path in unmapped:
+            self.unmapped[re.sub(r"\[\d+\]", "[]", path)] += 1
+        self._batch.append(line)
+        self._unmapped_batch.append(json.dumps(unmapped, ensure_ascii=False) if unmapped else None)
+        self.count += 1
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._batch:
+            return
+        self.conn.execute(
+            self._insert_sql,
+            {"structure": self._structure, "lines": self._batch, "unmapped": self._unmapped_batch},
+        )
+        self._batch = []
+        self._unmapped_batch = []
+
+    def close(self) -> None:
+        self.flush()
+        logger.info("Created %s table with %d records", self.table, self.count)
+        if self.unmapped:
+            logger.warning(
+                "%s: values not covered by the table schema were kept in %s: %s",
+                self.table,
+                UNMAPPED_COLUMN,
+                ", ".join(f"{path} ({count})" for path, count in self.unmapped.most_common()),
+            )
+
+
+# Exploded child tables of catalogs, one row per list element, keyed by uid.
+# id is carried along because a few uids are shared across files (scheduled
+# temp uids, duplicates flagged by analyze-quality); join on (uid, id) to be exact.
+# position is the 1-based index in the source list (coverage position 1 is the primary country).
+CATALOG_CHILD_TABLES = {
+    "catalog_endpoints": """
+        SELECT uid, id, position, e.type AS type, e.url AS url, e.version AS version,
+               e.url_pattern AS url_pattern
+        FROM (SELECT uid, id, generate_subscripts(endpoints, 1) AS position, unnest(endpoints) AS e
+              FROM catalogs)
+    """,
+    "catalog_coverage": """
+        SELECT uid, id, position,
+               c.location.country.id AS country_id, c.location.country.name AS country_name,
+               c.location.level AS level,
+               c.location.subregion.id AS subregion_id, c.location.subregion.name AS subregion_name,
+               c.location.macroregion.id AS macroregion_id, c.location.macroregion.name AS macroregion_name
+        FROM (SELECT uid, id, generate_subscripts(coverage, 1) AS position, unnest(coverage) AS c
+              FROM catalogs)
+    """,
+    "catalog_topics": """
+        SELECT uid, id, position, t.type AS type, t.id AS topic_id, t.name AS topic_name
+        FROM (SELECT uid, id, generate_subscripts(topics, 1) AS position, unnest(topics) AS t
+              FROM catalogs)
+    """,
+    "catalog_langs": """
+        SELECT uid, id, position, l.id AS lang_id, l.name AS lang_name
+        FROM (SELECT uid, id, generate_subscripts(langs, 1) AS position, unnest(langs) AS l
+              FROM catalogs)
+    """,
+    "catalog_identifiers": """
+        SELECT uid, id, position, i.id AS identifier_id, i.value AS value, i.url AS url
+        FROM (SELECT uid, id, generate_subscripts(identifiers, 1) AS position, unnest(identifiers) AS i
+              FROM catalogs)
+    """,
+    "catalog_tags": """
+        SELECT uid, id, position,
+               CASE WHEN json_type(t) = 'VARCHAR' THEN t ->> '$' ELSE CAST(t AS VARCHAR) END AS tag
+        FROM (SELECT uid, id, generate_subscripts(tags, 1) AS position, unnest(tags) AS t
+              FROM catalogs)
+    """,
+}
+
+# (table, columns) pairs indexed after the build for common joins and filters
+CATALOG_INDEXES = [
+    ("catalogs", ["uid"]),
+    ("catalogs", ["id"]),
+    ("catalogs", ["catalog_type"]),
+    ("catalogs", ["status"]),
+    ("software", ["id"]),
+    ("catalog_endpoints", ["uid"]),
+    ("catalog_endpoints", ["type"]),
+    ("catalog_coverage", ["uid"]),
+    ("catalog_coverage", ["country_id"]),
+    ("catalog_topics", ["uid"]),
+    ("catalog_topics", ["topic_id"]),
+    ("catalog_langs", ["uid"]),
+    ("catalog_langs", ["lang_id"]),
+    ("catalog_identifiers", ["uid"]),
+    ("catalog_identifiers", ["identifier_id", "value"]),
+    ("catalog_tags", ["uid"]),
+    ("catalog_tags", ["tag"]),
+]
+
+
+def create_catalog_child_tables(conn) -> Dict[str, int]:
+    """Create the exploded catalog_* tables from catalogs; returns row counts per table."""
+    counts = {}
+    for table, select_sql in CATALOG_CHILD_TABLES.items():
+        conn.execute(f"CREATE TABLE {_quote(table)} AS {select_sql}")
+        counts[table] = conn.execute(f"SELECT count(*) FROM {_quote(table)}").fetchone()[0]
+        logger.info("Created %s table with %d rows", table, counts[table])
+    return counts
+
+
+def create_indexes(conn) -> None:
+    """Create the CATALOG_INDEXES on tables present in the database."""
+    existing = {row[0] for row in conn.execute("SELECT table_name FROM duckdb_tables()").fetchall()}
+    for table, columns in CATALOG_INDEXES:
+        if table not in existing:
+            continue
+        index_name = f"idx_{table}_{'_'.join(columns)}"
+        column_list = ", ".join(_quote(column) for column in columns)
+        conn.execute(f"CREATE INDEX {_quote(index_name)} ON {_quote(table)} ({column_list})")
+
+
+# Primary country of a catalog, matching builder.extract_country_codes (owner first, then coverage)
+CATALOG_COUNTRY_SQL = "coalesce(owner.location.country.id, coverage[1].location.country.id, 'UNKNOWN')"
+
+# Small row groups sorted by country and catalog_type keep min/max statistics
+# selective, so readers filtering on either column skip most of the file.
+PARQUET_ROW_GROUP_SIZE = 2048
+
+
+def export_parquet(conn, output_path: Path, partitioned_dir: Path | None = None) -> None:
+    """Write the catalogs table to Parquet in-process, sorted by country and catalog_type.
+
+    With partitioned_dir, also write a Hive-partitioned copy
+    (country=XX/catalog_type=.../*.parquet) for readers that prune by directory.
+    """
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    conn.execute(
+        f"""
+        COPY (SELECT * FROM catalogs ORDER BY {CATALOG_COUNTRY_SQL}, catalog_type, uid)
+        TO '{tmp_path}' (FORMAT parquet, COMPRESSION zstd, ROW_GROUP_SIZE {PARQUET_ROW_GROUP_SIZE})
+        """
+    )
+    tmp_path.replace(output_path)
+    logger.info("Wrote %s", output_path)
+
+    if partitioned_dir is not None:
+        partitioned_dir = Path(partitioned_dir)
+        if partitioned_dir.exists():
+            shutil.rmtree(partitioned_dir)
+        conn.execute(
+            f"""
+            COPY (
+                SELECT *, {CATALOG_COUNTRY_SQL} AS country FROM catalogs
+                ORDER BY country, catalog_type, uid
+            )
+            TO '{partitioned_dir}' (
+                FORMAT parquet, COMPRESSION zstd, ROW_GROUP_SIZE {PARQUET_ROW_GROUP_SIZE},
+                PARTITION_BY (country, catalog_type)
+            )
+            """
+        )
+        logger.info("Wrote Hive-partitioned Parquet to %s", partitioned_dir)
+
+
+QUALITY_REPORT_COLUMNS = {
+    "issue_type": "VARCHAR",
+    "field": "VARCHAR",
+    "current_value": "JSON",
+    "suggested_action": "VARCHAR",
+    "file_path": "VARCHAR",
+    "record_id": "VARCHAR",
+    "priority": "VARCHAR",
+    "country_code": "VARCHAR",
+}
+
+# Low-cardinality columns stored as ENUMs so Parquet always dictionary-encodes them
+QUALITY_REPORT_ENUM_COLUMNS = ("issue_type", "priority", "country_code")
+
+
+def export_quality_report_parquet(jsonl_path: Path, output_path: Path) -> int:
+    """Write analyze-quality's full_report.jsonl to Parquet; returns the number of issues.
+
+    Rows keep the JSONL order. issue_type, priority and country_code are
+    dictionary-encoded so counts by those columns are cheap vectorized scans.
+    """
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    columns = ", ".join(f"'{name}': '{sql_type}'" for name, sql_type in QUALITY_REPORT_COLUMNS.items())
+    conn = duckdb.connect()
+    try:
+        conn.execute(
+            f"""
+            CREATE TABLE issues AS
+            SELECT * FROM read_json('{jsonl_path}', format = 'newline_delimited', columns = {{{columns}}})
+            """
+        )
+        select = []
+        for name in QUALITY_REPORT_COLUMNS:
+            if name in QUALITY_REPORT_ENUM_COLUMNS:
+                conn.execute(
+                    f"CREATE TYPE {name}_enum AS ENUM (SELECT DISTINCT {name} FROM issues WHERE {name} IS NOT NULL)"
+                )
+                select.append(f"{name}::{name}_enum AS {name}")
+            else:
+                select.append(name)
+        conn.execute(
+            f"COPY (SELECT {', '.join(select)} FROM issues) TO '{tmp_path}' (FORMAT parquet, COMPRESSION zstd)"
+        )
+        count = conn.execute("SELECT count(*) FROM issues").fetchone()[0]
+    finally:
+        conn.close()
+    tmp_path.replace(output_path)
+    logger.info("Wrote %s (%d issues)", output_path, count)
+    return count
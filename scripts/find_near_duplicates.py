@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Find likely duplicate catalogs that exact and normalized link matching miss.
+
+DUPLICATE_LINK / DUPLICATE_LINK_NORMALIZED only catch records whose links are
+equal after canonicalization. This script also pairs records whose links
+differ by subdomain, locale path (/en/, /fr/) or a CKAN-style /dataset suffix,
+and records with near-identical titles or owners.
+
+Candidate pairs come from blocking keys (registered domain, URL key, title
+tokens, owner name tokens), so only records sharing a block are compared and
+the run stays roughly linear in the number of records. Blocks larger than
+--max-block are split by full host or skipped. Each pair is scored and pairs
+at or above --threshold are written to a JSONL report for curators; the
+registry YAML is not changed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from record_store import ENTITIES_DIR, REPO_ROOT, SCHEDULED_DIR, canonical_link, iter_records, url_host
+
+DEFAULT_OUTPUT = REPO_ROOT / "dataquality" / "near_duplicates.jsonl"
+DEFAULT_THRESHOLD = 0.7
+DEFAULT_MAX_BLOCK = 200
+
+# Score weights; URL evidence dominates, title and owner similarity refine it
+URL_WEIGHT = 0.5
+TITLE_WEIGHT = 0.3
+OWNER_WEIGHT = 0.2
+
+# Title and owner overlap at or above this are enough on their own, even across domains
+STRONG_NAME_MATCH = 0.8
+# Score for such a name-only match, scaled by the mean of the two overlaps; below URL variants
+NAME_MATCH_SCORE = 0.8
+# Titles shared by more records than this are templates ("Government of Unknown Geoportal"), not names
+MAX_NAME_REPEATS = 2
+
+# Second-level labels under which registrations happen one level deeper (data.gov.uk -> gov.uk + data)
+SECOND_LEVEL_LABELS = {"ac", "co", "com", "edu", "go", "gob", "gouv", "gov", "govt", "mil", "ne", "net", "nic", "or", "org"}
+
+# Leading host labels that usually name the same site (portal.example.org vs example.org)
+PORTAL_HOST_LABELS = {"data", "datos", "dados", "donnees", "daten", "opendata", "open", "portal", "catalog", "catalogue", "geo", "geoportal"}
+
+# Path segments that do not change which catalog a link points at
+LOCALE_SEGMENT = re.compile(r"^[a-z]{2}([-_][a-z]{2})?$")
+CATALOG_SUFFIX_SEGMENTS = {"dataset", "datasets", "catalog", "catalogue", "home", "index.html", "index.php", "search"}
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+STOPWORDS = {
+    "and", "at", "de", "del", "der", "des", "die", "du", "for", "in", "la", "le", "of", "on", "the", "und", "y",
+    "data", "open", "portal", "catalog", "catalogue", "hub", "site", "website",
+}
+
+
+@dataclass
+class CatalogFingerprint:
+    """Comparison keys of one registry record."""
+
+    path: str
+    dataset: str
+    id: Optional[str]
+    uid: Optional[str]
+    name: str
+    link: str
+    canonical_link: Optional[str]
+    host: str
+    domain: str
+    url_key: str
+    title_tokens: frozenset
+    owner_tokens: frozenset
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "uid": self.uid,
+            "dataset": self.dataset,
+            "file": self.path,
+            "name": self.name,
+            "link": self.link,
+        }
+
+
+def registered_domain(host: str) -> str:
+    """Registrable part of a host: the last two labels, or three under a known second-level label."""
+    labels = [label for label in host.split(".") if label]
+    if len(labels) >= 3 and labels[-2] in SECOND_LEVEL_LABELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def url_key(link: Optional[str]) -> str:
+    """Host and path of a link with portal subdomains, locale segments and catalog suffixes removed."""
+    host = url_host(link)
+    if not host:
+        return ""
+    domain = registered_domain(host)
+    labels = host[: -len(domain)].rstrip(".").split(".") if host != domain else []
+    labels = [label for label in labels if label and label not in PORTAL_HOST_LABELS]
+    canonical = canonical_link(link) or ""
+    path = canonical.split("://", 1)[-1].split("?", 1)[0].partition("/")[2]
+    segments = [
+        segment
+        for segment in path.lower().split("/")
+        if segment and not LOCALE_SEGMENT.match(segment) and segment not in CATALOG_SUFFIX_SEGMENTS
+    ]
+    return "/".join([".".join(labels + [domain]), *segments])
+
+
+def name_tokens(value) -> frozenset:
+    """Lowercase word tokens of a name without stopwords."""
+    if not isinstance(value, str):
+        return frozenset()
+    return frozenset(token for token in TOKEN_PATTERN.findall(value.lower()) if token not in STOPWORDS)
+
+
+def jaccard(left: frozenset, right: frozenset) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def fingerprint(path: Path, dataset: str, record) -> Optional[CatalogFingerprint]:
+    """Comparison keys for a record, or None for records without a link."""
+    if not isinstance(record, dict):
+        return None
+    link = record.get("link")
+    host = url_host(link)
+    if not host:
+        return None
+    owner = record.get("owner") if isinstance(record.get("owner"), dict) else {}
+    try:
+        rel_path = path.resolve().relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        rel_path = path.as_posix()
+    return CatalogFingerprint(
+        path=rel_path,
+        dataset=dataset,
+        id=record.get("id"),
+        uid=record.get("uid"),
+        name=record.get("name") if isinstance(record.get("name"), str) else "",
+        link=link,
+        canonical_link=canonical_link(link),
+        host=host,
+        domain=registered_domain(host),
+        url_key=url_key(link),
+        title_tokens=name_tokens(record.get("name")),
+        owner_tokens=name_tokens(owner.get("name")),
+    )
+
+
+def iter_fingerprints(roots: Iterable[Tuple[str, Path]]) -> Iterator[CatalogFingerprint]:
+    for dataset, root_dir in roots:
+        for path, record in iter_records(root_dir):
+            item = fingerprint(path, dataset, record)
+            if item is not None:
+                yield item
+
+
+def blocking_keys(item: CatalogFingerprint) -> List[str]:
+    keys = [f"domain:{item.domain}", f"url:{item.url_key}"]
+    if item.title_tokens:
+        keys.append("title:" + " ".join(sorted(item.title_tokens)))
+    if item.owner_tokens:
+        keys.append("owner:" + " ".join(sorted(item.owner_tokens)))
+    return keys
+
+
+def candidate_pairs(items: List[CatalogFingerprint], max_block: int = DEFAULT_MAX_BLOCK) -> Tuple[set, Counter]:
+    """Index pairs (i, j) with i < j sharing a block, plus counts of oversized blocks skipped by key kind.
+
+    Oversized domain blocks (shared hosting such as *.arcgis.com) are split by
+    full host first; blocks still larger than max_block are skipped.
+    """
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for index, item in enumerate(items):
+        for key in blocking_keys(item):
+            blocks[key].append(index)
+
+    for key in [key for key, members in blocks.items() if key.startswith("domain:") and len(members) > max_block]:
+        for index in blocks.pop(key):
+            blocks[f"host:{items[index].host}"].append(index)
+
+    pairs = set()
+    skipped: Counter = Counter()
+    for key, members in blocks.items():
+        if len(members) < 2:
+            continue
+        if len(members) > max_block:
+            skipped[key.split(":", 1)[0]] += 1
+            continue
+        for position, left in enumerate(members):
+            for right in members[position + 1:]:
+                pairs.add((left, right) if left < right else (right, left))
+    return pairs, skipped
+
+
+def score_pair(
+    left: CatalogFingerprint, right: CatalogFingerprint, distinctive_names: bool = True
+) -> Tuple[float, List[str]]:
+    """Similarity in [0, 1] and the evidence behind it.
+
+    With distinctive_names, near-identical title and owner count as a
+    duplicate on their own; find_near_duplicates turns it off for titles
+    that many records share.
+    """
+    reasons = []
+    if left.url_key == right.url_key:
+        url_score = 1.0
+        reasons.append("url_variant")
+    elif left.host == right.host:
+        url_score = 0.6
+        reasons.append("same_host")
+    elif left.domain == right.domain:
+        url_score = 0.3
+        reasons.append("same_domain")
+    else:
+        url_score = 0.0
+    title_score = jaccard(left.title_tokens, right.title_tokens)
+    if title_score >= 0.5:
+        reasons.append("similar_title")
+    owner_score = jaccard(left.owner_tokens, right.owner_tokens)
+    if owner_score >= 0.5:
+        reasons.append("similar_owner")
+    score = URL_WEIGHT * url_score + TITLE_WEIGHT * title_score + OWNER_WEIGHT * owner_score
+    name_score = NAME_MATCH_SCORE * (title_score + owner_score) / 2
+    strong_names = title_score >= STRONG_NAME_MATCH and owner_score >= STRONG_NAME_MATCH
+    if distinctive_names and strong_names and name_score > score:
+        reasons.append("strong_name_match")
+        score = name_score
+    return round(score, 3), reasons
+
+
+def find_near_duplicates(
+    items: List[CatalogFingerprint],
+    threshold: float = DEFAULT_THRESHOLD,
+    max_block: int = DEFAULT_MAX_BLOCK,
+) -> Tuple[List[dict], Counter]:
+    """Scored candidate pairs at or above threshold, best first, and the oversized blocks skipped.
+
+    Pairs whose canonical links are equal are left out; the DUPLICATE_LINK
+    quality rules already report them.
+    """
+    pairs, skipped = candidate_pairs(items, max_block=max_block)
+    title_counts = Counter(item.title_tokens for item in items)
+    results = []
+    for left_index, right_index in pairs:
+        left, right = items[left_index], items[right_index]
+        if left.canonical_link and left.canonical_link == right.canonical_link:
+            continue
+        distinctive = max(title_counts[left.title_tokens], title_counts[right.title_tokens]) <= MAX_NAME_REPEATS
+        score, reasons = score_pair(left, right, distinctive_names=distinctive)
+        if score < threshold:
+            continue
+        if left.path > right.path:
+            left, right = right, left
+        results.append({"score": score, "reasons": reasons, "left": left.to_dict(), "right": right.to_dict()})
+    results.sort(key=lambda pair: (-pair["score"], pair["left"]["file"], pair["right"]["file"]))
+    return results, skipped
+
+
+def write_report(results: List[dict], output_path: Path) -> None:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("w", encoding="utf-8") as handle:
+        for result in results:
+            handle.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report likely near-duplicate catalogs.")
+    parser.add_argument("--entities", default=str(ENTITIES_DIR), help="Entities directory")
+    parser.add_argument("--scheduled", default=str(SCHEDULED_DIR), help="Scheduled directory")
+    parser.add_argument("--no-scheduled", action="store_true", help="Compare entities only")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Output JSONL path")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Minimum pair score (0-1)")
+    parser.add_argument("--max-block", type=int, default=DEFAULT_MAX_BLOCK, help="Skip blocks with more records")
+    args = parser.parse_args()
+
+    roots = [("entities", Path(args.entities))]
+    if not args.no_scheduled and Path(args.scheduled).exists():
+        roots.append(("scheduled", Path(args.scheduled)))
+    items = list(iter_fingerprints(roots))
+    results, skipped = find_near_duplicates(items, threshold=args.threshold, max_block=args.max_block)
+
+    output_path = Path(args.output)
+    write_report(results, output_path)
+    print(f"Compared {len(items)} records; wrote {len(results)} candidate pairs to {output_path}")
+    for reason, count in sorted(Counter(reason for result in results for reason in result["reasons"]).items()):
+        print(f"  {reason}: {count}")
+    for kind, count in sorted(skipped.items()):
+        print(f"  skipped {count} {kind} blocks larger than {args.max_block}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,13 +7,14 @@ This script:
 2. Updates software.name to match software definitions
 """
 
-import os
 import yaml
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
+
+from record_store import iter_records
 
 # Base directories
-BASE_DIR = Path(__file__).parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent
 ENTITIES_DIR = BASE_DIR / "data" / "entities"
 SOFTWARE_DIR = BASE_DIR / "data" / "software"
 
@@ -50,11 +51,17 @@ def load_software_definitions() -> Dict[str, Dict]:
     return software
 
 
-def fix_entity_file(filepath: Path, software_defs: Dict[str, Dict], dry_run: bool = False) -> Tuple[bool, str]:
-    """Fix software.id and software.name in an entity file."""
+def fix_entity_file(
+    filepath: Path, software_defs: Dict[str, Dict], dry_run: bool = False, data: Optional[Dict] = None
+) -> Tuple[bool, str]:
+    """Fix software.id and software.name in an entity file.
+
+    data is the already parsed record (e.g. from iter_records()); the file is read when it is None.
+    """
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+        if data is None:
+            with open(filepath, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f)
         
         if not data or "software" not in data:
             return False, "no software field"
@@ -119,14 +126,15 @@ def main(dry_run: bool = False):
     print(f"Loaded {len(software_defs)} software definitions")
     
     print(f"\n{'[DRY RUN] ' if dry_run else ''}Fixing entity files...")
-    entity_files = list(ENTITIES_DIR.rglob("*.yaml"))
-    print(f"Processing {len(entity_files)} entity files...")
+    # Parsed records come from the shared record cache; YAML is only re-read for changed files
+    entity_records = list(iter_records(ENTITIES_DIR))
+    print(f"Processing {len(entity_records)} entity files...")
     
     fixed_count = 0
     error_count = 0
     
-    for entity_file in entity_files:
-        fixed, message = fix_entity_file(entity_file, software_defs, dry_run)
+    for entity_file, data in entity_records:
+        fixed, message = fix_entity_file(entity_file, software_defs, dry_run, data=data)
         if fixed:
             fixed_count += 1
             if fixed_count <= 20:  # Show first 20
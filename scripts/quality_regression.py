@@ -6,6 +6,7 @@ import json
 import re
 import sys
 from collections import Counter
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Tuple
@@ -14,12 +15,17 @@ _SCRIPTS_DIR = Path(__file__).resolve().parent
 if str(_SCRIPTS_DIR) not in sys.path:
     sys.path.insert(0, str(_SCRIPTS_DIR))
 
+import duckdb  # noqa: E402
+
 from constants import ENRICHMENT_ISSUE_PREFIXES, ENRICHMENT_ISSUE_TYPES  # noqa: E402
+from record_store import calculate_file_hash  # noqa: E402
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 DEFAULT_REPORT = REPO_ROOT / "dataquality" / "full_report.jsonl"
 DEFAULT_BASELINE = REPO_ROOT / "dataquality" / "baseline_counts.json"
 DEFAULT_FULL_REPORT_TXT = REPO_ROOT / "dataquality" / "full_report.txt"
+REPORT_COUNTS_NAME = "issue_counts.json"
+REPORT_COUNTS_VERSION = 2
 
 
 def is_enrichment_issue_type(issue_type: str | None) -> bool:
@@ -31,10 +37,118 @@ def is_enrichment_issue_type(issue_type: str | None) -> bool:
     return any(issue_type.startswith(prefix) for prefix in ENRICHMENT_ISSUE_PREFIXES)
 
 
-def load_issue_counts(report_path: Path = DEFAULT_REPORT) -> Tuple[Counter, Counter]:
-    """Return (by_priority, by_issue_type) counters from full_report.jsonl."""
-    by_priority: Counter = Counter()
-    by_issue_type: Counter = Counter()
+def columnar_report_path(report_path: Path = DEFAULT_REPORT) -> Path | None:
+    """Return the Parquet copy of a JSONL report written by analyze-quality, if it is current.
+
+    A .parquet report_path is returned as is; for full_report.jsonl the sibling
+    full_report.parquet is used when it is at least as new as the JSONL file.
+    """
+    if report_path.suffix == ".parquet":
+        return report_path if report_path.exists() else None
+    parquet_path = report_path.with_suffix(".parquet")
+    if (
+        parquet_path.exists()
+        and report_path.exists()
+        and parquet_path.stat().st_mtime_ns >= report_path.stat().st_mtime_ns
+    ):
+        return parquet_path
+    return None
+
+
+@dataclass
+class ReportCounts:
+    """Every count the baseline needs, gathered in one pass over a quality report."""
+
+    by_type_priority: Counter = field(default_factory=Counter)
+    by_country: Counter = field(default_factory=Counter)
+    total_records_analyzed: int | None = None
+
+
+def report_counts_path(report_path: Path = DEFAULT_REPORT) -> Path:
+    """Precomputed counts written by analyze-quality next to full_report.jsonl."""
+    return report_path.with_name(REPORT_COUNTS_NAME)
+
+
+def write_report_counts(
+    path: Path,
+    by_type_priority: Counter,
+    by_country: Counter,
+    total_records_analyzed: int,
+    report_path: Path,
+) -> None:
+    """Write precomputed counts for report_path (called by analyze-quality).
+
+    The JSONL content hash is stored so readers can tell whether the counts
+    still describe the report, independent of file mtimes after a checkout.
+    """
+    nested: dict = {}
+    for (issue_type, priority), count in sorted(by_type_priority.items()):
+        nested.setdefault(issue_type, {})[priority] = count
+    payload = {
+        "version": REPORT_COUNTS_VERSION,
+        "report_hash": calculate_file_hash(report_path),
+        "total_records_analyzed": total_records_analyzed,
+        "by_type_priority": nested,
+        "by_country": dict(sorted(by_country.items())),
+    }
+    with Path(path).open("w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def _load_precomputed_counts(report_path: Path) -> ReportCounts | None:
+    counts_path = report_counts_path(report_path)
+    if report_path.suffix != ".jsonl" or not counts_path.exists() or not report_path.exists():
+        return None
+    try:
+        with counts_path.open("r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if payload.get("version") != REPORT_COUNTS_VERSION or payload.get("report_hash") != calculate_file_hash(report_path):
+        return None
+    return ReportCounts(
+        by_type_priority=Counter(
+            {
+                (issue_type, priority): count
+                for issue_type, priorities in payload["by_type_priority"].items()
+                for priority, count in priorities.items()
+            }
+        ),
+        by_country=Counter(payload["by_country"]),
+        total_records_analyzed=payload.get("total_records_analyzed"),
+    )
+
+
+def load_report_counts(report_path: Path = DEFAULT_REPORT, use_precomputed: bool = True) -> ReportCounts:
+    """Return issue counts by (issue_type, priority) and by country in a single pass.
+
+    Sources, fastest first: issue_counts.json written by analyze-quality (when
+    it matches the report), one DuckDB aggregate over full_report.parquet, or
+    one streaming decode of full_report.jsonl.
+    """
+    if use_precomputed:
+        precomputed = _load_precomputed_counts(report_path)
+        if precomputed is not None:
+            return precomputed
+
+    counts = ReportCounts()
+    parquet_path = columnar_report_path(report_path)
+    if parquet_path is not None:
+        rows = duckdb.execute(
+            """
+            SELECT coalesce(issue_type, 'UNKNOWN'), coalesce(priority, 'MEDIUM'),
+                   coalesce(country_code, 'UNKNOWN'), count(*)
+            FROM read_parquet(?)
+            GROUP BY ALL
+            """,
+            [str(parquet_path)],
+        ).fetchall()
+        for issue_type, priority, country_code, count in rows:
+            counts.by_type_priority[(issue_type, priority)] += count
+            counts.by_country[country_code] += count
+        return counts
+
     if not report_path.exists():
         raise FileNotFoundError(f"Quality report not found: {report_path}")
 
@@ -44,33 +158,39 @@ def load_issue_counts(report_path: Path = DEFAULT_REPORT) -> Tuple[Counter, Coun
             if not line:
                 continue
             issue = json.loads(line)
-            priority = issue.get("priority", "MEDIUM")
-            by_priority[priority] += 1
-            by_issue_type[issue.get("issue_type", "UNKNOWN")] += 1
+            counts.by_type_priority[(issue.get("issue_type") or "UNKNOWN", issue.get("priority") or "MEDIUM")] += 1
+            counts.by_country[issue.get("country_code") or "UNKNOWN"] += 1
+    return counts
+
+
+def load_type_priority_counts(report_path: Path = DEFAULT_REPORT) -> Counter:
+    """Return issue counts keyed by (issue_type, priority)."""
+    return load_report_counts(report_path).by_type_priority
+
+
+def _split_counts(type_priority_counts: Counter) -> Tuple[Counter, Counter]:
+    by_priority: Counter = Counter()
+    by_issue_type: Counter = Counter()
+    for (issue_type, priority), count in type_priority_counts.items():
+        by_priority[priority] += count
+        by_issue_type[issue_type] += count
     return by_priority, by_issue_type
 
 
-def load_track_counts(report_path: Path = DEFAULT_REPORT) -> dict:
-    """Return integrity/enrichment counts by priority from full_report.jsonl."""
+def load_issue_counts(report_path: Path = DEFAULT_REPORT) -> Tuple[Counter, Counter]:
+    """Return (by_priority, by_issue_type) counters from the quality report."""
+    return _split_counts(load_type_priority_counts(report_path))
+
+
+def track_counts(type_priority_counts: Counter) -> dict:
+    """Return integrity/enrichment counts by priority from (issue_type, priority) counts."""
     tracks = {
         "integrity": Counter(),
         "enrichment": Counter(),
     }
-    if not report_path.exists():
-        raise FileNotFoundError(f"Quality report not found: {report_path}")
-
-    with report_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            issue = json.loads(line)
-            priority = issue.get("priority", "MEDIUM")
-            track = (
-                "enrichment"
-                if is_enrichment_issue_type(issue.get("issue_type"))
-                else "integrity"
-            )
-            tracks[track][priority] += 1
+    for (issue_type, priority), count in type_priority_counts.items():
+        track = "enrichment" if is_enrichment_issue_type(issue_type) else "integrity"
+        tracks[track][priority] += count
     return {
         "integrity": {
             "CRITICAL": tracks["integrity"].get("CRITICAL", 0),
@@ -87,24 +207,37 @@ def load_track_counts(report_path: Path = DEFAULT_REPORT) -> dict:
     }
 
 
+def load_track_counts(report_path: Path = DEFAULT_REPORT) -> dict:
+    """Return integrity/enrichment counts by priority from the quality report."""
+    return track_counts(load_type_priority_counts(report_path))
+
+
 def parse_total_records_analyzed(full_report_txt: Path = DEFAULT_FULL_REPORT_TXT) -> int | None:
-    """Parse total records analyzed from full_report.txt header."""
+    """Parse total records analyzed from the full_report.txt header (first lines only)."""
     if not full_report_txt.exists():
         return None
-    match = re.search(r"Total Records Analyzed:\s*(\d+)", full_report_txt.read_text(encoding="utf-8"))
-    return int(match.group(1)) if match else None
+    with full_report_txt.open("r", encoding="utf-8") as f:
+        for _, line in zip(range(20), f):
+            match = re.search(r"Total Records Analyzed:\s*(\d+)", line)
+            if match:
+                return int(match.group(1))
+    return None
 
 
 def build_baseline_payload(
     report_path: Path = DEFAULT_REPORT,
     full_report_txt: Path = DEFAULT_FULL_REPORT_TXT,
 ) -> dict:
-    by_priority, by_issue_type = load_issue_counts(report_path)
-    by_track = load_track_counts(report_path)
+    counts = load_report_counts(report_path)
+    by_priority, by_issue_type = _split_counts(counts.by_type_priority)
+    by_track = track_counts(counts.by_type_priority)
+    total_records = counts.total_records_analyzed
+    if total_records is None:
+        total_records = parse_total_records_analyzed(full_report_txt)
     payload = {
         "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
         "source": str(report_path.relative_to(REPO_ROOT)),
-        "total_records_analyzed": parse_total_records_analyzed(full_report_txt),
+        "total_records_analyzed": total_records,
         "by_priority": {
             "CRITICAL": by_priority.get("CRITICAL", 0),
             "IMPORTANT": by_priority.get("IMPORTANT", 0),
@@ -115,6 +248,7 @@ def build_baseline_payload(
         "enrichment_issue_prefixes": list(ENRICHMENT_ISSUE_PREFIXES),
         "enrichment_issue_types": sorted(ENRICHMENT_ISSUE_TYPES),
         "by_issue_type": dict(sorted(by_issue_type.items())),
+        "by_country": dict(sorted(counts.by_country.items())),
     }
     return payload
 
@@ -163,14 +297,16 @@ def compare_to_baseline_with_warnings(
     with baseline_path.open("r", encoding="utf-8") as f:
         baseline = json.load(f)
 
-    current_tracks = load_track_counts(report_path)
+    # One pass over the report; every comparison below works on these counts
+    type_priority_counts = load_type_priority_counts(report_path)
+    current_tracks = track_counts(type_priority_counts)
     baseline_tracks = baseline.get("by_track")
     errors: list[str] = []
     warnings: list[str] = []
 
     # Backward compatible: older baselines without by_track fall back to total priority.
     if not baseline_tracks:
-        current_priority, _ = load_issue_counts(report_path)
+        current_priority, _ = _split_counts(type_priority_counts)
         baseline_priority = baseline.get("by_priority", {})
         for priority in ("CRITICAL", "IMPORTANT"):
             current = current_priority.get(priority, 0)
@@ -178,7 +314,7 @@ def compare_to_baseline_with_warnings(
             if current > allowed:
                 delta = current - allowed
                 top_types = _top_issue_types_for_priority(
-                    report_path, priority, integrity_only=True
+                    type_priority_counts, priority, integrity_only=True
                 )
                 detail = f" ({', '.join(top_types)})" if top_types else ""
                 errors.append(
@@ -192,7 +328,7 @@ def compare_to_baseline_with_warnings(
         if current > allowed:
             delta = current - allowed
             top_types = _top_issue_types_for_priority(
-                report_path, priority, integrity_only=True
+                type_priority_counts, priority, integrity_only=True
             )
             detail = f" ({', '.join(top_types)})" if top_types else ""
             errors.append(
@@ -206,7 +342,7 @@ def compare_to_baseline_with_warnings(
         if current > allowed:
             delta = current - allowed
             top_types = _top_issue_types_for_priority(
-                report_path, priority, enrichment_only=True
+                type_priority_counts, priority, enrichment_only=True
             )
             detail = f" ({', '.join(top_types)})" if top_types else ""
             message = (
@@ -222,26 +358,22 @@ def compare_to_baseline_with_warnings(
 
 
 def _top_issue_types_for_priority(
-    report_path: Path,
+    type_priority_counts: Counter,
     priority: str,
     limit: int = 5,
     integrity_only: bool = False,
     enrichment_only: bool = False,
 ) -> list[str]:
-    """Return top issue types for a priority tier from the current report."""
+    """Return top issue types for a priority tier from (issue_type, priority) counts."""
     type_counts: Counter = Counter()
-    with report_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            issue = json.loads(line)
-            if issue.get("priority") != priority:
-                continue
-            issue_type = issue.get("issue_type", "UNKNOWN")
-            enrichment = is_enrichment_issue_type(issue_type)
-            if integrity_only and enrichment:
-                continue
-            if enrichment_only and not enrichment:
-                continue
-            type_counts[issue_type] += 1
-    return [f"{issue_type}:{count}" for issue_type, count in type_counts.most_common(limit)]
+    for (issue_type, issue_priority), count in type_priority_counts.items():
+        if issue_priority != priority:
+            continue
+        enrichment = is_enrichment_issue_type(issue_type)
+        if integrity_only and enrichment:
+            continue
+        if enrichment_only and not enrichment:
+            continue
+        type_counts[issue_type] += count
+    top = sorted(type_counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [f"{issue_type}:{count}" for issue_type, count in top]
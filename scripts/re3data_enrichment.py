@@ -14,6 +14,8 @@ from urllib.parse import urlparse
 from requests.exceptions import RequestException, Timeout
 from datetime import datetime
 
+from record_store import open_record_index, record_path
+
 try:
     from yaml import CLoader as Loader, CDumper as Dumper
 except ImportError:
@@ -566,27 +568,10 @@ def collect_re3data_identifiers() -> Dict[str, str]:
     
     logger.info("Collecting re3data identifiers from catalogs...")
     
-    all_files = []
-    for root, dirs, files in os.walk(ROOT_DIR):
-        all_files.extend(
-            [os.path.join(root, fi) for fi in files if fi.endswith(".yaml")]
-        )
-    
-    for filepath in all_files:
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                catalog = yaml.load(f, Loader=Loader)
-            
-            if not catalog:
-                continue
-            
-            re3data_id = get_re3data_identifier(catalog)
-            if re3data_id:
-                catalog_id = catalog.get("id", os.path.basename(filepath))
-                re3data_ids[re3data_id] = filepath
-        
-        except Exception as e:
-            logger.debug(f"Error reading {filepath}: {e}")
+    with open_record_index() as index:
+        for row in index.rows("entities"):
+            if row["re3data_id"]:
+                re3data_ids[row["re3data_id"]] = str(record_path(row))
     
     logger.info(f"Found {len(re3data_ids)} catalogs with re3data identifiers")
     return re3data_ids
@@ -0,0 +1,559 @@
+"""Pre-parsed record cache and lookup index shared by scripts that walk data/entities.
+
+Parsing 19k YAML files dominates every full-tree script. iter_records() keeps
+the parsed records in one pickle file under data/datasets keyed by path, and
+re-parses YAML only for files whose mtime/size and content hash changed.
+RecordIndex is a SQLite sidecar for lookups by id, uid, canonical URL, host
+and re3data id without loading any records. Duplicate questions (records
+sharing an id, link or canonical link, entities-vs-scheduled matches) are SQL
+set operations on it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import yaml
+
+try:
+    from yaml import CLoader as Loader
+except ImportError:
+    from yaml import Loader
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ENTITIES_DIR = REPO_ROOT / "data" / "entities"
+SCHEDULED_DIR = REPO_ROOT / "data" / "scheduled"
+RECORD_CACHE_PATH = REPO_ROOT / "data" / "datasets" / "record_cache.pickle"
+
+# Bump when the cached entry layout changes; older caches are discarded.
+RECORD_CACHE_VERSION = 1
+
+PathLike = Union[str, os.PathLike]
+
+
+def calculate_file_hash(file_path: PathLike) -> Optional[str]:
+    """Calculate MD5 hash of a file."""
+    try:
+        hash_md5 = hashlib.md5()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(4096), b""):
+                hash_md5.update(chunk)
+        return hash_md5.hexdigest()
+    except Exception as e:
+        logger.debug(f"Error calculating hash for {file_path}: {e}")
+        return None
+
+
+def _cache_key(path: Path) -> Optional[str]:
+    """Repository-relative POSIX path, or None for paths outside the repository."""
+    try:
+        return path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return None
+
+
+def load_record_cache(cache_path: PathLike = RECORD_CACHE_PATH) -> Dict[str, dict]:
+    """Return {path key: {mtime, size, hash, record}}; empty if missing, stale or unreadable."""
+    cache_path = Path(cache_path)
+    if not cache_path.exists():
+        return {}
+    try:
+        with cache_path.open("rb") as handle:
+            payload = pickle.load(handle)
+    except Exception as e:
+        logger.warning("Ignoring unreadable record cache %s: %s", cache_path, e)
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != RECORD_CACHE_VERSION:
+        return {}
+    return payload.get("entries", {})
+
+
+def save_record_cache(entries: Dict[str, dict], cache_path: PathLike = RECORD_CACHE_PATH) -> None:
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    with tmp_path.open("wb") as handle:
+        pickle.dump(
+            {"version": RECORD_CACHE_VERSION, "entries": entries},
+            handle,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_path, cache_path)
+
+
+def list_yaml_files(root_dir: PathLike) -> List[str]:
+    """All *.yaml files under root_dir in sorted path order."""
+    return sorted(
+        os.path.join(root, name)
+        for root, _, files in os.walk(root_dir)
+        for name in files
+        if name.endswith(".yaml")
+    )
+
+
+def load_records(
+    root_dir: PathLike = ENTITIES_DIR,
+    cache_path: Optional[PathLike] = RECORD_CACHE_PATH,
+) -> List[Tuple[Path, Any]]:
+    """Return (path, record) for every YAML file under root_dir, in sorted path order.
+
+    Unchanged files come from the cache; changed or new files are parsed and the
+    cache is rewritten. Entries for other roots are kept, entries for deleted
+    files under root_dir are dropped. Files that fail to parse are logged and
+    skipped. Pass cache_path=None to parse everything without a cache; roots
+    outside the repository (e.g. test fixtures) never use the shared cache.
+    """
+    root_dir = Path(root_dir).resolve()
+    root_key = _cache_key(root_dir)
+    if root_key is None:
+        root_key = root_dir.as_posix()
+        if cache_path == RECORD_CACHE_PATH:
+            cache_path = None
+    cache = load_record_cache(cache_path) if cache_path is not None else {}
+    root_prefix = len(str(root_dir))
+    updated = {
+        key: entry
+        for key, entry in cache.items()
+        if not (key == root_key or key.startswith(root_key + "/"))
+    }
+
+    records = []
+    parsed = 0
+    dirty = False
+    for path in list_yaml_files(root_dir):
+        key = root_key + path[root_prefix:].replace(os.sep, "/")
+        stat = os.stat(path)
+        entry = cache.get(key)
+        if entry is None or entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            dirty = True
+            with open(path, "rb") as handle:
+                content = handle.read()
+            digest = hashlib.md5(content).hexdigest()
+            if entry is None or entry["hash"] != digest:
+                try:
+                    record = yaml.load(content, Loader=Loader)
+                except yaml.YAMLError as e:
+                    logger.warning("Skipping %s: %s", path, e)
+                    continue
+                entry = {"record": record}
+                parsed += 1
+            entry = {
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "hash": digest,
+                "record": entry["record"],
+            }
+        updated[key] = entry
+        records.append((Path(path), entry["record"]))
+
+    # Deleted files leave stale keys behind under root_dir
+    dirty = dirty or len(updated) != len(cache)
+    if cache_path is not None and dirty:
+        save_record_cache(updated, cache_path)
+    logger.debug("Loaded %d records from %s (%d parsed from YAML)", len(records), root_dir, parsed)
+    return records
+
+
+def iter_records(
+    root_dir: PathLike = ENTITIES_DIR,
+    cache_path: Optional[PathLike] = RECORD_CACHE_PATH,
+) -> Iterator[Tuple[Path, Any]]:
+    """Yield (path, record) for every YAML file under root_dir, using the record cache.
+
+    Records are fresh copies on every call, so callers may modify and save them.
+    """
+    yield from load_records(root_dir, cache_path=cache_path)
+
+
+# Indexed lookups ------------------------------------------------------------
+
+RECORD_INDEX_PATH = REPO_ROOT / "data" / "datasets" / "record_index.sqlite"
+
+# Bump when the index tables change; older index files are rebuilt from scratch.
+RECORD_INDEX_VERSION = 4
+
+RECORD_INDEX_COLUMNS = (
+    "id",
+    "uid",
+    "link",
+    "canonical_url",
+    "canonical_link",
+    "host",
+    "re3data_id",
+    "country",
+    "catalog_type",
+    "software_id",
+    "error",
+)
+
+
+def canonical_url(url: Optional[str]) -> str:
+    """Scheme-less, lowercase URL without www. and trailing slash ("" for empty input)."""
+    if not url or not isinstance(url, str):
+        return ""
+    url = url.lower().strip()
+    url = re.sub(r"^https?://", "", url)
+    url = re.sub(r"^www\.", "", url)
+    return url.rstrip("/")
+
+
+def canonical_link(url: Optional[str]) -> Optional[str]:
+    """Link as compared by the duplicate-link quality rules (None for empty or unparsable input).
+
+    Unlike canonical_url() this keeps the scheme, query and any non-default
+    port: scheme://host[:port]path?query with a lowercase host, no www. and
+    no trailing slash.
+    """
+    if not url or not isinstance(url, str):
+        return None
+    raw = url.strip()
+    if not raw:
+        return None
+    try:
+        parsed = urlparse(raw)
+        port = parsed.port
+    except ValueError:
+        return None
+    if not parsed.scheme or not parsed.netloc:
+        return None
+
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if not host:
+        return None
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+
+    path = parsed.path or ""
+    if path == "/":
+        path = ""
+    elif path.endswith("/"):
+        path = path.rstrip("/")
+
+    query = f"?{parsed.query}" if parsed.query else ""
+    return f"{scheme}://{host}{path}{query}"
+
+
+def url_host(url: Optional[str]) -> str:
+    """Lowercase host name of a URL without www. and port ("" for empty input)."""
+    return canonical_url(url).split("/")[0].split("?")[0].split(":")[0]
+
+
+def _nested_id(record: dict, *keys: str) -> Optional[str]:
+    value: Any = record
+    for key in keys:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value if isinstance(value, str) else None
+
+
+def _scalar(value: Any) -> Optional[Union[str, int, float]]:
+    """value if SQLite can store it in a TEXT column, else None (lists and mappings)."""
+    return value if isinstance(value, (str, int, float)) and not isinstance(value, bool) else None
+
+
+def record_index_row(record: Any) -> Dict[str, Optional[str]]:
+    """Lookup columns for one record; for empty or non-mapping records only error is set."""
+    if not isinstance(record, dict):
+        return dict(dict.fromkeys(RECORD_INDEX_COLUMNS), error="empty file" if record is None else "not a mapping")
+    link = record.get("link") if isinstance(record.get("link"), str) else None
+    re3data_id = None
+    for identifier in record.get("identifiers") or []:
+        if isinstance(identifier, dict) and identifier.get("id") == "re3data":
+            re3data_id = identifier.get("value")
+            break
+    return {
+        "id": _scalar(record.get("id")),
+        "uid": _scalar(record.get("uid")),
+        "link": link,
+        "canonical_url": canonical_url(link) or None,
+        "canonical_link": canonical_link(link),
+        "host": url_host(link) or None,
+        "re3data_id": _scalar(re3data_id),
+        "country": _nested_id(record, "owner", "location", "country", "id"),
+        "catalog_type": _scalar(record.get("catalog_type")),
+        "software_id": _nested_id(record, "software", "id"),
+        "error": None if _scalar(record.get("id")) else "missing id",
+    }
+
+
+def record_hosts(record: Any) -> List[Tuple[str, str]]:
+    """(host, source) pairs for the record link and every endpoint URL."""
+    if not isinstance(record, dict):
+        return []
+    hosts = []
+    if url_host(record.get("link")):
+        hosts.append((url_host(record.get("link")), "link"))
+    for endpoint in record.get("endpoints") or []:
+        if isinstance(endpoint, dict) and url_host(endpoint.get("url")):
+            hosts.append((url_host(endpoint.get("url")), "endpoint"))
+    return hosts
+
+
+def index_entry(record: Any) -> Tuple[Dict[str, Optional[str]], List[Tuple[str, str]]]:
+    """(record_index_row(), record_hosts()) for one record, as stored by RecordIndex.update_entries()."""
+    return record_index_row(record), record_hosts(record)
+
+
+def index_key(root_dir: PathLike, rel_path: str) -> str:
+    """RecordIndex path key of a file given relative to root_dir."""
+    return _root_prefix(root_dir) + rel_path.replace(os.sep, "/")
+
+
+class RecordIndex:
+    """SQLite sidecar with one row per YAML file, indexed by id, uid, canonical URL, host and re3data id.
+
+    Rows carry the file's mtime and size, so update_from_manifest() (used by
+    builder.py build), update_entries() (used by analyze-quality) and refresh()
+    only touch files that changed.
+    """
+
+    def __init__(self, path: PathLike = RECORD_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def __enter__(self) -> "RecordIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _create_schema(self) -> None:
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] == RECORD_INDEX_VERSION:
+            return
+        columns = ", ".join(f"{name} TEXT" for name in RECORD_INDEX_COLUMNS)
+        with self.conn:
+            self.conn.execute("DROP TABLE IF EXISTS records")
+            self.conn.execute("DROP TABLE IF EXISTS record_hosts")
+            self.conn.execute(
+                f"CREATE TABLE records (path TEXT PRIMARY KEY, dataset TEXT, mtime INTEGER, size INTEGER, {columns})"
+            )
+            self.conn.execute("CREATE TABLE record_hosts (path TEXT, host TEXT, source TEXT)")
+            for column in ("id", "uid", "link", "canonical_url", "canonical_link", "host", "re3data_id"):
+                self.conn.execute(f"CREATE INDEX idx_records_{column} ON records ({column})")
+            self.conn.execute("CREATE INDEX idx_record_hosts_host ON record_hosts (host)")
+            self.conn.execute("CREATE INDEX idx_record_hosts_path ON record_hosts (path)")
+            self.conn.execute(f"PRAGMA user_version = {RECORD_INDEX_VERSION}")
+
+    def _sync(self, dataset: str, files) -> Tuple[int, int]:
+        """Upsert rows for files whose (mtime, size) changed and drop rows for files that are gone.
+
+        files yields (path key, mtime, size, load) where load() returns the
+        index_entry() of the record or raises yaml.YAMLError; the parse error is
+        kept in the error column.
+        """
+        stamps = {
+            row["path"]: (row["mtime"], row["size"])
+            for row in self.conn.execute("SELECT path, mtime, size FROM records WHERE dataset = ?", (dataset,))
+        }
+        seen = set()
+        updated = 0
+        placeholders = ", ".join("?" for _ in range(4 + len(RECORD_INDEX_COLUMNS)))
+        with self.conn:
+            for key, mtime, size, load in files:
+                seen.add(key)
+                if stamps.get(key) == (mtime, size):
+                    continue
+                try:
+                    row, hosts = load()
+                except yaml.YAMLError as e:
+                    logger.warning("Skipping %s: %s", key, e)
+                    row = dict(dict.fromkeys(RECORD_INDEX_COLUMNS), error="invalid YAML: " + " ".join(str(e).split()))
+                    hosts = []
+                self.conn.execute(
+                    f"INSERT OR REPLACE INTO records VALUES ({placeholders})",
+                    (key, dataset, mtime, size, *(row[name] for name in RECORD_INDEX_COLUMNS)),
+                )
+                self.conn.execute("DELETE FROM record_hosts WHERE path = ?", (key,))
+                self.conn.executemany(
+                    "INSERT INTO record_hosts VALUES (?, ?, ?)",
+                    [(key, host, source) for host, source in hosts],
+                )
+                updated += 1
+            removed = [(key,) for key in stamps if key not in seen]
+            self.conn.executemany("DELETE FROM records WHERE path = ?", removed)
+            self.conn.executemany("DELETE FROM record_hosts WHERE path = ?", removed)
+        if updated or removed:
+            logger.info("Record index %s: updated %d, removed %d", dataset, updated, len(removed))
+        return updated, len(removed)
+
+    def update_from_manifest(self, dataset: str, root_dir: PathLike, entries) -> Tuple[int, int]:
+        """Sync from builder.py manifest entries (path relative to root_dir, mtime, size, JSON line)."""
+        prefix = _root_prefix(root_dir)
+
+        def files():
+            for entry in entries:
+                line = entry.get("line")
+                yield (
+                    prefix + entry["path"].replace(os.sep, "/"),
+                    entry["mtime"],
+                    entry["size"],
+                    lambda line=line: index_entry(json.loads(line) if line else None),
+                )
+
+        return self._sync(dataset, files())
+
+    def update_entries(self, dataset: str, root_dir: PathLike, entries) -> Tuple[int, int]:
+        """Sync from precomputed entries: (path relative to root_dir, mtime, size, index_entry()).
+
+        Files missing from entries are dropped from dataset, as in refresh().
+        """
+        prefix = _root_prefix(root_dir)
+
+        def files():
+            for rel_path, mtime, size, entry in entries:
+                yield prefix + rel_path.replace(os.sep, "/"), mtime, size, lambda entry=entry: entry
+
+        return self._sync(dataset, files())
+
+    def refresh(self, dataset: str, root_dir: PathLike) -> Tuple[int, int]:
+        """Sync from the YAML tree, parsing only files that changed since the last sync."""
+        root_dir = Path(root_dir).resolve()
+        prefix = _root_prefix(root_dir)
+        root_len = len(str(root_dir)) + 1
+
+        def load(path):
+            with open(path, "rb") as handle:
+                return index_entry(yaml.load(handle, Loader=Loader))
+
+        def files():
+            for path in list_yaml_files(root_dir):
+                stat = os.stat(path)
+                yield (
+                    prefix + path[root_len:].replace(os.sep, "/"),
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    lambda path=path: load(path),
+                )
+
+        return self._sync(dataset, files())
+
+    def _select(self, where: str, value: str) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(f"SELECT * FROM records WHERE {where} ORDER BY path", (value,))
+        return [dict(row) for row in rows]
+
+    def by_id(self, record_id: str) -> List[Dict[str, Any]]:
+        return self._select("id = ?", record_id)
+
+    def by_uid(self, uid: str) -> List[Dict[str, Any]]:
+        return self._select("uid = ?", uid)
+
+    def by_canonical_url(self, url: str) -> List[Dict[str, Any]]:
+        """Records whose link matches url after canonical_url() normalization."""
+        return self._select("canonical_url = ?", canonical_url(url))
+
+    def by_host(self, host_or_url: str) -> List[Dict[str, Any]]:
+        """Records with the host in their link or any endpoint URL."""
+        return self._select(
+            "path IN (SELECT path FROM record_hosts WHERE host = ?)", url_host(host_or_url)
+        )
+
+    def by_re3data_id(self, re3data_id: str) -> List[Dict[str, Any]]:
+        return self._select("re3data_id = ?", re3data_id)
+
+    def rows(self, dataset: Optional[str] = None) -> List[Dict[str, Any]]:
+        """All indexed records with an id, optionally limited to one dataset."""
+        sql = "SELECT * FROM records WHERE id IS NOT NULL"
+        params: Tuple[str, ...] = ()
+        if dataset is not None:
+            sql += " AND dataset = ?"
+            params = (dataset,)
+        return [dict(row) for row in self.conn.execute(sql + " ORDER BY path", params)]
+
+    def groups(
+        self, column: str, dataset: Optional[str] = None, varying: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Rows grouped by a shared value of column, for values held by two or more files.
+
+        With varying, only groups with at least two distinct values of that
+        column are returned, e.g. groups("canonical_link", varying="link") for
+        links that differ only in case, www. or a trailing slash. Groups are
+        ordered by value and rows within a group by path.
+        """
+        for name in (column, varying):
+            if name is not None and name not in RECORD_INDEX_COLUMNS:
+                raise ValueError(f"Unknown record index column: {name}")
+        having = f"COUNT(DISTINCT {varying})" if varying else "COUNT(*)"
+        scope = "dataset = ? AND " if dataset is not None else ""
+        params: Tuple[str, ...] = (dataset, dataset) if dataset is not None else ()
+        sql = (
+            f"SELECT * FROM records WHERE {scope}{column} IN ("
+            f"SELECT {column} FROM records WHERE {scope}{column} IS NOT NULL "
+            f"GROUP BY {column} HAVING {having} > 1) ORDER BY {column}, path"
+        )
+        groups: List[List[Dict[str, Any]]] = []
+        for row in self.conn.execute(sql, params):
+            if not groups or groups[-1][0][column] != row[column]:
+                groups.append([])
+            groups[-1].append(dict(row))
+        return groups
+
+    def cross_dataset_duplicates(self, dataset: str, other: str) -> List[Dict[str, Any]]:
+        """Records of dataset that already exist in other.
+
+        A record matches when its id equals an id in other, or its canonical
+        URL or host equals the canonical URL or host of a link in other.
+        """
+        sql = (
+            "WITH keys AS (SELECT canonical_url AS key FROM records WHERE dataset = :other "
+            "UNION SELECT host FROM records WHERE dataset = :other) "
+            "SELECT * FROM records WHERE dataset = :dataset AND ("
+            "id IN (SELECT id FROM records WHERE dataset = :other) "
+            "OR canonical_url IN (SELECT key FROM keys) OR host IN (SELECT key FROM keys)) ORDER BY path"
+        )
+        return [dict(row) for row in self.conn.execute(sql, {"dataset": dataset, "other": other})]
+
+    def invalid_records(self, dataset: str) -> List[Tuple[str, str]]:
+        """(path, error) for indexed files of dataset without an id: the YAML parse error, "not a mapping", etc."""
+        rows = self.conn.execute(
+            "SELECT path, error FROM records WHERE dataset = ? AND id IS NULL ORDER BY path", (dataset,)
+        )
+        return [(row[0], row[1]) for row in rows]
+
+    def hosts(self, dataset: Optional[str] = None) -> set:
+        """Distinct hosts from record links and endpoint URLs."""
+        sql = "SELECT DISTINCT h.host FROM record_hosts h"
+        params: Tuple[str, ...] = ()
+        if dataset is not None:
+            sql += " JOIN records r USING (path) WHERE r.dataset = ?"
+            params = (dataset,)
+        return {row[0] for row in self.conn.execute(sql, params)}
+
+
+def record_path(row: Dict[str, Any]) -> Path:
+    """Absolute YAML path of an index row."""
+    return REPO_ROOT / row["path"]
+
+
+def _root_prefix(root_dir: PathLike) -> str:
+    root_dir = Path(root_dir).resolve()
+    return (_cache_key(root_dir) or root_dir.as_posix()) + "/"
+
+
+def open_record_index(path: PathLike = RECORD_INDEX_PATH, refresh: bool = True) -> RecordIndex:
+    """Open the record index; with refresh, first sync entities and scheduled from YAML."""
+    index = RecordIndex(path)
+    if refresh:
+        index.refresh("entities", ENTITIES_DIR)
+        index.refresh("scheduled", SCHEDULED_DIR)
+    return index
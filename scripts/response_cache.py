@@ -0,0 +1,226 @@
+"""On-disk HTTP response cache for apidetect probes.
+
+Every detect run requests the same /api/3/action/status_show, /rest/services
+and GetCapabilities URLs again. ResponseCache keeps responses in a SQLite file
+under data/datasets keyed by method, URL, Accept header and request body.
+CachedSession wraps a requests.Session (or anything with get/post):
+
+- entries younger than their TTL are served from disk;
+- expired entries with an ETag or Last-Modified are revalidated with a
+  conditional request, and a 304 keeps the stored body;
+- offline mode replays stored responses regardless of age and raises
+  requests.exceptions.ConnectionError for anything not cached, so detection
+  logic can be re-run without touching the network.
+
+Client errors such as 404 are cached like any other response. Rate limits
+(429), server errors (5xx), timeouts and connection errors are not, so a
+transient failure is retried on the next run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from record_store import REPO_ROOT, PathLike
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_PATH = REPO_ROOT / "data" / "datasets" / "response_cache.sqlite"
+
+# Bump when the table layout changes; older caches are dropped.
+RESPONSE_CACHE_VERSION = 1
+
+# Seconds a stored response is served without revalidation
+DEFAULT_TTL = 24 * 3600
+
+# Per-entry TTLs set as "cache_ttl" on apidetect URL-map entries: API roots
+# report live portal status, OGC capability documents rarely change.
+API_STATUS_TTL = 3600
+CAPABILITIES_TTL = 7 * 24 * 3600
+
+# Statuses that say "try again later" rather than anything about the URL
+TRANSIENT_STATUSES = {429}
+
+
+def is_cacheable(status_code: int) -> bool:
+    """Whether a response with this status is worth storing."""
+    return status_code < 500 and status_code not in TRANSIENT_STATUSES
+
+
+def cache_key(method: str, url: str, accept: Optional[str] = None, body: Any = None) -> str:
+    """Stable key for a request: method, URL, Accept header and body (JSON bodies with sorted keys)."""
+    if body is not None and not isinstance(body, (str, bytes)):
+        body = json.dumps(body, sort_keys=True, ensure_ascii=False)
+    if isinstance(body, bytes):
+        body = body.decode("utf8", errors="replace")
+    payload = json.dumps([method.upper(), url, accept or "", body or ""], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf8")).hexdigest()
+
+
+def _header(headers: Optional[Mapping], name: str) -> Optional[str]:
+    """Case-insensitive header lookup that also works for plain dicts."""
+    if not headers:
+        return None
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+class ResponseCache:
+    """SQLite store of HTTP responses, safe to share between threads."""
+
+    def __init__(self, path: PathLike = RESPONSE_CACHE_PATH, ttl: float = DEFAULT_TTL, offline: bool = False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.offline = offline
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def _create_schema(self) -> None:
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] == RESPONSE_CACHE_VERSION:
+            return
+        with self.conn:
+            self.conn.execute("DROP TABLE IF EXISTS responses")
+            self.conn.execute(
+                "CREATE TABLE responses (key TEXT PRIMARY KEY, method TEXT, url TEXT, status INTEGER, "
+                "headers TEXT, content BLOB, etag TEXT, last_modified TEXT, fetched_at REAL)"
+            )
+            self.conn.execute(f"PRAGMA user_version = {RESPONSE_CACHE_VERSION}")
+
+    def get(self, key: str) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self.conn.execute("SELECT * FROM responses WHERE key = ?", (key,)).fetchone()
+
+    def store(self, key: str, method: str, url: str, response, fetched_at: Optional[float] = None) -> None:
+        headers = dict(response.headers or {})
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    method.upper(),
+                    getattr(response, "url", None) or url,
+                    response.status_code,
+                    json.dumps(headers),
+                    response.content,
+                    _header(headers, "ETag"),
+                    _header(headers, "Last-Modified"),
+                    time.time() if fetched_at is None else fetched_at,
+                ),
+            )
+
+    def count(self, outcome: str) -> None:
+        """Add one to stats[outcome]; CachedSession is shared by the probe threads."""
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def log_stats(self) -> None:
+        """Log hits, misses, revalidations and responses left uncached during this run."""
+        logger.info(
+            "Response cache %s: %d hits, %d misses, %d revalidated, %d not stored, %d offline misses",
+            self.path,
+            self.stats["hit"],
+            self.stats["miss"],
+            self.stats["revalidated"],
+            self.stats["not_stored"],
+            self.stats["offline_miss"],
+        )
+
+    def touch(self, key: str, fetched_at: Optional[float] = None) -> None:
+        """Mark an entry fresh again after a 304 Not Modified."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE responses SET fetched_at = ? WHERE key = ?",
+                (time.time() if fetched_at is None else fetched_at, key),
+            )
+
+
+def cached_response(row: sqlite3.Row) -> requests.Response:
+    """Rebuild a requests.Response from a stored row; from_cache is set to True."""
+    response = requests.Response()
+    response.status_code = row["status"]
+    response.headers = CaseInsensitiveDict(json.loads(row["headers"]))
+    response._content = row["content"]
+    response.url = row["url"]
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.from_cache = True
+    return response
+
+
+class CachedSession:
+    """Session wrapper answering GET/POST from a ResponseCache.
+
+    get() and post() take the usual requests keyword arguments plus an
+    optional ttl (seconds) overriding the cache default for that request.
+    Other attributes are delegated to the wrapped session.
+    """
+
+    def __init__(self, session, cache: ResponseCache):
+        self.session = session
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, ttl: Optional[float] = None, **kwargs):
+        headers = dict(kwargs.pop("headers", None) or {})
+        body = kwargs.get("json", kwargs.get("data"))
+        key = cache_key(method, url, _header(headers, "Accept"), body)
+        entry = self.cache.get(key)
+        ttl = self.cache.ttl if ttl is None else ttl
+        if entry is not None and (self.cache.offline or time.time() - entry["fetched_at"] < ttl):
+            self.cache.count("hit")
+            return cached_response(entry)
+        if self.cache.offline:
+            self.cache.count("offline_miss")
+            raise requests.exceptions.ConnectionError(f"{method.upper()} {url} is not in the response cache (offline)")
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = getattr(self.session, method.lower())(url, headers=headers, **kwargs)
+        if entry is not None and response.status_code == 304:
+            self.cache.count("revalidated")
+            self.cache.touch(key)
+            return cached_response(entry)
+        self.cache.count("miss")
+        if is_cacheable(response.status_code):
+            self.cache.store(key, method, url, response)
+        else:
+            self.cache.count("not_stored")
+        return response
@@ -0,0 +1,175 @@
+"""Compiled fast path for the Cerberus catalog schema.
+
+Cerberus interprets data/schemes/catalog.json rule by rule for every record
+(about 6 ms per catalog). compile_schema() turns the schema into the source of
+one plain Python predicate per rule set, in the spirit of fastjsonschema, and
+execs it once. The predicate only answers "valid or not" and is never more
+lenient than Cerberus.
+
+CompiledValidator is a drop-in for cerberus.Validator in builder.py: records
+the compiled predicate accepts are valid without touching Cerberus; anything
+else is re-validated by Cerberus, so .errors (and exceptions) are exactly what
+Cerberus reports.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Python types accepted for each Cerberus type name. Stricter than Cerberus
+# where it differs (bool is not an integer, lists only), which is safe: a
+# rejected record falls back to Cerberus.
+TYPE_CHECKS = {
+    "string": "isinstance({v}, str)",
+    "integer": "(isinstance({v}, int) and not isinstance({v}, bool))",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "float": "isinstance({v}, float)",
+    "boolean": "isinstance({v}, bool)",
+    "dict": "isinstance({v}, dict)",
+    "list": "isinstance({v}, list)",
+}
+
+SUPPORTED_RULES = {"type", "required", "empty", "nullable", "allowed", "min", "max", "anyof", "schema"}
+
+
+class UnsupportedSchema(ValueError):
+    """The schema uses a rule the compiler does not translate."""
+
+
+class _Compiler:
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.constants: Dict[str, Any] = {}
+        self.counter = 0
+
+    def _name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def _constant(self, value: Any) -> str:
+        name = self._name("_C")
+        self.constants[name] = value
+        return name
+
+    def rules(self, rules: dict) -> str:
+        """Emit a predicate for one field's rule set and return its function name."""
+        unknown = set(rules) - SUPPORTED_RULES
+        if unknown:
+            raise UnsupportedSchema(f"Unsupported Cerberus rules: {', '.join(sorted(unknown))}")
+        name = self._name("_rules")
+        body = []
+        if not rules.get("nullable", False):
+            body.append("if v is None: return False")
+        else:
+            body.append("if v is None: return True")
+        if "type" in rules:
+            types = rules["type"] if isinstance(rules["type"], list) else [rules["type"]]
+            if any(t not in TYPE_CHECKS for t in types):
+                raise UnsupportedSchema(f"Unsupported Cerberus type: {rules['type']}")
+            body.append(f"if not ({' or '.join(TYPE_CHECKS[t].format(v='v') for t in types)}): return False")
+        if rules.get("empty", True) is False:
+            body.append("if isinstance(v, (str, list, dict)) and not v: return False")
+        if "allowed" in rules:
+            allowed = self._constant(frozenset(rules["allowed"]))
+            body.append("if isinstance(v, list):")
+            body.append(f"    if not all(isinstance(i, str) and i in {allowed} for i in v): return False")
+            body.append(f"elif isinstance(v, dict) or v not in {allowed}: return False")
+        if "min" in rules:
+            body.append(f"if v < {self._constant(rules['min'])}: return False")
+        if "max" in rules:
+            body.append(f"if v > {self._constant(rules['max'])}: return False")
+        if "anyof" in rules:
+            options = [self.rules(option) for option in rules["anyof"]]
+            body.append(f"if not ({' or '.join(f'{option}(v)' for option in options)}): return False")
+        if "schema" in rules:
+            types = rules.get("type")
+            if types == "dict":
+                body.append(f"if not {self.mapping(rules['schema'])}(v): return False")
+            elif types == "list":
+                items = self.rules(rules["schema"])
+                body.append(f"if not all({items}(i) for i in v): return False")
+            else:
+                raise UnsupportedSchema("'schema' is only compiled for type dict or list")
+        body.append("return True")
+        self._function(name, body)
+        return name
+
+    def mapping(self, fields: dict) -> str:
+        """Emit a predicate for a dict against a field mapping (unknown keys rejected)."""
+        name = self._name("_mapping")
+        checks = {field: self.rules(rules) for field, rules in fields.items()}
+        known = self._constant(frozenset(fields))
+        body = [
+            "if not isinstance(d, dict): return False",
+            f"if not {known}.issuperset(d): return False",
+        ]
+        for field, rules in fields.items():
+            if rules.get("required", False):
+                body.append(f"if {field!r} not in d: return False")
+        for field, check in checks.items():
+            body.append(f"if {field!r} in d and not {check}(d[{field!r}]): return False")
+        body.append("return True")
+        self._function(name, body, argument="d")
+        return name
+
+    def _function(self, name: str, body: List[str], argument: str = "v") -> None:
+        self.lines.append(f"def {name}({argument}):")
+        self.lines.extend(f"    {line}" for line in body)
+        self.lines.append("")
+
+
+def compile_schema(schema: dict) -> Callable[[Any], bool]:
+    """Compile a Cerberus document schema into a predicate; raises UnsupportedSchema for unknown rules."""
+    compiler = _Compiler()
+    root = compiler.mapping(schema)
+    namespace: Dict[str, Any] = dict(compiler.constants)
+    exec(compile("\n".join(compiler.lines), "<compiled catalog schema>", "exec"), namespace)
+    check = namespace[root]
+
+    def is_valid(document: Any) -> bool:
+        try:
+            return check(document)
+        except Exception:
+            # Uncomparable values and the like: let Cerberus report them
+            return False
+
+    return is_valid
+
+
+class CompiledValidator:
+    """Cerberus Validator with a compiled fast path for valid documents.
+
+    validate() returns the same result as cerberus.Validator.validate() and
+    fills .errors in the same format; only documents the compiled predicate
+    rejects are handed to Cerberus.
+    """
+
+    def __init__(self, schema: dict):
+        from cerberus import Validator
+
+        self.schema = schema
+        self.errors: Dict[str, Any] = {}
+        self._cerberus = Validator(schema)
+        try:
+            self._check: Optional[Callable[[Any], bool]] = compile_schema(schema)
+        except UnsupportedSchema as e:
+            logger.warning("Validating with Cerberus only: %s", e)
+            self._check = None
+
+    def validate(self, document: Any, schema: Optional[dict] = None) -> bool:
+        if self._check is not None and (schema is None or schema is self.schema) and self._check(document):
+            self.errors = {}
+            return True
+        valid = self._cerberus.validate(document, schema or self.schema)
+        self.errors = self._cerberus.errors
+        return valid
+
+
+def load_validator(schema_file: str) -> CompiledValidator:
+    """CompiledValidator for a Cerberus schema JSON file."""
+    with open(schema_file, "r", encoding="utf8") as f:
+        return CompiledValidator(json.load(f))
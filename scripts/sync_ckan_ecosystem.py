@@ -50,6 +50,7 @@ sys.path.insert(0, _SCRIPT_DIR)
 # Import builder module and access its components
 # Note: builder.py imports constants, so we need to ensure the path is set first
 import builder
+from record_store import open_record_index
 
 # Access constants and functions from builder
 DATASETS_DIR = builder.DATASETS_DIR
@@ -457,7 +458,7 @@ def enrich_metadata_from_web(url: str, existing_metadata: Dict) -> Dict:
 
 
 def get_existing_entries() -> Tuple[Set[str], Set[str], Dict[str, str]]:
-    """Load existing registry entries and return sets for duplicate detection.
+    """Load existing registry entries (entities and scheduled) from the record index.
     
     Returns:
         Tuple of (existing_ids, existing_urls, url_to_id)
@@ -466,60 +467,19 @@ def get_existing_entries() -> Tuple[Set[str], Set[str], Dict[str, str]]:
     existing_urls = set()
     url_to_id = {}
     
-    # Load from full.jsonl
-    full_jsonl_path = os.path.join(DATASETS_DIR, "full.jsonl")
-    if os.path.exists(full_jsonl_path):
-        try:
-            full_data = load_jsonl(full_jsonl_path)
-            for row in tqdm.tqdm(full_data, desc="Loading existing entries", unit="entry", leave=False):
-                record_id = row.get("id")
-                record_url = row.get("link")
-                
-                if record_id:
-                    existing_ids.add(record_id)
-                
-                if record_url:
-                    normalized_url = normalize_url(record_url)
-                    normalized_domain = normalize_domain(record_url)
-                    existing_urls.add(normalized_url)
-                    existing_urls.add(normalized_domain)
-                    if record_id:
-                        url_to_id[normalized_url] = record_id
-                        url_to_id[normalized_domain] = record_id
-        except Exception as e:
-            logger.warning(f"Error loading existing entries: {e}")
-    
-    # Also check scheduled directory
-    if os.path.exists(SCHEDULED_DIR):
-        # Collect all YAML files first for progress tracking
-        yaml_files = []
-        for root, dirs, files in os.walk(SCHEDULED_DIR):
-            for filename in files:
-                if filename.endswith(".yaml"):
-                    yaml_files.append(os.path.join(root, filename))
-        
-        for filepath in tqdm.tqdm(yaml_files, desc="Loading scheduled entries", unit="file", leave=False):
-            try:
-                import yaml
-                from yaml import CLoader as Loader
-                with open(filepath, "r", encoding="utf8") as f:
-                    record = yaml.load(f, Loader=Loader)
-                    record_id = record.get("id")
-                    record_url = record.get("link")
-                    
-                    if record_id:
-                        existing_ids.add(record_id)
-                    
-                    if record_url:
-                        normalized_url = normalize_url(record_url)
-                        normalized_domain = normalize_domain(record_url)
-                        existing_urls.add(normalized_url)
-                        existing_urls.add(normalized_domain)
-                        if record_id:
-                            url_to_id[normalized_url] = record_id
-                            url_to_id[normalized_domain] = record_id
-            except Exception as e:
-                logger.debug(f"Error reading {filepath}: {e}")
+    with open_record_index() as index:
+        for row in index.rows():
+            record_id = row["id"]
+            record_url = row["link"]
+            existing_ids.add(record_id)
+            
+            if record_url:
+                normalized_url = normalize_url(record_url)
+                normalized_domain = normalize_domain(record_url)
+                existing_urls.add(normalized_url)
+                existing_urls.add(normalized_domain)
+                url_to_id[normalized_url] = record_id
+                url_to_id[normalized_domain] = record_id
     
     logger.info(f"Loaded {len(existing_ids)} existing IDs and {len(existing_urls)} existing URLs/domains")
     return existing_ids, existing_urls, url_to_id
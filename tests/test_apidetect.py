@@ -34,11 +34,7 @@ class _DummySession:
 
 
 def _patch_session(monkeypatch, responses):
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _DummySession(responses))
-
-
-def _patch_requests_get(monkeypatch, response):
-    monkeypatch.setattr(apidetect.requests, "get", lambda *args, **kwargs: response)
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _DummySession(responses))
 
 
 def test_api_identifier_non_200_does_not_add_endpoint(monkeypatch):
@@ -156,7 +152,7 @@ def test_api_identifier_geoserver_fast_path_ows(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _GeoSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _GeoSession())
 
     found = apidetect.api_identifier(
         "https://maps.example.org/geoserver/web/", "geoserver"
@@ -200,13 +196,15 @@ def test_api_identifier_geoserver_stac_uses_display_url_for_endpoint(monkeypatch
 
 
 def test_analyze_robots_returns_empty_for_non_200(monkeypatch):
-    _patch_requests_get(
+    _patch_session(
         monkeypatch,
-        _DummyResponse(
-            status_code=404,
-            content=b"Not found",
-            headers={"Content-Type": "text/plain"},
-        ),
+        [
+            _DummyResponse(
+                status_code=404,
+                content=b"Not found",
+                headers={"Content-Type": "text/plain"},
+            )
+        ],
     )
 
     found = apidetect.analyze_robots("https://example.org")
@@ -277,8 +275,7 @@ def test_detect_ckan_uses_ckanapi_endpoint_base_url(monkeypatch):
     calls = []
 
     monkeypatch.setattr(apidetect, "_resolve_root_dir", lambda mode: "/unused")
-    monkeypatch.setattr(apidetect, "_iter_yaml_files", lambda root: ["fake.yaml"])
-    monkeypatch.setattr(apidetect, "_load_record", lambda filepath: test_record)
+    monkeypatch.setattr(apidetect, "_iter_records", lambda root: [("fake.yaml", test_record)])
 
     def _fake_api_identifier(base_url, software_id, **kwargs):
         calls.append((base_url, software_id))
@@ -334,7 +331,7 @@ def test_api_identifier_stacserver_collections(monkeypatch):
       def post(self, *args, **kwargs):
           return _DummyResponse(status_code=404)
 
-  monkeypatch.setattr(apidetect.requests, "Session", lambda: _StacSession())
+  monkeypatch.setattr(apidetect, "pooled_session", lambda: _StacSession())
 
   found = apidetect.api_identifier("https://example.org/stac/v1", "stacserver")
 
@@ -356,7 +353,7 @@ def test_api_identifier_galaxy_version(monkeypatch):
       def post(self, *args, **kwargs):
           return _DummyResponse(status_code=404)
 
-  monkeypatch.setattr(apidetect.requests, "Session", lambda: _GalaxySession())
+  monkeypatch.setattr(apidetect, "pooled_session", lambda: _GalaxySession())
 
   found = apidetect.api_identifier("https://usegalaxy.org", "galaxy")
 
@@ -376,7 +373,7 @@ def test_api_identifier_udata_datasets(monkeypatch):
       def post(self, *args, **kwargs):
           return _DummyResponse(status_code=404)
 
-  monkeypatch.setattr(apidetect.requests, "Session", lambda: _UdataSession())
+  monkeypatch.setattr(apidetect, "pooled_session", lambda: _UdataSession())
 
   found = apidetect.api_identifier("https://www.data.gouv.fr", "udata")
 
@@ -396,8 +393,7 @@ def test_report_writes_expected_header(tmp_path, monkeypatch):
 
     monkeypatch.setitem(apidetect.CATALOGS_URLMAP, "ckan", [{}])
     monkeypatch.setattr(apidetect, "_resolve_root_dir", lambda mode: "/unused")
-    monkeypatch.setattr(apidetect, "_iter_yaml_files", lambda root: ["fake.yaml"])
-    monkeypatch.setattr(apidetect, "_load_record", lambda filepath: test_record)
+    monkeypatch.setattr(apidetect, "_iter_records", lambda root: [("fake.yaml", test_record)])
 
     out_file = tmp_path / "report.csv"
     apidetect.report(status="undetected", filename=str(out_file), mode="entries")
@@ -421,7 +417,7 @@ def test_api_identifier_geomapfish_themes(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _GmfSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _GmfSession())
 
     found = apidetect.api_identifier("https://map.example.ch/", "geomapfish")
 
@@ -445,7 +441,7 @@ def test_api_identifier_getsdiportal_geoserver_ows(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _GetSdiSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _GetSdiSession())
 
     found = apidetect.api_identifier("https://gis.example.gr/", "getsdiportal")
 
@@ -472,7 +468,7 @@ def test_api_identifier_redatam_uses_engine_link(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _RedatamSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _RedatamSession())
 
     found = apidetect.api_identifier(engine, "redatam")
 
@@ -489,7 +485,7 @@ def test_api_identifier_scicat_datasets(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _SciCatSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _SciCatSession())
 
     found = apidetect.api_identifier("https://scicat.example.org/", "scicat")
 
@@ -507,7 +503,7 @@ def test_api_identifier_scicat_skips_doi_host(monkeypatch):
         def post(self, *args, **kwargs):
             raise AssertionError("DOI landing hosts must not be probed")
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _FailSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _FailSession())
 
     found = apidetect.api_identifier("https://doi.ess.eu/", "scicat")
 
@@ -527,7 +523,7 @@ def test_api_identifier_mapstore_uses_origin_geoserver(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _MapStoreSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _MapStoreSession())
 
     found = apidetect.api_identifier(
         "https://webgis.example.it/mapstore", "mapstore"
@@ -551,7 +547,7 @@ def test_api_identifier_opensdg_indicator_json(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _OpenSdgSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _OpenSdgSession())
 
     found = apidetect.api_identifier("https://sdg.example.gov/", "opensdg")
 
@@ -606,7 +602,7 @@ def test_api_identifier_opensdg_uses_remote_data_base_url(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _OpenSdgRemoteSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _OpenSdgRemoteSession())
 
     found = apidetect.api_identifier("https://sdg.example.org/", "opensdg")
 
@@ -626,7 +622,7 @@ def test_api_identifier_terria_config(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _TerriaSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _TerriaSession())
 
     found = apidetect.api_identifier("https://maps.example.org/", "terria")
 
@@ -656,7 +652,7 @@ def test_api_identifier_giswebse_uses_origin_service(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _GiswebSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _GiswebSession())
 
     found = apidetect.api_identifier(
         "https://maps.example.ru/GISWebServerSE/", "giswebse"
@@ -679,7 +675,7 @@ def test_api_identifier_oskari_tries_oskari_prefix(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _OskariSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _OskariSession())
 
     found = apidetect.api_identifier("https://kortagluggi.is", "oskari")
 
@@ -701,7 +697,7 @@ def test_api_identifier_supermap_services_json(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _SuperMapSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _SuperMapSession())
 
     found = apidetect.api_identifier(
         "https://gis.example.gov/iserver/", "supermapiserver"
@@ -732,7 +728,7 @@ def test_api_identifier_mapgis_docs_json(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _MapGisSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _MapGisSession())
 
     found = apidetect.api_identifier(
         "https://gis.example.gov:6163/igs/", "mapgisigserver"
@@ -758,7 +754,7 @@ def test_api_identifier_gvsigonline_uses_origin_geoserver(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _GvSigSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _GvSigSession())
 
     found = apidetect.api_identifier(
         "https://geoportal.example.es/gvsigonline/", "gvsigonline"
@@ -785,7 +781,7 @@ def test_api_identifier_ingrid_csw(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _IngridSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _IngridSession())
 
     found = apidetect.api_identifier("https://metaver.example.de/", "ingrid")
 
@@ -810,7 +806,7 @@ def test_api_identifier_erdasapollo_wms(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _ErdasSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _ErdasSession())
 
     found = apidetect.api_identifier(
         "https://maps.example.gov/erdas-apollo", "erdasapollo"
@@ -897,7 +893,7 @@ def test_api_identifier_cogis_elitegis_rest(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _CogisSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _CogisSession())
 
     found = apidetect.api_identifier(
         "https://citycloud.example.com/portal/catalog", "cogis"
@@ -916,8 +912,8 @@ def test_api_identifier_gin_skips_doi_host(monkeypatch):
         raise AssertionError("DOI GIN hosts should not be probed")
 
     monkeypatch.setattr(
-        apidetect.requests,
-        "Session",
+        apidetect,
+        "pooled_session",
         lambda: type("S", (), {"get": staticmethod(_fail), "post": staticmethod(_fail)})(),
     )
 
@@ -938,7 +934,7 @@ def test_api_identifier_gin_version(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _GinSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _GinSession())
 
     found = apidetect.api_identifier("https://gin.g-node.org/", "gin")
 
@@ -959,7 +955,7 @@ def test_api_identifier_osf_uses_jsonapi_host(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _OsfSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _OsfSession())
 
     found = apidetect.api_identifier("https://osf.io", "osf")
 
@@ -980,7 +976,7 @@ def test_api_identifier_samvera_catalog_json(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _SamveraSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _SamveraSession())
 
     found = apidetect.api_identifier("https://curate.example.edu", "samvera")
 
@@ -1003,7 +999,7 @@ def test_api_identifier_ensembl_rest_ping(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _EnsemblSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _EnsemblSession())
 
     found = apidetect.api_identifier("https://parasite.example.org/", "ensembl")
 
@@ -1026,7 +1022,7 @@ def test_api_identifier_phaidra_search_select(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _PhaidraSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _PhaidraSession())
 
     found = apidetect.api_identifier("https://phaidra.example.ac.at", "phaidra")
 
@@ -1049,7 +1045,7 @@ def test_api_identifier_maptilerserver_api_index(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _MapTilerSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _MapTilerSession())
 
     found = apidetect.api_identifier("https://tile.example.gov", "maptilerserver")
 
@@ -1071,7 +1067,7 @@ def test_api_identifier_nyudatacatalog_jsonld(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404)
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _NyuSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _NyuSession())
 
     found = apidetect.api_identifier(
         "https://datacatalog.example.edu", "nyudatacatalog"
@@ -1134,7 +1130,7 @@ def test_api_identifier_tianditu_uses_origin(monkeypatch):
         def post(self, *args, **kwargs):
             return _DummyResponse(status_code=404, content=b"")
 
-    monkeypatch.setattr(apidetect.requests, "Session", lambda: _TdtSession())
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _TdtSession())
 
     found = apidetect.api_identifier(
         "https://henan.example.gov.cn/jiaozuo/", "tianditu"
@@ -1145,3 +1141,375 @@ def test_api_identifier_tianditu_uses_origin(monkeypatch):
         item["url"] == "https://henan.example.gov.cn/iserver/services.json"
         for item in found
     )
+
+
+class _SlowSession:
+    """URL-keyed fake session: earlier probes answer later, tracking requests in flight per host."""
+
+    def __init__(self, delays):
+        import threading
+
+        self._delays = delays
+        self._lock = threading.Lock()
+        self.in_flight = {}
+        self.max_in_flight = {}
+
+    def get(self, url, **kwargs):
+        import time
+
+        host = url.split("/")[2]
+        with self._lock:
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.max_in_flight[host] = max(self.max_in_flight.get(host, 0), self.in_flight[host])
+        time.sleep(self._delays.get(url.rsplit("/", 1)[-1], 0.01))
+        with self._lock:
+            self.in_flight[host] -= 1
+        if url.endswith("missing"):
+            return _DummyResponse(status_code=404)
+        return _DummyResponse()
+
+    def post(self, url, **kwargs):
+        return self.get(url, **kwargs)
+
+
+def _probe_map(names):
+    return [
+        {"id": name, "url": f"/{name}", "expected_mime": ["application/json"], "version": None}
+        for name in names
+    ]
+
+
+def test_api_identifier_concurrent_probes_keep_serial_order(monkeypatch):
+    monkeypatch.setitem(apidetect.CATALOGS_URLMAP, "testsw", _probe_map(["a", "b", "missing", "c", "d"]))
+    delays = {"a": 0.08, "b": 0.04, "c": 0.02, "d": 0.0}
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: _SlowSession(delays))
+
+    serial = apidetect.api_identifier("https://example.org", "testsw", concurrency=1)
+    concurrent = apidetect.api_identifier("https://example.org", "testsw", concurrency=4)
+
+    assert [item["type"] for item in serial] == ["a", "b", "c", "d"]
+    assert concurrent == serial
+
+
+def test_run_probes_caps_requests_per_host():
+    session = _SlowSession({})
+    probes = [
+        (base, item, base + item["url"])
+        for base in ("https://one.example.org", "https://two.example.org")
+        for item in _probe_map([f"p{i}" for i in range(8)])
+    ]
+
+    outcomes = apidetect.run_probes(session, probes, concurrency=3)
+
+    assert [outcome for outcome, _, _ in outcomes] == ["found"] * 16
+    assert [api["url"] for _, api, _ in outcomes] == [request_url for _, _, request_url in probes]
+    assert set(session.max_in_flight) == {"one.example.org", "two.example.org"}
+    assert all(count <= 3 for count in session.max_in_flight.values())
+    assert max(session.max_in_flight.values()) > 1
+
+
+def test_detect_all_passes_concurrency_to_api_identifier(monkeypatch):
+    test_record = {"id": "testckan", "link": "https://catalog.example.org/", "software": {"id": "ckan"}}
+    calls = []
+
+    monkeypatch.setattr(apidetect, "_resolve_root_dir", lambda mode: "/unused")
+    monkeypatch.setattr(apidetect, "_iter_records", lambda root: [("fake.yaml", test_record)])
+
+    def _fake_api_identifier(base_url, software_id, **kwargs):
+        calls.append((base_url, software_id, kwargs.get("concurrency")))
+        return []
+
+    monkeypatch.setattr(apidetect, "api_identifier", _fake_api_identifier)
+
+    apidetect.detect_all(mode="entries", concurrency=2)
+
+    assert calls == [("https://catalog.example.org", "ckan", 2)]
+
+
+def test_run_detection_limits_hosts_and_stores_on_calling_thread():
+    import threading
+    import time
+
+    lock = threading.Lock()
+    in_flight = {}
+    peak = {}
+
+    def _probe(url, software_id):
+        host = url.split("/")[2]
+        with lock:
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), in_flight[host])
+        time.sleep(0.01)
+        with lock:
+            in_flight[host] -= 1
+        if url.endswith("broken"):
+            raise ValueError("bad url")
+        return [{"type": software_id, "url": url}]
+
+    stored = []
+
+    def _store(filepath, record, found):
+        stored.append((filepath, found[0]["url"], threading.get_ident()))
+
+    jobs = [
+        (f"{host}-{i}.yaml", {}, f"https://{host}/{i}", "ckan")
+        for host in ("shared.example.org", "a.example.org", "b.example.org")
+        for i in range(4)
+    ]
+    jobs.append(("broken.yaml", {}, "https://c.example.org/broken", "ckan"))
+
+    failed = apidetect.run_detection(jobs, _probe, _store, workers=4, host_limit=2)
+
+    assert failed == 1
+    assert sorted(url for _, url, _ in stored) == sorted(job[2] for job in jobs[:-1])
+    assert {thread for _, _, thread in stored} == {threading.get_ident()}
+    assert all(count <= 2 for count in peak.values())
+
+
+def test_detect_software_skips_records_with_endpoints_in_insert_mode(monkeypatch):
+    records = [
+        ("has.yaml", {"link": "https://has.example.org", "software": {"id": "ckan"}, "endpoints": [{"url": "x"}]}),
+        ("new.yaml", {"link": "https://new.example.org/", "software": {"id": "ckan"}}),
+        ("other.yaml", {"link": "https://other.example.org", "software": {"id": "dkan"}}),
+    ]
+    calls = []
+
+    monkeypatch.setattr(apidetect, "_resolve_root_dir", lambda mode: "/unused")
+    monkeypatch.setattr(apidetect, "_iter_records", lambda root: records)
+
+    def _fake_api_identifier(base_url, software_id, **kwargs):
+        calls.append((base_url, software_id))
+        return [{"type": "ckanapi", "url": base_url + "/api/3"}]
+
+    monkeypatch.setattr(apidetect, "api_identifier", _fake_api_identifier)
+
+    apidetect.detect_software("ckan", dryrun=True)
+
+    assert calls == [("https://new.example.org", "ckan")]
+    assert records[1][1]["endpoints"] == [{"type": "ckanapi", "url": "https://new.example.org/api/3"}]
+    assert records[1][1]["api"] is True
+
+
+def test_api_identifier_reuses_cached_probe_responses(monkeypatch, tmp_path):
+    monkeypatch.setitem(
+        apidetect.CATALOGS_URLMAP,
+        "testsw",
+        [{"id": "probe", "url": "/probe", "expected_mime": ["application/json"], "version": None}],
+    )
+    _patch_session(monkeypatch, [_DummyResponse()])
+    monkeypatch.setattr(apidetect, "_response_cache", None)
+    cache = apidetect.configure_response_cache(tmp_path / "cache.sqlite")
+    try:
+        first = apidetect.api_identifier("https://example.org", "testsw")
+        second = apidetect.api_identifier("https://example.org", "testsw")
+    finally:
+        apidetect.configure_response_cache(enabled=False)
+
+    assert first == second == [{"type": "probe", "url": "https://example.org/probe"}]
+    assert cache.stats == {"miss": 1, "hit": 1}
+
+
+def test_api_identifier_reuses_connections_across_calls(monkeypatch):
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    client_ports = set()
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            client_ports.add(self.client_address[1])
+            body = b"{}"
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setitem(apidetect.CATALOGS_URLMAP, "testsw", _probe_map(["a", "b", "c"]))
+    monkeypatch.setattr(apidetect, "_response_cache", None)
+    monkeypatch.setattr(apidetect, "_pool_adapter", None)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        first = apidetect.api_identifier(base_url, "testsw", concurrency=1)
+        second = apidetect.api_identifier(base_url, "testsw", concurrency=1)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(first) == len(second) == 3
+    assert len(client_ports) == 1
+
+
+class _RecordingSession:
+    """Answers 200 JSON for URLs ending in a hit name (or "host/name"), 404 otherwise; unreachable hosts refuse."""
+
+    def __init__(self, hits=(), unreachable=()):
+        self.hits = set(hits)
+        self.unreachable = set(unreachable)
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        if url.split("/")[2] in self.unreachable:
+            raise apidetect.ConnectionError("refused")
+        if url.rsplit("/", 1)[-1] in self.hits or url.split("//", 1)[-1] in self.hits:
+            return _DummyResponse()
+        return _DummyResponse(status_code=404, headers={"Content-Type": "text/html"})
+
+    def post(self, url, **kwargs):
+        return self.get(url, **kwargs)
+
+
+def test_probe_url_uses_the_entry_cache_ttl(tmp_path):
+    from response_cache import CachedSession, ResponseCache
+
+    session = _RecordingSession(hits={"a", "b"})
+    short, default = dict(_probe_map("a")[0], cache_ttl=0), _probe_map("b")[0]
+    with ResponseCache(tmp_path / "cache.sqlite") as cache:
+        cached = CachedSession(session, cache)
+        for _ in range(2):
+            for item in (short, default):
+                apidetect._probe_url(cached, "https://example.org", item, "https://example.org" + item["url"], 5, False)
+
+    # /a expires immediately and is requested again; /b is served from the cache
+    assert session.requested == ["https://example.org/a", "https://example.org/b", "https://example.org/a"]
+
+
+def test_ckan_api_root_and_capabilities_set_cache_ttls():
+    api_root = next(item for item in apidetect.CKAN_URLMAP if item["url"] == "/api/3")
+    assert api_root["cache_ttl"] == apidetect.API_STATUS_TTL
+    for items in apidetect.CATALOGS_URLMAP.values():
+        for item in items:
+            if "request=getcapabilities" in item["url"].lower():
+                assert item["cache_ttl"] == apidetect.CAPABILITIES_TTL
+
+
+def test_run_probes_stops_after_enough_endpoints():
+    session = _RecordingSession(hits={"a", "b", "c"})
+    probes = [("https://example.org", item, "https://example.org" + item["url"]) for item in _probe_map("xabcd")]
+
+    outcomes = apidetect.run_probes(session, probes, concurrency=1, stop_after=2)
+
+    assert [outcome and outcome[0] for outcome in outcomes] == ["error", "found", "found", None, None]
+    assert len(session.requested) == 3
+
+
+def test_run_probes_skips_the_family_of_a_failed_decisive_entry():
+    session = _RecordingSession(hits={"up.example.org/a", "other.example.org/dcat"}, unreachable={"down.example.org"})
+    probe_map = [
+        {"id": "sw:b", "url": "/b", "expected_mime": ["application/json"], "version": None},
+        {"id": "sw", "url": "/a", "expected_mime": ["application/json"], "version": None, "decisive": True},
+        {"id": "dcat", "url": "/dcat", "expected_mime": ["application/json"], "version": None},
+    ]
+    probes = [
+        (base, item, base + item["url"])
+        for base in ("https://other.example.org", "https://down.example.org", "https://up.example.org")
+        for item in probe_map
+    ]
+
+    outcomes = apidetect.run_probes(session, probes, concurrency=4, stop_on_negative=True)
+
+    # other.example.org answered 404 to its decisive /a, which rules out sw:b but not dcat;
+    # a refused connection is not decisive
+    assert [outcome and outcome[0] for outcome in outcomes] == [
+        None, "error", "found",
+        "error", "error", "error",
+        "error", "found", "error",
+    ]
+    assert set(session.requested[:3]) == {
+        "https://other.example.org/a",
+        "https://down.example.org/a",
+        "https://up.example.org/a",
+    }
+    assert "https://other.example.org/b" not in session.requested
+
+
+def test_run_probes_without_decisive_entries_runs_all_probes_at_once(monkeypatch):
+    session = _RecordingSession(hits={"a"})
+    probes = [("https://example.org", item, "https://example.org" + item["url"]) for item in _probe_map("abc")]
+    rounds = []
+    real_probe_all = apidetect._probe_all
+
+    def counting_probe_all(s, batch, *args):
+        rounds.append(len(batch))
+        return real_probe_all(s, batch, *args)
+
+    monkeypatch.setattr(apidetect, "_probe_all", counting_probe_all)
+    outcomes = apidetect.run_probes(session, probes, concurrency=2, stop_on_negative=True)
+
+    assert [outcome[0] for outcome in outcomes] == ["found", "error", "error"]
+    assert rounds == [3]
+
+
+def test_api_identifier_orders_probes_by_learned_hit_rate(monkeypatch, tmp_path):
+    monkeypatch.setitem(apidetect.CATALOGS_URLMAP, "testsw", _probe_map(["a", "b", "c"]))
+    session = _RecordingSession(hits={"a", "c"})
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: session)
+    monkeypatch.setattr(apidetect, "_response_cache", None)
+    monkeypatch.setattr(apidetect, "_probe_stats", None)
+    stats = apidetect.configure_probe_stats(tmp_path / "probe_stats.json")
+    stats.counts = {"testsw": {"c /c": [10, 9], "a /a": [10, 2], "b /b": [10, 0]}}
+
+    found = apidetect.api_identifier("https://example.org", "testsw", concurrency=1, stop_after=1)
+    assert [item["type"] for item in found] == ["c"]
+    assert session.requested == ["https://example.org/c"]
+
+    session.requested.clear()
+    deep = apidetect.api_identifier("https://example.org", "testsw", concurrency=1, stop_after=1, deep=True)
+    assert [item["type"] for item in deep if item["type"] in "abc"] == ["a", "c"]
+    assert session.requested[0] == "https://example.org/c"
+    assert {"https://example.org/a", "https://example.org/b"} <= set(session.requested)
+
+    stats.save()
+    assert apidetect.ProbeStats(tmp_path / "probe_stats.json").counts["testsw"]["c /c"] == [12, 11]
+
+
+def test_probe_stats_record_live_responses_only(monkeypatch, tmp_path):
+    monkeypatch.setitem(apidetect.CATALOGS_URLMAP, "testsw", _probe_map(["a", "b"]))
+    session = _RecordingSession(hits={"a"})
+    monkeypatch.setattr(apidetect, "pooled_session", lambda: session)
+    monkeypatch.setattr(apidetect, "_response_cache", None)
+    monkeypatch.setattr(apidetect, "_probe_stats", None)
+    stats_path = tmp_path / "probe_stats.json"
+    cache_path = tmp_path / "cache.sqlite"
+    try:
+        apidetect.configure_response_cache(cache_path)
+        stats = apidetect.configure_probe_stats(stats_path)
+        apidetect.api_identifier("https://example.org", "testsw", concurrency=1)
+        apidetect.api_identifier("https://example.org", "testsw", concurrency=1)
+        assert len(session.requested) == 2
+        assert stats.counts == {"testsw": {"a /a": [1, 1], "b /b": [1, 0]}}
+        stats.save()
+
+        apidetect.configure_response_cache(cache_path, offline=True)
+        offline_stats = apidetect.configure_probe_stats(stats_path, recording=False)
+        assert apidetect.api_identifier("https://example.org", "testsw", concurrency=1) == [
+            {"type": "a", "url": "https://example.org/a"}
+        ]
+        assert offline_stats.counts == {"testsw": {"a /a": [1, 1], "b /b": [1, 0]}}
+    finally:
+        apidetect.configure_response_cache(enabled=False)
+
+    stats_path.unlink()
+    offline_stats.save()
+    assert not stats_path.exists()
+
+
+def test_dryrun_does_not_record_probe_stats(monkeypatch, tmp_path):
+    monkeypatch.setattr(apidetect, "_probe_stats", None)
+    stats = apidetect.configure_probe_stats(tmp_path / "probe_stats.json")
+    apidetect._stop_recording_in_dryrun(False)
+    assert stats.recording
+    apidetect._stop_recording_in_dryrun(True)
+    stats.record("testsw", {"id": "a", "url": "/a"}, True)
+    stats.save()
+    assert stats.counts == {}
+    assert not (tmp_path / "probe_stats.json").exists()
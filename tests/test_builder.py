@@ -13,7 +13,7 @@ import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
 
-from builder import load_jsonl, build_dataset, merge_datasets, validate_software_profile
+from builder import load_jsonl, build_dataset, validate_software_profile
 
 
 class TestLoadJsonl:
@@ -44,6 +44,18 @@ class TestLoadJsonl:
         assert len(data) == 1
         assert data[0]["id"] == "single"
 
+    def test_load_jsonl_invalid_json(self, temp_dir):
+        """Test loading JSONL file with invalid JSON line"""
+        filepath = os.path.join(temp_dir, "invalid.jsonl")
+        with open(filepath, "w", encoding="utf8") as f:
+            f.write('{"id": "1", "name": "Valid"}\n')
+            f.write('{"id": "2", invalid json}\n')  # Invalid JSON
+            f.write('{"id": "3", "name": "Valid"}\n')
+
+        # Should raise JSON decode error
+        with pytest.raises(json.JSONDecodeError):
+            load_jsonl(filepath)
+
 
 class TestBuildDataset:
     """Tests for build_dataset function"""
@@ -135,75 +147,128 @@ class TestBuildDataset:
         data = load_jsonl(output_file)
         assert len(data) == 2
 
+    def test_build_dataset_parallel_matches_serial(
+        self, temp_dir, sample_yaml_content, monkeypatch
+    ):
+        """Parallel parsing writes the same bytes as a serial build, sorted by path"""
+        yaml_dir = os.path.join(temp_dir, "yaml_data")
+        for i in range(12):
+            subdir = os.path.join(yaml_dir, f"sub{i % 3}")
+            os.makedirs(subdir, exist_ok=True)
+            with open(os.path.join(subdir, f"test{i:02}.yaml"), "w", encoding="utf8") as f:
+                f.write(sample_yaml_content.replace("testcatalog", f"testcatalog{i:02}"))
 
-class TestMergeDatasets:
-    """Tests for merge_datasets function"""
-
-    def test_merge_datasets(self, temp_dir, monkeypatch):
-        """Test merging multiple JSONL files"""
         datasets_dir = os.path.join(temp_dir, "datasets")
         os.makedirs(datasets_dir, exist_ok=True)
 
-        # Create test JSONL files
-        file1 = os.path.join(datasets_dir, "file1.jsonl")
-        file2 = os.path.join(datasets_dir, "file2.jsonl")
-
-        with open(file1, "w", encoding="utf8") as f:
-            f.write('{"id": "1", "name": "One"}\n')
-            f.write('{"id": "2", "name": "Two"}\n')
-
-        with open(file2, "w", encoding="utf8") as f:
-            f.write('{"id": "3", "name": "Three"}\n')
-
         import builder
 
         monkeypatch.setattr(builder, "DATASETS_DIR", datasets_dir)
 
-        output_filename = "merged.jsonl"
-        merge_datasets(["file1.jsonl", "file2.jsonl"], output_filename)
+        build_dataset(yaml_dir, "serial.jsonl", workers=1)
+        build_dataset(yaml_dir, "parallel.jsonl", workers=2)
+
+        with open(os.path.join(datasets_dir, "serial.jsonl"), "rb") as f:
+            serial = f.read()
+        with open(os.path.join(datasets_dir, "parallel.jsonl"), "rb") as f:
+            parallel = f.read()
+        assert serial == parallel
+        ids = [item["id"] for item in load_jsonl(os.path.join(datasets_dir, "serial.jsonl"))]
+        expected = sorted(
+            (f"sub{i % 3}", f"testcatalog{i:02}") for i in range(12)
+        )
+        assert ids == [catalog_id for _, catalog_id in expected]
 
-        output_file = os.path.join(datasets_dir, output_filename)
-        data = load_jsonl(output_file)
-        assert len(data) == 3
-        assert data[0]["id"] == "1"
-        assert data[1]["id"] == "2"
-        assert data[2]["id"] == "3"
+    def test_build_dataset_incremental_reparses_only_changed_files(
+        self, temp_dir, sample_yaml_content, monkeypatch
+    ):
+        """Incremental builds splice cached lines and parse only changed or added files"""
+        yaml_dir = os.path.join(temp_dir, "yaml_data")
+        os.makedirs(yaml_dir, exist_ok=True)
+        for i in range(4):
+            with open(os.path.join(yaml_dir, f"test{i}.yaml"), "w", encoding="utf8") as f:
+                f.write(sample_yaml_content.replace("testcatalog", f"testcatalog{i}"))
 
-    def test_merge_datasets_empty_files(self, temp_dir, monkeypatch):
-        """Test merging empty JSONL files"""
         datasets_dir = os.path.join(temp_dir, "datasets")
         os.makedirs(datasets_dir, exist_ok=True)
 
-        file1 = os.path.join(datasets_dir, "empty1.jsonl")
-        file2 = os.path.join(datasets_dir, "empty2.jsonl")
-
-        with open(file1, "w", encoding="utf8") as f:
-            pass
-        with open(file2, "w", encoding="utf8") as f:
-            pass
-
         import builder
 
         monkeypatch.setattr(builder, "DATASETS_DIR", datasets_dir)
+        build_dataset(yaml_dir, "catalogs.jsonl", incremental=True)
+        assert os.path.exists(os.path.join(datasets_dir, "catalogs.manifest.jsonl"))
+
+        with open(os.path.join(yaml_dir, "test1.yaml"), "w", encoding="utf8") as f:
+            f.write(sample_yaml_content.replace("testcatalog", "changedcatalog"))
+        os.remove(os.path.join(yaml_dir, "test2.yaml"))
+        with open(os.path.join(yaml_dir, "test9.yaml"), "w", encoding="utf8") as f:
+            f.write(sample_yaml_content.replace("testcatalog", "addedcatalog"))
+
+        parsed = []
+        original_load = builder._load_yaml_file
+
+        def _counting_load(filename):
+            parsed.append(os.path.basename(filename))
+            return original_load(filename)
+
+        monkeypatch.setattr(builder, "_load_yaml_file", _counting_load)
+        build_dataset(yaml_dir, "catalogs.jsonl", incremental=True)
+        assert sorted(parsed) == ["test1.yaml", "test9.yaml"]
+
+        build_dataset(yaml_dir, "full_rebuild.jsonl", incremental=False)
+        with open(os.path.join(datasets_dir, "catalogs.jsonl"), "rb") as f:
+            incremental_bytes = f.read()
+        with open(os.path.join(datasets_dir, "full_rebuild.jsonl"), "rb") as f:
+            full_bytes = f.read()
+        assert incremental_bytes == full_bytes
+        ids = [item["id"] for item in load_jsonl(os.path.join(datasets_dir, "catalogs.jsonl"))]
+        assert ids == ["testcatalog0", "changedcatalog", "testcatalog3", "addedcatalog"]
+
+    def test_build_is_current_only_without_changes_and_with_all_outputs(
+        self, temp_dir, sample_yaml_content, monkeypatch
+    ):
+        """A no-op incremental build can skip rewriting the outputs"""
+        import builder
 
-        output_filename = "merged_empty.jsonl"
-        merge_datasets(["empty1.jsonl", "empty2.jsonl"], output_filename)
-
-        output_file = os.path.join(datasets_dir, output_filename)
-        data = load_jsonl(output_file)
-        assert len(data) == 0
-
-    def test_load_jsonl_invalid_json(self, temp_dir):
-        """Test loading JSONL file with invalid JSON line"""
-        filepath = os.path.join(temp_dir, "invalid.jsonl")
-        with open(filepath, "w", encoding="utf8") as f:
-            f.write('{"id": "1", "name": "Valid"}\n')
-            f.write('{"id": "2", invalid json}\n')  # Invalid JSON
-            f.write('{"id": "3", "name": "Valid"}\n')
-
-        # Should raise JSON decode error
-        with pytest.raises(json.JSONDecodeError):
-            load_jsonl(filepath)
+        yaml_dir = os.path.join(temp_dir, "yaml_data")
+        datasets_dir = os.path.join(temp_dir, "datasets")
+        os.makedirs(yaml_dir)
+        os.makedirs(datasets_dir)
+        monkeypatch.setattr(builder, "DATASETS_DIR", datasets_dir)
+        yaml_path = os.path.join(yaml_dir, "test.yaml")
+        with open(yaml_path, "w", encoding="utf8") as f:
+            f.write(sample_yaml_content)
+        build_dataset(yaml_dir, "catalogs.jsonl", incremental=True)
+        for name in builder.BUILD_OUTPUTS:
+            Path(datasets_dir, name).touch()
+
+        scan = builder.scan_dataset(yaml_dir, "catalogs.jsonl", incremental=True)
+        assert not builder.build_is_current([scan])
+
+        with open(builder.get_build_state_path(), "w", encoding="utf8") as f:
+            json.dump({"fingerprint": builder.hash_paths(builder.BUILD_FINGERPRINT_PATHS, "build")}, f)
+        assert builder.build_is_current([scan])
+        assert not builder.build_is_current([scan], partitioned=True)
+        assert not builder.build_is_current([builder.scan_dataset(yaml_dir, "catalogs.jsonl")])
+
+        # Dumps from a fast incremental build are out of date for a release-level request
+        with open(builder.get_build_state_path(), "w", encoding="utf8") as f:
+            json.dump(
+                {
+                    "fingerprint": builder.hash_paths(builder.BUILD_FINGERPRINT_PATHS, "build"),
+                    "compression_level": builder.INCREMENTAL_COMPRESSION_LEVEL,
+                },
+                f,
+            )
+        assert builder.build_is_current([scan])
+        assert not builder.build_is_current([scan], compression_level=builder.RELEASE_COMPRESSION_LEVEL)
+
+        with open(yaml_path, "a", encoding="utf8") as f:
+            f.write("description: changed\n")
+        assert not builder.build_is_current([builder.scan_dataset(yaml_dir, "catalogs.jsonl", incremental=True)])
+
+        os.remove(os.path.join(datasets_dir, "full.parquet"))
+        assert not builder.build_is_current([scan])
 
     def test_build_dataset_malformed_yaml(self, temp_dir, monkeypatch):
         """Test building dataset with malformed YAML file"""
@@ -232,6 +297,59 @@ class TestMergeDatasets:
             build_dataset(yaml_dir, "output.jsonl")
 
 
+class TestJsonlSink:
+    """Tests for the single-pass JSONL/zstd build sink"""
+
+    def test_jsonl_sink_writes_matching_zst(self, temp_dir, monkeypatch):
+        import builder
+        import zstandard as zstd
+
+        monkeypatch.setattr(builder, "DATASETS_DIR", temp_dir)
+        sink = builder.JsonlSink("sample.jsonl")
+        sink.write('{"id": "1", "name": "One"}')
+        sink.write('{"id": "2", "name": "Zwei \u00fc"}')
+        sink.close()
+
+        with open(os.path.join(temp_dir, "sample.jsonl"), "rb") as f:
+            plain = f.read()
+        with open(os.path.join(temp_dir, "sample.jsonl.zst"), "rb") as f:
+            with zstd.ZstdDecompressor().stream_reader(f) as reader:
+                decompressed = reader.read()
+        assert sink.count == 2
+        assert plain == decompressed
+        assert [item["id"] for item in load_jsonl(os.path.join(temp_dir, "sample.jsonl"))] == ["1", "2"]
+
+    def test_build_dataset_fans_out_to_all_sinks(
+        self, temp_dir, sample_yaml_content, monkeypatch
+    ):
+        import builder
+
+        yaml_dir = os.path.join(temp_dir, "yaml_data")
+        os.makedirs(yaml_dir, exist_ok=True)
+        for i in range(3):
+            with open(os.path.join(yaml_dir, f"test{i}.yaml"), "w", encoding="utf8") as f:
+                f.write(sample_yaml_content.replace("testcatalog", f"testcatalog{i}"))
+        monkeypatch.setattr(builder, "DATASETS_DIR", temp_dir)
+
+        class _ListSink:
+            def __init__(self):
+                self.lines = []
+
+            def write(self, line):
+                self.lines.append(line)
+
+        first, second = _ListSink(), _ListSink()
+        build_dataset(yaml_dir, "catalogs.jsonl", sinks=[first, second])
+
+        assert first.lines == second.lines
+        assert [json.loads(line)["id"] for line in first.lines] == [
+            "testcatalog0",
+            "testcatalog1",
+            "testcatalog2",
+        ]
+        assert not os.path.exists(os.path.join(temp_dir, "catalogs.jsonl"))
+
+
 class TestBuilderApidetectIntegration:
     """Integration tests for builder -> apidetect invocation path."""
 
@@ -424,3 +542,90 @@ class TestAssignDryrun:
         builder.assign_by_dir("cdi", entries_dir, dryrun=False)
         with open(path, encoding="utf8") as f:
             assert yaml.safe_load(f)["uid"].startswith("cdi")
+
+
+class TestValidateYamlIncremental:
+    """validate-yaml caches results by content and validates only changed files."""
+
+    def _repo(self, temp_dir, monkeypatch):
+        import builder
+
+        entries_dir = os.path.join(temp_dir, "data", "entities")
+        scheduled_dir = os.path.join(temp_dir, "data", "scheduled")
+        schema_dir = os.path.join(temp_dir, "data", "schemes")
+        for path in (entries_dir, scheduled_dir, schema_dir):
+            os.makedirs(path, exist_ok=True)
+        schema_file = os.path.join(schema_dir, "catalog.json")
+        with open(schema_file, "w", encoding="utf8") as f:
+            json.dump({"id": {"type": "string", "required": True}}, f)
+        monkeypatch.setattr(builder, "_REPO_ROOT", temp_dir)
+        monkeypatch.setattr(builder, "ROOT_DIR", entries_dir)
+        monkeypatch.setattr(builder, "SCHEDULED_DIR", scheduled_dir)
+        monkeypatch.setattr(builder, "DATASETS_DIR", os.path.join(temp_dir, "data", "datasets"))
+        monkeypatch.setattr(builder, "CATALOG_SCHEMA_FILE", schema_file)
+        monkeypatch.setattr(
+            builder, "VALIDATION_FINGERPRINT_PATHS", [schema_file, builder.VALIDATION_FINGERPRINT_PATHS[1]]
+        )
+        monkeypatch.setattr(builder, "_catalog_validator", builder.load_validator(schema_file))
+        return builder, entries_dir, scheduled_dir
+
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf8") as f:
+            f.write(text)
+
+    def test_unchanged_and_moved_files_reuse_cached_results(self, temp_dir, monkeypatch):
+        builder, entries_dir, scheduled_dir = self._repo(temp_dir, monkeypatch)
+        good = os.path.join(entries_dir, "good.yaml")
+        bad = os.path.join(entries_dir, "bad.yaml")
+        self._write(good, "id: good\n")
+        self._write(bad, "name: no id\n")
+
+        errors, total, valid, reused = builder.validate_yaml_cached([bad, good])
+        assert (total, valid, reused) == (2, 1, 0)
+        assert errors == [(bad, "unknown: {'id': ['required field'], 'name': ['unknown field']}")]
+
+        moved = os.path.join(scheduled_dir, "moved.yaml")
+        os.rename(good, moved)
+        errors_again, _, _, reused = builder.validate_yaml_cached([bad, moved])
+        assert errors_again == errors
+        assert reused == 2
+
+        self._write(bad, "id: fixed\n")
+        assert builder.validate_yaml_cached([bad, moved]) == ([], 2, 2, 1)
+
+    def test_full_run_revalidates_but_keeps_other_cached_files(self, temp_dir, monkeypatch):
+        builder, entries_dir, _ = self._repo(temp_dir, monkeypatch)
+        first = os.path.join(entries_dir, "first.yaml")
+        second = os.path.join(entries_dir, "second.yaml")
+        self._write(first, "id: first\n")
+        self._write(second, "id: second\n")
+        assert builder.validate_yaml_cached([first, second])[3] == 0
+
+        assert builder.validate_yaml_cached([first], incremental=False) == ([], 1, 1, 0)
+        assert builder.validate_yaml_cached([first, second]) == ([], 2, 2, 2)
+
+    def test_changed_since_lists_touched_yaml_files(self, temp_dir, monkeypatch):
+        import subprocess
+
+        builder, entries_dir, scheduled_dir = self._repo(temp_dir, monkeypatch)
+        self._write(os.path.join(entries_dir, "a.yaml"), "id: a\n")
+        self._write(os.path.join(entries_dir, "b.yaml"), "id: b\n")
+        git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.org"]
+        subprocess.run(["git", "init", "-q"], cwd=temp_dir, check=True)
+        subprocess.run(["git", "add", "."], cwd=temp_dir, check=True)
+        subprocess.run(git + ["commit", "-q", "-m", "base"], cwd=temp_dir, check=True)
+
+        assert builder.changed_yaml_files("HEAD") == []
+        self._write(os.path.join(entries_dir, "a.yaml"), "id: a2\n")
+        self._write(os.path.join(scheduled_dir, "new.yaml"), "id: new\n")
+        os.remove(os.path.join(entries_dir, "b.yaml"))
+        assert builder.changed_yaml_files("HEAD") == [
+            os.path.join(entries_dir, "a.yaml"),
+            os.path.join(scheduled_dir, "new.yaml"),
+        ]
+
+        self._write(builder.CATALOG_SCHEMA_FILE, "{}")
+        assert builder.changed_yaml_files("HEAD") is None
+        with pytest.raises(ValueError):
+            builder.changed_yaml_files("no-such-ref")
@@ -0,0 +1,279 @@
+"""Tests for duckdb_export build sinks"""
+
+import json
+import os
+import sys
+
+import duckdb
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from duckdb_export import (  # noqa: E402
+    CATALOG_JSON_SCHEMA_PATH,
+    CATALOG_SCHEMA_PATH,
+    UNMAPPED_COLUMN,
+    DuckDBTableSink,
+    columns_from_cerberus,
+    columns_from_json_schema,
+    create_catalog_child_tables,
+    create_indexes,
+    export_parquet,
+    load_schema,
+)
+
+
+def _catalog_columns():
+    return columns_from_json_schema(load_schema(CATALOG_JSON_SCHEMA_PATH))
+
+
+class TestColumnsFromCerberus:
+    def test_scalar_and_nested_types(self):
+        columns = columns_from_cerberus(
+            {
+                "id": {"type": "string"},
+                "api": {"type": "boolean"},
+                "trust_score": {"type": "number"},
+                "tags": {"type": "list"},
+                "owner": {"type": "dict"},
+            }
+        )
+        assert columns == {
+            "id": "VARCHAR",
+            "api": "BOOLEAN",
+            "trust_score": "DOUBLE",
+            "tags": "JSON",
+            "owner": "JSON",
+        }
+
+    def test_catalog_schema_covers_core_fields(self):
+        columns = columns_from_cerberus(load_schema(CATALOG_SCHEMA_PATH))
+        for name in ("id", "uid", "link", "coverage", "endpoints", "owner", "api"):
+            assert name in columns
+
+
+class TestColumnsFromJsonSchema:
+    def test_nested_fields_become_struct_and_list_types(self):
+        columns = _catalog_columns()
+        assert columns["id"][0] == "VARCHAR"
+        assert columns["access_mode"][0] == "VARCHAR[]"
+        assert columns["software"][0] == 'STRUCT("id" VARCHAR, "name" VARCHAR)'
+        assert columns["endpoints"][0].startswith("STRUCT(") and columns["endpoints"][0].endswith(")[]")
+        assert columns["coverage"][1][0]["location"]["country"]["id"] == "VARCHAR"
+        # Free-form objects and string/object unions stay JSON
+        assert columns["_re3data"][0] == "JSON"
+        assert columns["tags"][0] == "JSON[]"
+
+    def test_nested_columns_query_without_json_extract(self, sample_catalog_dict):
+        conn = duckdb.connect()
+        sink = DuckDBTableSink(conn, "catalogs", _catalog_columns())
+        record = dict(
+            sample_catalog_dict,
+            endpoints=[
+                {"type": "ckanapi", "url": "https://example.com/api/3"},
+                {"type": "sitemap", "url": "https://example.com/sitemap.xml"},
+            ],
+        )
+        sink.write(json.dumps(record))
+        sink.close()
+
+        rows = conn.execute(
+            """
+            SELECT coverage[1].location.country.id AS country, e.type, count(*)
+            FROM (SELECT coverage, unnest(endpoints) AS e FROM catalogs)
+            GROUP BY ALL ORDER BY e.type
+            """
+        ).fetchall()
+        assert rows == [("US", "ckanapi", 1), ("US", "sitemap", 1)]
+        assert conn.execute("SELECT software.id, owner.location.country.id FROM catalogs").fetchone() == ("ckan", "US")
+
+
+class TestDuckDBTableSink:
+    def test_loads_in_batches_with_explicit_schema(self, sample_catalog_dict):
+        conn = duckdb.connect()
+        sink = DuckDBTableSink(conn, "catalogs", _catalog_columns(), batch_size=2)
+        for i in range(5):
+            record = dict(sample_catalog_dict, id=f"catalog{i}", uid=f"cdi{i:08}")
+            sink.write(json.dumps(record, ensure_ascii=False))
+        sink.close()
+
+        assert sink.count == 5
+        assert conn.execute("SELECT count(*) FROM catalogs").fetchone()[0] == 5
+        column_names = [row[0] for row in conn.execute("DESCRIBE catalogs").fetchall()]
+        assert column_names == list(_catalog_columns().keys()) + [UNMAPPED_COLUMN]
+        # Fields absent from every record still exist as NULL columns
+        assert conn.execute("SELECT count(trust_score) FROM catalogs").fetchone()[0] == 0
+
+    def test_non_boolean_api_loads_as_false(self):
+        conn = duckdb.connect()
+        sink = DuckDBTableSink(conn, "catalogs", _catalog_columns())
+        sink.write(json.dumps({"id": "a", "api": True}))
+        sink.write(json.dumps({"id": "b", "api": "dataset"}))
+        sink.write(json.dumps({"id": "c"}))
+        sink.close()
+
+        rows = dict(conn.execute("SELECT id, api FROM catalogs").fetchall())
+        assert rows == {"a": True, "b": False, "c": None}
+        assert conn.execute(f"SELECT {UNMAPPED_COLUMN} FROM catalogs WHERE id = 'b'").fetchone()[0] == '{"api": "dataset"}'
+
+
+def _leaves(value, path=""):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield from _leaves(child, f"{path}.{key}" if path else key)
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            yield from _leaves(child, f"{path}[{index}]")
+    elif value is not None:
+        yield path, value
+
+
+def _without_nulls(value):
+    if isinstance(value, dict):
+        return {key: _without_nulls(child) for key, child in value.items() if child is not None}
+    if isinstance(value, list):
+        return [_without_nulls(child) for child in value]
+    return value
+
+
+def _assert_round_trip(conn, records):
+    """Every leaf of every record is in its DuckDB row or, with a parent path, in _unmapped."""
+    rows = {}
+    for (payload,) in conn.execute("SELECT to_json(c) FROM catalogs c").fetchall():
+        row = json.loads(payload)
+        rows[(row.get("uid"), row.get("id"))] = row
+    assert len(rows) == len({(record.get("uid"), record.get("id")) for record in records})
+    for record in records:
+        row = dict(rows[(record.get("uid"), record.get("id"))])
+        unmapped = row.pop(UNMAPPED_COLUMN) or {}
+        row = _without_nulls(row)
+        if not unmapped and row == _without_nulls(record):
+            continue
+        loaded = dict(_leaves(row))
+        for path, leaf in _leaves(record):
+            if any(path == key or path.startswith((key + ".", key + "[")) for key in unmapped):
+                continue
+            expected = str(leaf) if isinstance(leaf, (int, float)) and isinstance(loaded.get(path), str) else leaf
+            assert loaded.get(path) == expected, (record.get("id"), path)
+
+
+class TestRoundTrip:
+    def test_undeclared_keys_and_wrong_types_are_kept_in_unmapped(self, sample_catalog_dict, caplog):
+        records = [
+            dict(sample_catalog_dict, id="plain", uid="cdi00000001"),
+            dict(
+                sample_catalog_dict,
+                id="odd",
+                uid="cdi00000002",
+                owner=dict(
+                    sample_catalog_dict["owner"],
+                    location=dict(
+                        sample_catalog_dict["owner"]["location"], macroregion={"id": "019", "name": "Americas"}
+                    ),
+                ),
+                access_mode="open",
+                trust_score="high",
+            ),
+        ]
+        conn = duckdb.connect()
+        sink = DuckDBTableSink(conn, "catalogs", _catalog_columns())
+        for record in records:
+            sink.write(json.dumps(record, ensure_ascii=False))
+        sink.close()
+
+        unmapped = json.loads(conn.execute(f"SELECT {UNMAPPED_COLUMN} FROM catalogs WHERE id = 'odd'").fetchone()[0])
+        assert unmapped == {
+            "owner.location.macroregion": {"id": "019", "name": "Americas"},
+            "access_mode": "open",
+            "trust_score": "high",
+        }
+        assert conn.execute(f"SELECT {UNMAPPED_COLUMN} FROM catalogs WHERE id = 'plain'").fetchone()[0] is None
+        assert "owner.location.macroregion (1)" in caplog.text
+        _assert_round_trip(conn, records)
+
+    def test_registry_full_jsonl_round_trips(self):
+        zstandard = pytest.importorskip("zstandard")
+        path = os.path.join(os.path.dirname(__file__), "..", "data", "datasets", "full.jsonl.zst")
+        if not os.path.exists(path):
+            pytest.skip("full.jsonl.zst not built")
+        with open(path, "rb") as handle:
+            lines = zstandard.ZstdDecompressor().stream_reader(handle).read().decode("utf-8").splitlines()
+        conn = duckdb.connect()
+        sink = DuckDBTableSink(conn, "catalogs", _catalog_columns())
+        for line in lines:
+            sink.write(line)
+        sink.close()
+
+        _assert_round_trip(conn, [json.loads(line) for line in lines])
+
+
+class TestCatalogChildTables:
+    def test_child_tables_explode_lists_by_uid(self, sample_catalog_dict):
+        conn = duckdb.connect()
+        sink = DuckDBTableSink(conn, "catalogs", _catalog_columns())
+        record = dict(
+            sample_catalog_dict,
+            endpoints=[
+                {"type": "ckanapi", "url": "https://example.com/api/3"},
+                {"type": "sitemap", "url": "https://example.com/sitemap.xml"},
+            ],
+            topics=[{"type": "eudatatheme", "id": "GOVE", "name": "Government"}],
+            identifiers=[{"id": "wikidata", "value": "Q1", "url": "https://www.wikidata.org/wiki/Q1"}],
+            tags=["government", {"tag": "water"}],
+        )
+        sink.write(json.dumps(record))
+        sink.write(json.dumps(dict(sample_catalog_dict, id="other", uid="cdi00000002", tags=[])))
+        sink.close()
+
+        counts = create_catalog_child_tables(conn)
+        create_indexes(conn)
+
+        assert counts == {
+            "catalog_endpoints": 2,
+            "catalog_coverage": 2,
+            "catalog_topics": 1,
+            "catalog_langs": 2,
+            "catalog_identifiers": 1,
+            "catalog_tags": 2,
+        }
+        assert conn.execute(
+            "SELECT id, position, type FROM catalog_endpoints WHERE uid = 'cdi00000001' ORDER BY position"
+        ).fetchall() == [("testcatalog", 1, "ckanapi"), ("testcatalog", 2, "sitemap")]
+        assert conn.execute(
+            "SELECT DISTINCT country_id FROM catalog_coverage"
+        ).fetchall() == [("US",)]
+        assert conn.execute(
+            "SELECT identifier_id, value FROM catalog_identifiers"
+        ).fetchall() == [("wikidata", "Q1")]
+        tags = [row[0] for row in conn.execute("SELECT tag FROM catalog_tags ORDER BY position").fetchall()]
+        assert tags[0] == "government"
+        assert json.loads(tags[1]) == {"tag": "water"}
+        index_names = {row[0] for row in conn.execute("SELECT index_name FROM duckdb_indexes()").fetchall()}
+        assert "idx_catalog_coverage_country_id" in index_names
+        assert "idx_catalogs_uid" in index_names
+
+
+class TestExportParquet:
+    def test_sorted_and_partitioned_parquet(self, sample_catalog_dict, tmp_path):
+        conn = duckdb.connect()
+        sink = DuckDBTableSink(conn, "catalogs", _catalog_columns())
+        for i, country in enumerate(["US", "DE", "US"]):
+            owner = dict(sample_catalog_dict["owner"], location={"country": {"id": country, "name": country}})
+            catalog_type = "Geoportal" if i == 2 else "Open data portal"
+            record = dict(sample_catalog_dict, id=f"c{i}", uid=f"cdi{i:08}", owner=owner, catalog_type=catalog_type)
+            sink.write(json.dumps(record))
+        sink.close()
+
+        output = tmp_path / "full.parquet"
+        partitioned = tmp_path / "full_partitioned"
+        export_parquet(conn, output, partitioned_dir=partitioned)
+
+        rows = conn.execute(
+            f"SELECT owner.location.country.id, catalog_type FROM read_parquet('{output}')"
+        ).fetchall()
+        assert rows == [("DE", "Open data portal"), ("US", "Geoportal"), ("US", "Open data portal")]
+        assert (partitioned / "country=US" / "catalog_type=Geoportal").is_dir()
+        assert conn.execute(
+            f"SELECT count(*) FROM read_parquet('{partitioned}/**/*.parquet', hive_partitioning = true) "
+            "WHERE country = 'US'"
+        ).fetchone()[0] == 2
@@ -0,0 +1,88 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from find_near_duplicates import (  # noqa: E402
+    candidate_pairs,
+    find_near_duplicates,
+    fingerprint,
+    registered_domain,
+    url_key,
+)
+
+
+def _item(name, link, owner="City of Example", path=None):
+    record = {"id": name.lower().replace(" ", ""), "uid": f"cdi-{name}", "name": name, "link": link}
+    if owner:
+        record["owner"] = {"name": owner}
+    return fingerprint(Path(path or f"/fixtures/{record['id']}.yaml"), "entities", record)
+
+
+def test_registered_domain_handles_second_level_labels():
+    assert registered_domain("data.example.org") == "example.org"
+    assert registered_domain("opendata.city.gov.uk") == "city.gov.uk"
+    assert registered_domain("example.org") == "example.org"
+
+
+def test_url_key_ignores_portal_subdomain_locale_and_catalog_suffix():
+    expected = url_key("https://example.org")
+    assert url_key("https://data.example.org/en/") == expected
+    assert url_key("http://www.opendata.example.org/fr/dataset") == expected
+    assert url_key("https://maps.example.org") != expected
+    assert url_key("https://example.org/statistics") != expected
+
+
+def test_finds_subdomain_and_locale_variants_but_not_unrelated_catalogs():
+    items = [
+        _item("Example Open Data", "https://data.example.org/en/dataset"),
+        _item("Example Data Portal", "https://opendata.example.org"),
+        _item("Example GIS Services", "https://gis.example.org/arcgis/rest/services"),
+        _item("Other Open Data", "https://other.net", owner="Other Agency"),
+    ]
+    results, skipped = find_near_duplicates(items)
+    assert [(pair["left"]["name"], pair["right"]["name"]) for pair in results] == [
+        ("Example Data Portal", "Example Open Data")
+    ]
+    assert results[0]["reasons"] == ["url_variant", "similar_title", "similar_owner"]
+    assert not skipped
+
+
+def test_same_title_and_owner_on_unrelated_domains_is_reported():
+    items = [
+        _item("National Geoportal", "https://geoportal.example.org", owner="Mapping Agency"),
+        _item("National Geoportal", "https://maps.example-agency.net", owner="Mapping Agency"),
+        _item("National Statistics", "https://stats.other.net", owner="Mapping Agency"),
+    ]
+    results, _ = find_near_duplicates(items)
+    assert [(pair["left"]["link"], pair["right"]["link"]) for pair in results] == [
+        ("https://geoportal.example.org", "https://maps.example-agency.net")
+    ]
+    assert results[0]["score"] == 0.8
+    assert results[0]["reasons"] == ["similar_title", "similar_owner", "strong_name_match"]
+
+
+def test_templated_titles_shared_by_many_records_are_not_name_matches():
+    items = [
+        _item("Government of Unknown Geoportal", f"https://geo{index}.example{index}.org", owner="Unknown")
+        for index in range(3)
+    ]
+    assert find_near_duplicates(items)[0] == []
+
+
+def test_exact_canonical_duplicates_are_left_to_quality_rules():
+    items = [
+        _item("Example", "https://example.org/"),
+        _item("Example", "https://www.example.org", path="/fixtures/copy.yaml"),
+    ]
+    assert find_near_duplicates(items)[0] == []
+
+
+def test_oversized_domain_blocks_split_by_host():
+    items = [_item(f"Hub {i}", f"https://tenant{i}.hub.example.com", owner=None) for i in range(5)]
+    items.append(_item("Hub 0 copy", "https://tenant0.hub.example.com/maps", owner=None))
+    pairs, skipped = candidate_pairs(items, max_block=3)
+    assert (0, 5) in pairs
+    assert (0, 1) not in pairs
+    assert not skipped
@@ -11,11 +11,16 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
 from quality_regression import (  # noqa: E402
     DEFAULT_BASELINE,
     DEFAULT_REPORT,
+    ReportCounts,
+    columnar_report_path,
     compare_to_baseline,
     compare_to_baseline_with_warnings,
     is_enrichment_issue_type,
     load_issue_counts,
+    load_report_counts,
     load_track_counts,
+    report_counts_path,
+    write_report_counts,
 )
 
 
@@ -166,3 +171,59 @@ def test_current_report_matches_baseline_when_unchanged():
                 f"({baseline['by_track']['integrity'][priority]}); "
                 "run scripts/update_quality_baseline.py"
             )
+
+
+def test_parquet_report_counts_match_jsonl(tmp_path):
+    from duckdb_export import export_quality_report_parquet
+
+    report = tmp_path / "full_report.jsonl"
+    issues = [
+        {"issue_type": "INVALID_URL", "priority": "CRITICAL", "country_code": "US", "current_value": {"a": 1}},
+        {"issue_type": "INVALID_URL", "priority": "CRITICAL", "country_code": "DE", "current_value": "x"},
+        {"issue_type": "MISSING_TOPICS", "priority": "LOW", "country_code": "US", "current_value": None},
+    ]
+    report.write_text("".join(json.dumps(issue) + "\n" for issue in issues), encoding="utf-8")
+    jsonl_counts = load_issue_counts(report)
+    jsonl_tracks = load_track_counts(report)
+
+    assert export_quality_report_parquet(report, tmp_path / "full_report.parquet") == 3
+    assert columnar_report_path(report) == tmp_path / "full_report.parquet"
+    assert load_issue_counts(report) == jsonl_counts
+    assert load_track_counts(report) == jsonl_tracks
+    assert jsonl_tracks["integrity"]["CRITICAL"] == 2
+    assert jsonl_tracks["enrichment"]["LOW"] == 1
+
+    # A JSONL report rewritten after the Parquet copy is read directly
+    os.utime(report, ns=(report.stat().st_atime_ns, (tmp_path / "full_report.parquet").stat().st_mtime_ns + 10**9))
+    assert columnar_report_path(report) is None
+
+
+def test_precomputed_counts_fast_path(tmp_path):
+    report = tmp_path / "full_report.jsonl"
+    issues = [
+        {"issue_type": "INVALID_URL", "priority": "CRITICAL", "country_code": "US"},
+        {"issue_type": "MISSING_TOPICS", "priority": "LOW", "country_code": "DE"},
+        {"issue_type": "MISSING_TOPICS", "priority": "LOW", "country_code": "US"},
+    ]
+    report.write_text("".join(json.dumps(issue) + "\n" for issue in issues), encoding="utf-8")
+    decoded = load_report_counts(report)
+    assert decoded.by_country == {"US": 2, "DE": 1}
+    assert decoded.total_records_analyzed is None
+
+    write_report_counts(
+        report_counts_path(report), decoded.by_type_priority, decoded.by_country, 10, report
+    )
+    precomputed = load_report_counts(report)
+    assert precomputed == ReportCounts(decoded.by_type_priority, decoded.by_country, 10)
+    assert load_track_counts(report)["enrichment"]["LOW"] == 2
+
+    # Same-size edits change the content hash, so stale counts are not returned
+    content = report.read_text(encoding="utf-8")
+    edited = content.replace('"US"', '"FR"', 1)
+    assert len(edited) == len(content)
+    report.write_text(edited, encoding="utf-8")
+    assert load_report_counts(report).by_country == {"FR": 1, "US": 1, "DE": 1}
+
+    # Counts for a different report are ignored
+    report.write_text(content + json.dumps(issues[0]) + "\n", encoding="utf-8")
+    assert load_report_counts(report).by_country == {"US": 3, "DE": 1}
@@ -1,9 +1,17 @@
+import copy
+import json
 import os
 import sys
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
 
+import yaml
+
+import builder
 from builder import (
+    IssueSpool,
+    QUALITY_RULES,
+    analyze_quality_record,
     check_coverage_normalization,
     check_owner_type_values,
     check_path_country_consistency,
@@ -12,9 +20,12 @@ from builder import (
     check_urls,
     choose_duplicate_keeper,
     get_priority_level,
+    iter_quality_chunks,
+    rules_for_fields,
     link_serves_as_api_endpoint,
     score_duplicate_keeper,
 )
+from record_store import RecordIndex
 
 
 def test_link_serves_as_api_endpoint_geoserver():
@@ -270,3 +281,266 @@ def test_duplicate_coverage_allows_multi_country():
         issue for issue in (result or []) if issue["issue_type"] == "DUPLICATE_COVERAGE"
     ]
     assert duplicate_issues == []
+
+
+def test_analyze_quality_record_attaches_report_fields(sample_catalog_dict):
+    rule_stats = {}
+    record = dict(sample_catalog_dict, description=None)
+    result = analyze_quality_record(record, "US/Federal/opendata/testcatalog.yaml", rule_stats)
+    assert result["record_id"] == "testcatalog"
+    assert result["country_codes"] == ["US"]
+    assert result["issues"]
+    for issue in result["issues"]:
+        assert issue["file_path"] == "US/Federal/opendata/testcatalog.yaml"
+        assert issue["record_id"] == "testcatalog"
+        assert issue["country_code"] == "US"
+        assert issue["priority"] == get_priority_level(issue["issue_type"])
+    assert set(rule_stats) == {rule.id for rule in QUALITY_RULES}
+    assert all(stats["calls"] == 1 for stats in rule_stats.values())
+    assert rule_stats["MISSING_DESCRIPTION"]["issues"] == 1
+    assert sum(stats["issues"] for stats in rule_stats.values()) == len(result["issues"])
+
+
+def test_quality_rules_registry_metadata():
+    ids = [rule.id for rule in QUALITY_RULES]
+    assert len(ids) == len(set(ids))
+    rules = {rule.id: rule for rule in QUALITY_RULES}
+    assert rules["URLS"].priority == "CRITICAL"
+    assert rules["URLS"].track == "integrity"
+    assert rules["MISSING_TOPICS"].priority == "LOW"
+    assert rules["MISSING_TOPICS"].track == "enrichment"
+    for rule in QUALITY_RULES:
+        assert rule.cost in ("cheap", "moderate", "expensive")
+        assert rule.fields and rule.issue_types
+
+
+def test_partial_recheck_runs_only_affected_rules(sample_catalog_dict):
+    path = "US/Federal/opendata/testcatalog.yaml"
+    previous = analyze_quality_record(copy.deepcopy(sample_catalog_dict), path)
+    edits = {
+        "tags": [],
+        "rights": {"license_id": "cc-by", "license_name": None},
+        "description": None,
+        "id": "Bad Id",
+        "owner": {"name": "Unknown", "type": "Bogus"},
+        "coverage": [],
+        "software": {"id": "notasoftware", "name": "X"},
+    }
+    for field, value in edits.items():
+        edited = dict(copy.deepcopy(sample_catalog_dict), **{field: value})
+        rule_stats = {}
+        partial = analyze_quality_record(copy.deepcopy(edited), path, rule_stats, previous)
+        full = analyze_quality_record(copy.deepcopy(edited), path)
+        assert set(rule_stats) == {rule.id for rule in rules_for_fields({field})}
+        assert partial["issues"] == full["issues"], field
+
+
+def test_quality_chunks_parallel_matches_serial(tmp_path, monkeypatch, sample_catalog_dict):
+    monkeypatch.setattr(builder, "ROOT_DIR", str(tmp_path))
+    filenames = []
+    for i in range(20):
+        path = tmp_path / "US" / f"catalog{i:02}.yaml"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = dict(sample_catalog_dict, id=f"catalog{i:02}", tags=[] if i % 2 else ["x"])
+        path.write_text(yaml.safe_dump(record), encoding="utf-8")
+        filenames.append(str(path))
+
+    def collect(workers):
+        return [
+            entry
+            for results, _ in iter_quality_chunks(filenames, workers)
+            for entry in results
+        ]
+
+    serial = collect(1)
+    assert [result["record_id"] for _, result in serial] == [f"catalog{i:02}" for i in range(20)]
+    assert serial[0][0] == os.path.join("US", "catalog00.yaml")
+    assert collect(3) == serial
+
+
+def test_analyze_quality_rechecks_only_changed_records(tmp_path, monkeypatch, sample_catalog_dict):
+    entities = tmp_path / "entities"
+    monkeypatch.setattr(builder, "ROOT_DIR", str(entities))
+    monkeypatch.setattr(builder, "DATASETS_DIR", str(tmp_path / "datasets"))
+    for i in range(3):
+        path = entities / "US" / f"catalog{i}.yaml"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(yaml.safe_dump(dict(sample_catalog_dict, id=f"catalog{i}")), encoding="utf-8")
+
+    checked = []
+    real_analyze = builder.analyze_quality_record
+
+    def counting_analyze(record, rel_file_path, rule_stats=None, previous=None):
+        checked.append(rel_file_path)
+        return real_analyze(record, rel_file_path, rule_stats, previous)
+
+    monkeypatch.setattr(builder, "analyze_quality_record", counting_analyze)
+
+    builder.analyze_quality(output=str(tmp_path / "dq1"), workers=1, incremental=True, profile=False)
+    assert len(checked) == 3
+    first_report = (tmp_path / "dq1" / "full_report.jsonl").read_text(encoding="utf-8")
+
+    checked.clear()
+    builder.analyze_quality(output=str(tmp_path / "dq2"), workers=1, incremental=True, profile=False)
+    assert checked == []
+    assert (tmp_path / "dq2" / "full_report.jsonl").read_text(encoding="utf-8") == first_report
+
+    changed = entities / "US" / "catalog1.yaml"
+    changed.write_text(
+        yaml.safe_dump(dict(sample_catalog_dict, id="catalog1", catalog_type="Bogus")), encoding="utf-8"
+    )
+    builder.analyze_quality(output=str(tmp_path / "dq3"), workers=1, incremental=True, profile=False)
+    assert checked == [os.path.join("US", "catalog1.yaml")]
+    assert "CATALOG_TYPE" in (tmp_path / "dq3" / "full_report.jsonl").read_text(encoding="utf-8")
+
+
+def test_analyze_quality_rechecks_all_records_when_software_definitions_change(
+    tmp_path, monkeypatch, sample_catalog_dict
+):
+    entities = tmp_path / "entities"
+    datasets = tmp_path / "datasets"
+    monkeypatch.setattr(builder, "ROOT_DIR", str(entities))
+    monkeypatch.setattr(builder, "DATASETS_DIR", str(datasets))
+    monkeypatch.setattr(builder, "_software_map_cache", None)
+    datasets.mkdir()
+    software = datasets / "software.jsonl"
+    software.write_text(json.dumps({"id": "ckan", "name": "CKAN", "has_api": True}) + "\n", encoding="utf-8")
+    for i in range(2):
+        path = entities / "US" / f"catalog{i}.yaml"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(yaml.safe_dump(dict(sample_catalog_dict, id=f"catalog{i}")), encoding="utf-8")
+
+    checked = []
+    real_analyze = builder.analyze_quality_record
+
+    def counting_analyze(record, rel_file_path, rule_stats=None, previous=None):
+        checked.append(rel_file_path)
+        return real_analyze(record, rel_file_path, rule_stats, previous)
+
+    monkeypatch.setattr(builder, "analyze_quality_record", counting_analyze)
+
+    builder.analyze_quality(output=str(tmp_path / "dq1"), workers=1, incremental=True, profile=False)
+    builder.analyze_quality(output=str(tmp_path / "dq2"), workers=1, incremental=True, profile=False)
+    assert len(checked) == 2
+
+    checked.clear()
+    software.write_text("", encoding="utf-8")
+    monkeypatch.setattr(builder, "_software_map_cache", None)
+    builder.analyze_quality(output=str(tmp_path / "dq3"), workers=1, incremental=True, profile=False)
+    assert len(checked) == 2
+
+
+def test_analyze_quality_profile_writes_rule_costs(tmp_path, monkeypatch, sample_catalog_dict):
+    entities = tmp_path / "entities"
+    monkeypatch.setattr(builder, "ROOT_DIR", str(entities))
+    monkeypatch.setattr(builder, "DATASETS_DIR", str(tmp_path / "datasets"))
+    for i in range(2):
+        path = entities / "US" / f"catalog{i}.yaml"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(yaml.safe_dump(dict(sample_catalog_dict, id=f"catalog{i}", tags=[])), encoding="utf-8")
+
+    builder.analyze_quality(output=str(tmp_path / "dq1"), workers=1, incremental=True, profile=False)
+    assert not (tmp_path / "dq1" / "rule_profile.json").exists()
+
+    # --profile re-checks cached records so every rule is measured
+    builder.analyze_quality(output=str(tmp_path / "dq2"), workers=1, incremental=True, profile=True)
+    profile = json.loads((tmp_path / "dq2" / "rule_profile.json").read_text(encoding="utf-8"))
+    assert profile["records_checked"] == 2
+    assert {rule["id"] for rule in profile["rules"]} == {rule.id for rule in QUALITY_RULES}
+    seconds = [rule["seconds"] for rule in profile["rules"]]
+    assert seconds == sorted(seconds, reverse=True)
+    missing_tags = next(rule for rule in profile["rules"] if rule["id"] == "MISSING_TAGS")
+    assert missing_tags["calls"] == 2
+    assert missing_tags["issues"] == 2
+    assert missing_tags["track"] == "enrichment"
+
+
+def test_issue_spool_bounds_handles_and_sorts_externally(tmp_path):
+    spool = IssueSpool(str(tmp_path), max_open=2, run_size=3)
+    for seq in range(10):
+        for group in ("US", "DE", "FR"):
+            issue_type = "B_TYPE" if seq % 2 else "A_TYPE"
+            spool.append("countries", group, (issue_type, seq), {"issue_type": issue_type, "seq": seq, "group": group})
+            assert len(spool._handles) <= 2
+
+    assert spool.groups("countries") == ["US", "DE", "FR"]
+    issues = list(spool.read_sorted("countries", "DE"))
+    assert [(issue["issue_type"], issue["seq"]) for issue in issues] == sorted(
+        (issue["issue_type"], issue["seq"]) for issue in issues
+    )
+    assert len(issues) == 10
+    assert {issue["group"] for issue in issues} == {"DE"}
+    assert list(spool.read_sorted("countries", "XX")) == []
+    # Sorted runs are removed once merged
+    assert sorted(path.name for path in tmp_path.iterdir()) == [f"countries-{i}.pickle" for i in range(3)]
+
+
+def test_analyze_quality_reports_records_sharing_an_id(tmp_path, monkeypatch, sample_catalog_dict):
+    entities = tmp_path / "entities"
+    monkeypatch.setattr(builder, "ROOT_DIR", str(entities))
+    monkeypatch.setattr(builder, "DATASETS_DIR", str(tmp_path / "datasets"))
+    for country in ("DE", "FR"):
+        owner = dict(sample_catalog_dict["owner"], location={"country": {"id": country, "name": country}})
+        record = dict(sample_catalog_dict, owner=owner, coverage=[], tags=[])
+        path = entities / country / "Federal" / "opendata" / "testcatalog.yaml"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(yaml.safe_dump(record), encoding="utf-8")
+
+    output = tmp_path / "dq"
+    builder.analyze_quality(output=str(output), workers=1, incremental=False, profile=False)
+    for country in ("DE", "FR"):
+        country_report = (output / "countries" / f"{country}.txt").read_text(encoding="utf-8")
+        assert "DUPLICATE_RECORD_ID" in country_report
+        assert "MISSING_TAGS" in country_report
+    primary = [json.loads(line) for line in (output / "primary_priority.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert sorted(record["file_path"] for record in primary) == [
+        os.path.join(country, "Federal", "opendata", "testcatalog.yaml") for country in ("DE", "FR")
+    ]
+
+
+def test_analyze_quality_groups_duplicate_links_in_the_record_index(tmp_path, monkeypatch, sample_catalog_dict):
+    entities = tmp_path / "entities"
+    datasets = tmp_path / "datasets"
+    monkeypatch.setattr(builder, "ROOT_DIR", str(entities))
+    monkeypatch.setattr(builder, "DATASETS_DIR", str(datasets))
+    links = {
+        "a": "https://data.example.org/portal",
+        "b": "https://data.example.org/portal",
+        "c": "https://www.data.example.org/portal/",
+        "d": "https://other.example.org",
+    }
+    for record_id, link in links.items():
+        path = entities / "US" / f"{record_id}.yaml"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(yaml.safe_dump(dict(sample_catalog_dict, id=record_id, link=link)), encoding="utf-8")
+
+    def duplicate_issues(output):
+        builder.analyze_quality(output=str(output), workers=1, incremental=True, profile=False)
+        issues = [json.loads(line) for line in (output / "full_report.jsonl").read_text(encoding="utf-8").splitlines()]
+        return {
+            (issue["issue_type"], issue["record_id"])
+            for issue in issues
+            if issue["issue_type"].startswith("DUPLICATE_LINK")
+        }
+
+    assert duplicate_issues(tmp_path / "dq1") == {
+        ("DUPLICATE_LINK", "a"),
+        ("DUPLICATE_LINK", "b"),
+        ("DUPLICATE_LINK_NORMALIZED", "a"),
+        ("DUPLICATE_LINK_NORMALIZED", "b"),
+        ("DUPLICATE_LINK_NORMALIZED", "c"),
+    }
+    with RecordIndex(datasets / "record_index.sqlite") as index:
+        assert sorted(row["id"] for row in index.rows("entities")) == ["a", "b", "c", "d"]
+
+    # The index is updated from the cached results: a moved link and a deleted file
+    (entities / "US" / "b.yaml").write_text(
+        yaml.safe_dump(dict(sample_catalog_dict, id="b", link="https://other.example.org/")), encoding="utf-8"
+    )
+    (entities / "US" / "c.yaml").unlink()
+    assert duplicate_issues(tmp_path / "dq2") == {
+        ("DUPLICATE_LINK_NORMALIZED", "b"),
+        ("DUPLICATE_LINK_NORMALIZED", "d"),
+    }
+    with RecordIndex(datasets / "record_index.sqlite") as index:
+        assert sorted(row["id"] for row in index.rows("entities")) == ["a", "b", "d"]
@@ -0,0 +1,188 @@
+"""Tests for the shared pre-parsed record cache"""
+
+import os
+import sys
+
+import pytest
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import record_store  # noqa: E402
+from record_store import iter_records, load_record_cache  # noqa: E402
+
+
+def _write(path, record):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump(record), encoding="utf-8")
+
+
+def _count_yaml_loads(monkeypatch):
+    calls = []
+    real_load = record_store.yaml.load
+
+    def counting_load(content, Loader):
+        calls.append(content)
+        return real_load(content, Loader=Loader)
+
+    monkeypatch.setattr(record_store.yaml, "load", counting_load)
+    return calls
+
+
+class TestIterRecords:
+    def test_reparses_only_changed_files(self, tmp_path, monkeypatch):
+        root = tmp_path / "entities"
+        cache_path = tmp_path / "record_cache.pickle"
+        _write(root / "US" / "a.yaml", {"id": "a"})
+        _write(root / "DE" / "b.yaml", {"id": "b"})
+        calls = _count_yaml_loads(monkeypatch)
+
+        first = [(path.name, record) for path, record in iter_records(root, cache_path=cache_path)]
+        assert first == [("b.yaml", {"id": "b"}), ("a.yaml", {"id": "a"})]
+        assert len(calls) == 2
+
+        calls.clear()
+        assert [record for _, record in iter_records(root, cache_path=cache_path)] == [{"id": "b"}, {"id": "a"}]
+        assert calls == []
+
+        _write(root / "US" / "a.yaml", {"id": "a", "name": "changed"})
+        (root / "DE" / "b.yaml").unlink()
+        assert [record for _, record in iter_records(root, cache_path=cache_path)] == [{"id": "a", "name": "changed"}]
+        assert len(calls) == 1
+        assert len(load_record_cache(cache_path)) == 1
+
+    def test_records_are_fresh_copies(self, tmp_path):
+        root = tmp_path / "entities"
+        cache_path = tmp_path / "record_cache.pickle"
+        _write(root / "a.yaml", {"id": "a", "tags": ["x"]})
+
+        for _, record in iter_records(root, cache_path=cache_path):
+            record["tags"].append("mutated")
+        assert [record for _, record in iter_records(root, cache_path=cache_path)] == [{"id": "a", "tags": ["x"]}]
+
+    def test_touched_file_with_same_content_is_not_reparsed(self, tmp_path, monkeypatch):
+        root = tmp_path / "entities"
+        cache_path = tmp_path / "record_cache.pickle"
+        _write(root / "a.yaml", {"id": "a"})
+        list(iter_records(root, cache_path=cache_path))
+        stat = (root / "a.yaml").stat()
+        os.utime(root / "a.yaml", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        calls = _count_yaml_loads(monkeypatch)
+
+        assert [record for _, record in iter_records(root, cache_path=cache_path)] == [{"id": "a"}]
+        assert calls == []
+
+
+class TestRecordIndex:
+    def _catalog(self, record_id, link, **extra):
+        return dict(
+            {
+                "id": record_id,
+                "uid": f"cdi-{record_id}",
+                "link": link,
+                "owner": {"location": {"country": {"id": "US"}}},
+                "software": {"id": "ckan"},
+            },
+            **extra,
+        )
+
+    def test_lookups_by_id_uid_url_host_and_re3data(self, tmp_path):
+        root = tmp_path / "entities"
+        _write(
+            root / "US" / "a.yaml",
+            self._catalog(
+                "a",
+                "https://www.Example.org/data/",
+                endpoints=[{"type": "ckanapi", "url": "https://api.example.net:8443/api/3"}],
+                identifiers=[{"id": "re3data", "value": "r3d100000001"}],
+            ),
+        )
+        _write(root / "US" / "b.yaml", self._catalog("b", "http://other.org"))
+
+        with record_store.RecordIndex(tmp_path / "index.sqlite") as index:
+            assert index.refresh("entities", root) == (2, 0)
+            assert [row["id"] for row in index.by_id("a")] == ["a"]
+            assert index.by_uid("cdi-b")[0]["link"] == "http://other.org"
+            assert [row["id"] for row in index.by_canonical_url("https://example.org/data")] == ["a"]
+            assert [row["id"] for row in index.by_host("api.example.net")] == ["a"]
+            assert [row["id"] for row in index.by_re3data_id("r3d100000001")] == ["a"]
+            assert index.hosts() == {"example.org", "api.example.net", "other.org"}
+            assert index.by_id("a")[0]["country"] == "US"
+            assert record_store.record_path(index.by_id("a")[0]) == (root / "US" / "a.yaml").resolve()
+
+    def test_refresh_touches_only_changed_files(self, tmp_path, monkeypatch):
+        root = tmp_path / "entities"
+        _write(root / "a.yaml", self._catalog("a", "https://a.org"))
+        _write(root / "b.yaml", self._catalog("b", "https://b.org"))
+        with record_store.RecordIndex(tmp_path / "index.sqlite") as index:
+            index.refresh("entities", root)
+            calls = _count_yaml_loads(monkeypatch)
+            assert index.refresh("entities", root) == (0, 0)
+            assert calls == []
+
+            _write(root / "a.yaml", self._catalog("a", "https://new-a.org"))
+            (root / "b.yaml").unlink()
+            assert index.refresh("entities", root) == (1, 1)
+            assert len(calls) == 1
+            assert [row["id"] for row in index.rows()] == ["a"]
+            assert index.hosts() == {"new-a.org"}
+
+    def test_update_from_build_manifest(self, tmp_path):
+        root = tmp_path / "scheduled"
+        entries = [
+            {"path": "a.yaml", "mtime": 1, "size": 10, "line": '{"id": "a", "link": "https://a.org"}'},
+            {"path": "broken.yaml", "mtime": 1, "size": 3, "line": None},
+        ]
+        with record_store.RecordIndex(tmp_path / "index.sqlite") as index:
+            assert index.update_from_manifest("scheduled", root, entries) == (2, 0)
+            assert index.update_from_manifest("scheduled", root, entries) == (0, 0)
+            assert [row["id"] for row in index.rows("scheduled")] == ["a"]
+            assert index.rows("entities") == []
+
+    def test_invalid_records_keep_the_reason(self, tmp_path):
+        root = tmp_path / "scheduled"
+        _write(root / "ok.yaml", self._catalog("ok", "https://ok.org"))
+        _write(root / "no-id.yaml", {"name": "No id"})
+        _write(root / "list.yaml", ["not", "a", "mapping"])
+        (root / "broken.yaml").write_text("id: broken\nname: [unclosed\n", encoding="utf-8")
+        with record_store.RecordIndex(tmp_path / "index.sqlite") as index:
+            index.refresh("scheduled", root)
+            errors = index.invalid_records("scheduled")
+        by_name = {path.rsplit("/", 1)[-1]: error for path, error in errors}
+        assert sorted(by_name) == ["broken.yaml", "list.yaml", "no-id.yaml"]
+        assert by_name["no-id.yaml"] == "missing id"
+        assert by_name["list.yaml"] == "not a mapping"
+        assert by_name["broken.yaml"].startswith("invalid YAML: while parsing a flow sequence")
+
+    def test_groups_shared_values(self, tmp_path):
+        root = tmp_path / "entities"
+        _write(root / "a.yaml", self._catalog("a", "https://data.example.org/portal"))
+        _write(root / "b.yaml", self._catalog("b", "https://data.example.org/portal"))
+        _write(root / "c.yaml", self._catalog("c", "https://www.data.example.org/portal/"))
+        _write(root / "d.yaml", self._catalog("a", "https://other.org"))
+        with record_store.RecordIndex(tmp_path / "index.sqlite") as index:
+            index.refresh("entities", root)
+            assert [[row["id"] for row in group] for group in index.groups("id")] == [["a", "a"]]
+            assert [[row["id"] for row in group] for group in index.groups("link", "entities")] == [["a", "b"]]
+            normalized = index.groups("canonical_link", "entities", varying="link")
+            assert [[row["id"] for row in group] for group in normalized] == [["a", "b", "c"]]
+            assert normalized[0][0]["canonical_link"] == "https://data.example.org/portal"
+            assert index.groups("link", "scheduled") == []
+            with pytest.raises(ValueError):
+                index.groups("name")
+
+    def test_cross_dataset_duplicates(self, tmp_path):
+        entities = tmp_path / "entities"
+        scheduled = tmp_path / "scheduled"
+        _write(entities / "a.yaml", self._catalog("a", "https://data.example.org/portal"))
+        _write(entities / "b.yaml", self._catalog("b", None))
+        _write(scheduled / "same-id.yaml", self._catalog("b", "https://new.org"))
+        _write(scheduled / "same-url.yaml", self._catalog("x", "http://www.data.example.org/portal/"))
+        _write(scheduled / "same-host.yaml", self._catalog("y", "https://data.example.org/other"))
+        _write(scheduled / "new.yaml", self._catalog("z", "https://example.org"))
+        with record_store.RecordIndex(tmp_path / "index.sqlite") as index:
+            index.refresh("entities", entities)
+            index.refresh("scheduled", scheduled)
+            matches = index.cross_dataset_duplicates("scheduled", "entities")
+            assert sorted(row["id"] for row in matches) == ["b", "x", "y"]
+            assert index.invalid_records("scheduled") == []
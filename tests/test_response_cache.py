@@ -0,0 +1,113 @@
+"""Tests for the on-disk apidetect response cache"""
+
+import os
+import sys
+import threading
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from response_cache import CachedSession, ResponseCache, cache_key  # noqa: E402
+
+
+class _Response:
+    def __init__(self, status_code=200, content=b'{"ok": true}', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {"Content-Type": "application/json", "ETag": '"v1"'}
+        self.url = None
+
+
+class _Session:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(("GET", url, kwargs.get("headers", {})))
+        return self.responses.pop(0)
+
+    def post(self, url, **kwargs):
+        self.calls.append(("POST", url, kwargs.get("headers", {})))
+        return self.responses.pop(0)
+
+
+def test_cache_key_depends_on_accept_and_body():
+    url = "https://example.org/api"
+    assert cache_key("get", url) == cache_key("GET", url)
+    assert cache_key("GET", url, "application/json") != cache_key("GET", url)
+    assert cache_key("POST", url, body={"a": 1, "b": 2}) == cache_key("POST", url, body={"b": 2, "a": 1})
+    assert cache_key("POST", url, body={"a": 1}) != cache_key("POST", url, body={"a": 2})
+
+
+def test_fresh_entries_are_served_from_disk(tmp_path):
+    session = _Session([_Response(), _Response(status_code=404, headers={"Content-Type": "text/html"})])
+    with ResponseCache(tmp_path / "cache.sqlite") as cache:
+        cached = CachedSession(session, cache)
+        first = cached.get("https://example.org/api", headers={"Accept": "application/json"})
+        second = cached.get("https://example.org/api", headers={"Accept": "application/json"})
+        other = cached.get("https://example.org/api", headers={"Accept": "text/html"})
+
+    assert first.status_code == 200
+    assert second.from_cache and second.json() == {"ok": True}
+    assert second.headers["content-type"] == "application/json"
+    assert other.status_code == 404
+    assert len(session.calls) == 2
+
+
+@pytest.mark.parametrize("status_code", [429, 500, 503])
+def test_rate_limits_and_server_errors_are_not_stored(tmp_path, status_code):
+    session = _Session([_Response(status_code=status_code), _Response()])
+    with ResponseCache(tmp_path / "cache.sqlite") as cache:
+        cached = CachedSession(session, cache)
+        assert cached.get("https://example.org/api").status_code == status_code
+        assert cached.get("https://example.org/api").status_code == 200
+        assert cache.stats == {"miss": 2, "not_stored": 1}
+
+    assert len(session.calls) == 2
+
+
+def test_expired_entries_are_revalidated_with_etag(tmp_path):
+    session = _Session([_Response(), _Response(status_code=304, content=b"", headers={})])
+    with ResponseCache(tmp_path / "cache.sqlite", ttl=0) as cache:
+        cached = CachedSession(session, cache)
+        cached.get("https://example.org/api")
+        response = cached.get("https://example.org/api")
+        assert cache.stats["revalidated"] == 1
+
+    assert session.calls[1][2]["If-None-Match"] == '"v1"'
+    assert response.status_code == 200
+    assert response.content == b'{"ok": true}'
+
+
+def test_offline_mode_replays_and_fails_on_misses(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    with ResponseCache(path) as cache:
+        CachedSession(_Session([_Response()]), cache).get("https://example.org/api", ttl=0)
+
+    with ResponseCache(path, offline=True) as cache:
+        cached = CachedSession(_Session([]), cache)
+        assert cached.get("https://example.org/api").json() == {"ok": True}
+        with pytest.raises(requests.exceptions.ConnectionError):
+            cached.get("https://example.org/other")
+
+
+def test_stats_are_counted_under_the_lock(tmp_path):
+    with ResponseCache(tmp_path / "cache.sqlite") as cache:
+        cached = CachedSession(_Session([_Response()]), cache)
+        cached.get("https://example.org/api")
+
+        def fetch():
+            for _ in range(200):
+                cached.get("https://example.org/api")
+
+        threads = [threading.Thread(target=fetch) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert cache.stats["miss"] == 1
+    assert cache.stats["hit"] == 1600
@@ -0,0 +1,89 @@
+"""Tests for the compiled Cerberus catalog schema validator"""
+
+import copy
+import json
+import os
+import sys
+
+from cerberus import Validator
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from schema_validator import CompiledValidator, compile_schema  # noqa: E402
+
+SCHEMA_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "schemes", "catalog.json")
+
+with open(SCHEMA_FILE, encoding="utf8") as f:
+    SCHEMA = json.load(f)
+
+RECORD = {
+    "id": "dataexampleorg",
+    "uid": "cdi00000001",
+    "name": "Example Open Data",
+    "link": "https://data.example.org",
+    "catalog_type": "Open data portal",
+    "access_mode": ["open"],
+    "status": "active",
+    "software": {"id": "ckan", "name": "CKAN"},
+    "owner": {
+        "name": "City of Example",
+        "type": "Local government",
+        "location": {"country": {"id": "US", "name": "United States"}, "level": 30},
+    },
+    "coverage": [{"location": {"country": {"id": "US", "name": "United States"}, "level": 30}}],
+    "tags": ["transport", {"id": "roads"}],
+    "trust_score": 80,
+}
+
+MUTATIONS = [
+    lambda r: r.pop("uid"),
+    lambda r: r.update(status="archived"),
+    lambda r: r.update(access_mode=["open", "bogus"]),
+    lambda r: r.update(name=""),
+    lambda r: r.update(name=None),
+    lambda r: r.update(unknown_field=1),
+    lambda r: r["owner"]["location"].update(macroregion={"id": "019", "name": "Americas"}),
+    lambda r: r["coverage"][0]["location"]["country"].update(id=False),
+    lambda r: r.update(tags=[1]),
+    lambda r: r.update(trust_score=101),
+    lambda r: r.update(trust_score="high"),
+    lambda r: r.update(coverage={"location": {}}),
+    lambda r: r.update(software={}),
+]
+
+
+def test_valid_record_takes_the_compiled_path(monkeypatch):
+    validator = CompiledValidator(SCHEMA)
+    monkeypatch.setattr(validator._cerberus, "validate", lambda *args: (_ for _ in ()).throw(AssertionError))
+    assert validator.validate(RECORD, SCHEMA)
+    assert validator.errors == {}
+
+
+def test_compiled_check_is_never_more_lenient_than_cerberus():
+    check = compile_schema(SCHEMA)
+    cerberus = Validator(SCHEMA)
+    assert check(RECORD) and cerberus.validate(RECORD)
+    for mutate in MUTATIONS:
+        record = copy.deepcopy(RECORD)
+        mutate(record)
+        if check(record):
+            assert cerberus.validate(record), cerberus.errors
+
+
+def test_errors_match_cerberus():
+    validator = CompiledValidator(SCHEMA)
+    cerberus = Validator(SCHEMA)
+    for mutate in MUTATIONS:
+        record = copy.deepcopy(RECORD)
+        mutate(record)
+        assert validator.validate(record, SCHEMA) == cerberus.validate(record, SCHEMA)
+        assert validator.errors == cerberus.errors
+
+
+def test_unsupported_rules_fall_back_to_cerberus():
+    schema = {"id": {"type": "string", "regex": "^[a-z]+$"}}
+    validator = CompiledValidator(schema)
+    assert validator._check is None
+    assert validator.validate({"id": "abc"})
+    assert not validator.validate({"id": "ABC"})
+    assert validator.errors == {"id": ["value does not match regex '^[a-z]+$'"]}
@@ -22,3 +22,7 @@ def test_canonicalize_url_keeps_query_string():
         canonicalize_url("https://example.gov/search/?q=test")
         == "https://example.gov/search?q=test"
     )
+
+
+def test_canonicalize_url_rejects_invalid_port():
+    assert canonicalize_url("https://example.gov:port/data") is None